@@ -4,129 +4,179 @@ from datetime import datetime
 from loguru import logger
 import sys
 import os
+import mmap
 
+from src.utils.account_categories_list import account_number_suffixes
+from src.utils.duplicate_index import flag_duplicates
+from src.utils.high_water_marks import HighWaterMarks
 
-def parse_hdfc_qif(file_path):
+
+# Compiled once; used for every line of every file.
+# Transaction time inside a payee/memo line, e.g. 'MTXN TIME 21:02:47' or 'TXN TIME 12:04:29'.
+TIME_RE = re.compile(r'M?TXN TIME (\d{2}:\d{2}:\d{2})')
+# Account number suffix in the statement's file name, e.g. 'Acct Statement_XX2562_22022025.qif'.
+ACCOUNT_SUFFIX_RE = re.compile(r'XX(\d{4})')
+
+
+def account_for_file(file_path, suffixes=None):
+    """
+    Maps a statement file to its account using the account number suffix in its name.
+
+    Args:
+        file_path (str): The statement file.
+        suffixes (dict, optional): Suffix -> account. Defaults to `account_number_suffixes`.
+
+    Returns:
+        str: The account name.
+    """
+    suffixes = suffixes or account_number_suffixes
+    match = ACCOUNT_SUFFIX_RE.search(os.path.basename(file_path))
+    if match and match.group(1) in suffixes:
+        return suffixes[match.group(1)]
+    logger.error(f"Unknown account name for file: {file_path}.")
+    raise ValueError(f"Unknown account name for file: {file_path}. Add its account number suffix to account_number_suffixes.")
+
+def _iter_lines(file_path, use_mmap):
+    """Yields the lines of a file without their line endings, reading lazily."""
+    if use_mmap:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for raw_line in iter(mapped.readline, b''):
+                yield raw_line.decode('utf-8', errors='replace').rstrip('\r\n')
+    else:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                yield line.rstrip('\r\n')
+
+def _iter_blocks(lines):
+    """Groups lines into transaction blocks, each ended by a '^' line."""
+    block = []
+    for line in lines:
+        if line.strip() == '^':
+            if block:
+                yield block
+            block = []
+        elif line.strip() or block:
+            block.append(line.strip() if not block else line)
+    if block:
+        yield block
+
+def _parse_block(lines, account_name):
+    """
+    Builds one transaction record from the lines of a block.
+
+    Returns:
+        dict: The record in the processed Excel layout, or None if the block is not a transaction.
+    """
+    if lines[0] == '!Type:Bank':
+        lines = lines[1:]
+    elif not lines[0].startswith('D'):
+        return None
+
+    date_str = None
+    amount = None
+    time_str = "00:00:00" # Default time if not found
+    description_parts = []
+    for line in lines:
+        if not line:
+            continue
+        prefix = line[0]
+        value = line[1:].strip()
+        if prefix == 'D':
+            date_str = value
+        elif prefix == 'T':
+            amount = float(value.replace(',', ''))
+        elif prefix in ('P', 'M'):
+            match = TIME_RE.search(line)
+            if match:
+                time_str = match.group(1)
+                # Clean the time part from the description
+                cleaned_value = TIME_RE.sub('', line[1:]).strip()
+                if cleaned_value:
+                    description_parts.append(cleaned_value)
+            else:
+                description_parts.append(value)
+
+    if not date_str or amount is None:
+        return None
+    try:
+        full_datetime = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%y %H:%M:%S")
+    except ValueError:
+        logger.warning(f"Could not parse date/time for a transaction block: Date='{date_str}', Time='{time_str}'")
+        return None
+    return {
+        'Type': 'Income' if amount >= 0 else 'Expense',
+        'Account': account_name,
+        'Category': '', # To be filled manually
+        'Amount': abs(amount),
+        'Notes': '', # To be filled manually
+        'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
+        'Status': 'Pending', # Default status
+        'Description': " ".join(description_parts).strip(),
+    }
+
+def iter_hdfc_qif(file_path, account_name=None, use_mmap=False):
+    """
+    Streams the transactions of an HDFC .qif statement one record at a time.
+
+    The file is read line by line (or through a memory map, which avoids
+    copying multi-year exports into Python buffers), so memory does not grow
+    with the size of the file.
+
+    Args:
+        file_path (str): The full path to the .qif file.
+        account_name (str, optional): The account of the statement. Defaults to the one
+                                      its file name maps to (see `account_for_file`).
+        use_mmap (bool): Read the file through mmap.
+
+    Returns:
+        generator: Transaction records in the processed Excel layout.
+    """
+    account_name = account_name or account_for_file(file_path)
+
+    def records():
+        for block in _iter_blocks(_iter_lines(file_path, use_mmap)):
+            try:
+                record = _parse_block(block, account_name)
+            except ValueError as e:
+                logger.warning(f"Skipping a transaction block that could not be parsed: {e}")
+                continue
+            if record:
+                yield record
+    return records()
+
+def parse_hdfc_qif(file_path, use_mmap=False):
     """
     Parses an HDFC bank statement in .qif format and extracts transaction details.
 
-    The script reads the file line by line, identifying transaction blocks
-    that start with a date ('D') and end with a caret ('^'). It intelligently
-    extracts the date, amount, transaction number, and a clean description.
+    The transactions are streamed by `iter_hdfc_qif`: blocks start with a date
+    ('D') and end with a caret ('^'), and the date, amount, transaction time and
+    a clean description are extracted from each.
 
     Args:
         file_path (str): The full path to the .qif file.
+        use_mmap (bool): Read the file through mmap.
 
     Returns:
         pandas.DataFrame: A DataFrame containing the parsed transactions with
                           columns ready for the automation script, or None if
                           the file cannot be processed.
     """
-    # TODO: Change this when using
-    account_name = ''
-    if "XX2562" in file_path:
-        account_name = 'HDFC - UPI'
-    elif "XX6642" in file_path:
-        account_name = 'HDFC - Special Gold'
-    else:
-        logger.error(f"Unknown account name for file: {file_path}. Defaulting to '{account_name}'.")
-        raise ValueError(f"Unknown account name for file: {file_path}. Please check the file name or update the script.")
-
-    transactions = []
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        transactions = list(iter_hdfc_qif(file_path, use_mmap=use_mmap))
     except FileNotFoundError:
         logger.error(f"Error: The file '{file_path}' was not found.")
         return None
-    except Exception as e:
+    except OSError as e:
         logger.error(f"An error occurred while reading the file: {e}")
         return None
-
-    # Each transaction is separated by a '^' character on its own line.
-    transaction_blocks = content.strip().split('\n^\n')
-
-    logger.info(f"Found {len(transaction_blocks)} potential transaction blocks in the file.")
-
-    for block in transaction_blocks:
-        lines = block.strip().split('\n')
-        
-        if not lines or not (lines[0].strip() == '!Type:Bank' or lines[0].startswith('D')):
-            continue
-        
-        if lines[0].strip() == '!Type:Bank':
-            lines = lines[1:]
-
-        data = {}
-        description_parts = []
-        
-        # Regex to find the transaction time, e.g., 'MTXN TIME 21:02:47' or 'TXN TIME 12:04:29'
-        time_regex = re.compile(r'M?TXN TIME (\d{2}:\d{2}:\d{2})')
-        
-        date_str = None
-        time_str = "00:00:00" # Default time if not found
-        transaction_num = None
-
-        for line in lines:
-            if not line:
-                continue
-            
-            prefix = line[0]
-            value = line[1:].strip()
-
-            if prefix == 'D':
-                date_str = value
-            elif prefix == 'T':
-                data['Amount'] = float(value.replace(',', ''))
-            elif prefix == 'N':
-                transaction_num = value
-            elif prefix in ['P', 'M']:
-                # Check if this line contains the transaction time
-                match = time_regex.search(line)
-                if match:
-                    time_str = match.group(1)
-                    # Clean the time part from the description
-                    cleaned_value = time_regex.sub('', line[1:]).strip()
-                    if cleaned_value:
-                        description_parts.append(cleaned_value)
-                else:
-                    description_parts.append(value)
-
-        if date_str and 'Amount' in data:
-            try:
-                full_datetime = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%y %H:%M:%S")
-                
-                # --- NEW: Logic to determine Type and format Amount/Datetime ---
-                original_amount = data['Amount']
-                data['Type'] = 'Income' if original_amount >= 0 else 'Expense'
-                data['Amount'] = abs(original_amount)
-                data['Datetime'] = full_datetime.strftime('%Y-%m-%d %I:%M %p')
-                
-                # Construct a clean and informative description
-                final_description = ""
-                final_description += " ".join(description_parts)
-                data['Description'] = final_description.strip()
-                
-                data['Account'] = account_name
-                data['Category'] = '' # To be filled manually
-                data['Notes'] = '' # To be filled manually
-                data['Status'] = 'Pending' # Default status
-                
-                transactions.append(data)
-            except ValueError:
-                logger.warning(f"Could not parse date/time for a transaction block: Date='{date_str}', Time='{time_str}'")
+    logger.info(f"Found {len(transactions)} transactions in the file.")
 
     if not transactions:
         logger.warning("No valid transactions were found in the file.")
         return None
 
-    df = pd.DataFrame(transactions)
-    
-    # --- NEW: Reordered and updated columns ---
     output_columns = ['Type', 'Account', 'Category', 'Amount', 'Notes', 'Datetime', 'Status', 'Description']
-    df = df[output_columns]
-    
-    return df
+    return pd.DataFrame(transactions, columns=output_columns)
 
 def main():
     """
@@ -150,6 +200,10 @@ def main():
         return
 
     transactions_df = parse_hdfc_qif(input_qif_file)
+    # Only rows after what earlier statements of this account already covered.
+    marks = HighWaterMarks()
+    marks.load()
+    transactions_df = marks.new_rows(transactions_df)
     pd.set_option('display.max_colwidth', None)
     logger.debug(f"Parsed DataFrame:\n{transactions_df.head(100) if transactions_df is not None else 'No transactions found.'}")
 
@@ -158,10 +212,15 @@ def main():
         input_dir = os.path.dirname(input_qif_file)
         output_excel_file = os.path.join(input_dir, f"{base_name}_processed.xlsx")
     
+        # Rows already added in an earlier run, or repeated by overlapping statements, are marked 'Duplicate'.
+        transactions_df = flag_duplicates(transactions_df)
+
         try:
             transactions_df.to_excel(output_excel_file, index=False)
             logger.success(f"Successfully processed {len(transactions_df)} transactions.")
             logger.success(f"Output saved to: {os.path.abspath(output_excel_file)}")
+            marks.advance(transactions_df)
+            marks.save()
         except Exception as e:
             logger.error(f"Failed to save the Excel file. Error: {e}")
 
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from loguru import logger
+
+from src.transaction import EXCEL_COLUMNS, EXCEL_DATETIME_FORMAT
+from src.account_statement_parsers.registry import detect_parser, parse_statement
+from src.account_statement_parsers.transfer_matcher import match_transfers
+from src.utils.duplicate_index import flag_duplicates
+from src.utils.high_water_marks import HighWaterMarks
+
+
+def _parse_file(file_path, parser_name, options):
+    """
+    Worker: parses one statement and times it.
+
+    Returns:
+        tuple: (file path, parser name, DataFrame or None, seconds, error message or None)
+    """
+    start = time.perf_counter()
+    try:
+        df = parse_statement(file_path, parser_name, **options)
+        error = None
+    except Exception as e:
+        df, error = None, str(e)
+    return file_path, parser_name, df, time.perf_counter() - start, error
+
+def _sorted_rows(df, file_order):
+    """Yields (datetime, file order, row) tuples of one parser output in time order."""
+    datetimes = pd.to_datetime(df['Datetime'], format=EXCEL_DATETIME_FORMAT)
+    order = datetimes.argsort(kind='stable')
+    rows = list(df[EXCEL_COLUMNS].itertuples(index=False, name=None))
+    for position in order:
+        yield datetimes.iat[position], file_order, rows[position]
+
+def merge_by_datetime(frames):
+    """
+    K-way merge of parser outputs into one table ordered by datetime.
+
+    Each output is sorted on its own and `heapq.merge` then interleaves them,
+    so the merge costs O(n log k) for k files. Rows at the same time keep the
+    order of their files.
+    """
+    streams = [_sorted_rows(df, file_order) for file_order, df in enumerate(frames)]
+    merged = [row for _, _, row in heapq.merge(*streams, key=lambda item: (item[0], item[1]))]
+    return pd.DataFrame(merged, columns=EXCEL_COLUMNS)
+
+def ingest_directory(directory, workers=None, match=True, marks=None):
+    """
+    Parses every recognised statement in a directory and merges them into the master layout.
+
+    Files are recognised by content (see `detect_parser`) and parsed in a process
+    pool. The outputs are merged by datetime; then, optionally, the two sides of
+    transfers are matched (see `match_transfers`) and rows that were already
+    added are marked 'Duplicate'.
+
+    With high-water marks, only rows that earlier ingests did not cover are kept,
+    and the marks are advanced in memory; save them once the output is written.
+
+    Args:
+        directory (str): The folder holding the downloaded statements.
+        workers (int, optional): Number of parser processes. Defaults to one per CPU.
+        match (bool): Collapse cross-statement transfer pairs into one Transfer row.
+        marks (HighWaterMarks, optional): Per-source marks of what was already parsed.
+
+    Returns:
+        tuple: (merged DataFrame or None, timings DataFrame with file, parser, rows and seconds)
+    """
+    files = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or name.endswith('_processed.xlsx') or name.startswith('~$'):
+            continue
+        parser_name = detect_parser(path)
+        if parser_name is None:
+            logger.warning(f"No parser recognises '{name}'. Skipping it.")
+            continue
+        # Splitwise entries are skipped by ID while parsing; statements are filtered after it.
+        options = {'seen_ids': marks.seen_ids()} if marks and parser_name == 'splitwise_html' else {}
+        files.append((path, parser_name, options))
+    if not files:
+        logger.warning(f"No statements found in '{directory}'.")
+        return None, pd.DataFrame(columns=['file', 'parser', 'rows', 'seconds'])
+
+    logger.info(f"Parsing {len(files)} statement(s)...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_parse_file, *zip(*files)))
+    wall_time = time.perf_counter() - start
+
+    frames = []
+    statement_frames = []
+    timings = []
+    for path, parser_name, df, seconds, error in results:
+        if error:
+            logger.error(f"Failed to parse '{os.path.basename(path)}' with {parser_name}: {error}")
+        elif df is not None and not df.empty:
+            if marks and parser_name == 'splitwise_html':
+                marks.add_ids(df.attrs.get('expense_ids', {}))
+            elif marks:
+                # Every file is compared with the marks of earlier ingests; overlaps between
+                # files of this ingest are marked 'Duplicate' by flag_duplicates instead.
+                df = marks.new_rows(df)
+                statement_frames.append(df)
+            frames.append(df)
+        timings.append((os.path.basename(path), parser_name, 0 if df is None else len(df), seconds))
+    timings = pd.DataFrame(timings, columns=['file', 'parser', 'rows', 'seconds'])
+    for df in statement_frames:
+        marks.advance(df)
+
+    logger.info("="*50)
+    logger.info("PARSE TIMINGS")
+    logger.info("="*50)
+    for row in timings.itertuples(index=False):
+        logger.info(f"{row.file:<50} {row.parser:<16} {row.rows:>7} rows {row.seconds:>8.3f} s")
+    logger.info(f"Total parse time {timings['seconds'].sum():.3f} s, wall time {wall_time:.3f} s")
+    logger.info("="*50)
+
+    if not frames:
+        return None, timings
+    transactions_df = merge_by_datetime(frames)
+    if match:
+        transactions_df = match_transfers([transactions_df])
+    return flag_duplicates(transactions_df), timings
+
+
+def main():
+    """
+    Main function to execute the script.
+    Prompts for a folder of statements and writes them to one processed Excel file.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
+
+    logger.info("--- Ingest All Statements in a Folder ---")
+    logger.warning("Close the files that will be processed, otherwise it may cause an error.")
+    input_dir = input("Please enter the full path to the folder with your statements: ").strip().strip('"')
+    if not os.path.isdir(input_dir):
+        logger.error("The provided folder does not exist. Please check the path and try again.")
+        return
+
+    marks = HighWaterMarks()
+    marks.load()
+    transactions_df, _ = ingest_directory(input_dir, marks=marks)
+    if transactions_df is None or transactions_df.empty:
+        logger.warning("No transactions were parsed.")
+        return
+    output_excel_file = os.path.join(input_dir, "ingested_processed.xlsx")
+    try:
+        transactions_df.to_excel(output_excel_file, index=False)
+        logger.success(f"Successfully processed {len(transactions_df)} transactions.")
+        logger.success(f"Output saved to: {os.path.abspath(output_excel_file)}")
+        marks.save()
+    except Exception as e:
+        logger.error(f"Failed to save the Excel file. Error: {e}")
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,17 @@
 import pandas as pd
-from datetime import datetime
 from loguru import logger
 import sys
 import os
 
+from src.utils.duplicate_index import flag_duplicates
+from src.utils.high_water_marks import HighWaterMarks
+from src.utils.rule_engine import load_rule_engine
+
+
+# Only transactions made with this card are imported.
+CARD_ACCOUNT = "HDFC Bank Rupay Credit Card - 00"
+SHEET_NAME = "Passbook Payment History"
+
 
 def find_header_row(df):
     """
@@ -22,70 +30,30 @@ def find_header_row(df):
             return i
     return None
 
-def apply_categorization_rules(data, row):
+def categorize_details(details):
     """
-    Applies a set of predefined rules to automatically categorize transactions
-    and populate the Notes field.
+    Applies the 'tata_neu' rules of the categorization rules file to a whole column
+    of transaction details (see `load_rule_engine`).
 
     Args:
-        data (dict): The transaction data dictionary to be modified.
-        row (pd.Series): The original row from the DataFrame to access all columns.
-    
+        details (pd.Series): The 'Transaction Details' of every transaction, as text.
+
     Returns:
-        dict: The modified data dictionary.
+        pd.Series: The category of the first matching rule, or '' where no rule matches.
     """
-    # --- Define Your Custom Rules Here ---
-    # The script will check each rule in order. The FIRST rule that matches will be applied.
-    CATEGORIZATION_RULES = [
-        {
-            "keywords": ["Elior India", "GMS Salad Counter",],
-            "category": "Food",
-            "notes_from_remarks": True 
-        },
-        {
-            "keywords": ["Bmtc Bus"],
-            "category": "Transportation",
-            "notes_from_remarks": True 
-        },
-        # --- Add more rules below ---
-        # Example:
-        # {
-        #     "keywords": ["Flight", "Indigo", "Air India"],
-        #     "category": "Travel",
-        #     "notes_from_remarks": True
-        # },
-        # {
-        #     "keywords": ["Amazon", "Myntra", "Flipkart"],
-        #     "category": "Shopping",
-        #     "notes_from_remarks": False # Notes will remain empty
-        # },
-    ]
-
-    transaction_details = str(row.get('Transaction Details', '')).lower()
-    remarks = str(row.get('Remarks', ''))
-
-    if not pd.isna(remarks) and remarks.lower() != 'nan':
-        data['Notes'] = remarks[:1].upper() + remarks[1:] if remarks else remarks
-
-    for rule in CATEGORIZATION_RULES:
-        for keyword in rule['keywords']:
-            if keyword.lower() in transaction_details:
-                logger.debug(f"Rule matched for keyword '{keyword}'. Applying category '{rule['category']}'.")
-                data['Category'] = rule['category']
-                # if rule['notes_from_remarks'] and remarks and not pd.isna(remarks) and remarks.lower() != 'nan':
-                #     data['Notes'] = remarks
-                # Once a rule is matched for a transaction, we stop checking other rules.
-                return data
-    
-    return data
+    engine = load_rule_engine('tata_neu')
+    categories = engine.categorize(details)
+    engine.log_hits()
+    return categories
 
 
 def parse_tata_neu_excel(file_path):
     """
     Parses an Infinity Tata Neu CC statement from an Excel file and extracts transaction details.
 
-    The script reads the specific "Passbook Payment History" sheet, finds the header,
-    and processes each transaction row to create a clean, normalized output.
+    The "Passbook Payment History" sheet is read once; the header row is found
+    in the raw rows and the transactions below it are converted with column
+    operations (account filter, date and time, sign, description, rules).
 
     Args:
         file_path (str): The full path to the .xlsx file.
@@ -96,13 +64,13 @@ def parse_tata_neu_excel(file_path):
                           the file cannot be processed.
     """
     try:
-        # Read the specific sheet without assuming a header initially
-        raw_df = pd.read_excel(file_path, sheet_name="Passbook Payment History", header=None)
+        # Read the specific sheet without assuming a header
+        raw_df = pd.read_excel(file_path, sheet_name=SHEET_NAME, header=None)
     except FileNotFoundError:
         logger.error(f"Error: The file '{file_path}' was not found.")
         return None
     except ValueError as e:
-        logger.error(f"Error: Sheet 'Passbook Payment History' not found in the Excel file. Details: {e}")
+        logger.error(f"Error: Sheet '{SHEET_NAME}' not found in the Excel file. Details: {e}")
         return None
     except Exception as e:
         logger.error(f"An error occurred while reading the Excel file: {e}")
@@ -110,91 +78,61 @@ def parse_tata_neu_excel(file_path):
 
     header_row_index = find_header_row(raw_df)
     if header_row_index is None:
-        logger.error("Could not find the header row in the 'Passbook Payment History' sheet.")
+        logger.error(f"Could not find the header row in the '{SHEET_NAME}' sheet.")
         return None
 
-    # Re-read the sheet, this time with the correct header row
-    df = pd.read_excel(file_path, sheet_name="Passbook Payment History", header=header_row_index)
-    
-    transactions = []
+    # The rows below the header, named by it. The index + 1 is the row number in Excel.
+    df = raw_df.iloc[header_row_index + 1:].set_axis(raw_df.iloc[header_row_index].tolist(), axis=1)
     logger.info(f"Found {len(df)} potential transactions in the sheet.")
 
-    expenses = 0
-    income = 0
-    net_amount = 0
-
-    for index, row in df.iterrows():
-        try:
-            # --- NEW: Filter rows based on the 'Your Account' column ---
-            your_account_value = str(row.get('Your Account', '')).strip()
-            if your_account_value != "HDFC Bank Rupay Credit Card - 00":
-                logger.debug(f"Skipping row {index + header_row_index + 2} because 'Your Account' is '{your_account_value}'.")
-                continue
-
-            # Extract data, converting to string to handle potential non-string types
-            date_str = str(row['Date'])
-            time_str = str(row['Time'])
-            amount_str = str(row['Amount']).replace(',', '') # Remove commas
-            details = str(row['Transaction Details'])
-            remarks = str(row['Remarks'])
-
-            # Skip rows that are likely empty or malformed
-            if pd.isna(row['Date']) or pd.isna(row['Amount']):
-                continue
-
-            data = {}
-            
-            # Combine date and time. The source format can vary, so we handle both.
-            full_datetime = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%Y %H:%M:%S")
-            data['Datetime'] = full_datetime.strftime('%Y-%m-%d %I:%M %p')
-
-            original_amount = float(amount_str)
-
-            if original_amount < 0:
-                expenses += abs(original_amount)
-                net_amount -= abs(original_amount)
-            else:
-                income += original_amount
-                net_amount += original_amount
-            
-            data['Type'] = 'Income' if original_amount >= 0 else 'Expense'
-            data['Amount'] = abs(original_amount)
-
-            # Create a clean description, only adding remarks if they exist and are not 'nan'
-            description = details
-            if remarks and not pd.isna(remarks) and remarks.lower() != 'nan':
-                description += f" | {remarks}"
-            data['Description'] = description
-            
-            data['Account'] = 'Infinity Tata Neu CC' # Set the account name
-            data['Category'] = '' # To be filled manually
-            data['Notes'] = '' # To be filled manually
-            data['Status'] = 'Pending' # Default status
-            
-            # --- NEW: Apply categorization rules ---
-            data = apply_categorization_rules(data, row)
-
-            transactions.append(data)
-
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Skipping row {index + header_row_index + 2} due to a parsing error: {e}. Row data: {row.to_dict()}")
-            continue
+    def text(column):
+        return df[column].map(str) if column in df else pd.Series('', index=df.index)
+
+    # --- Filter rows based on the 'Your Account' column ---
+    other_account = text('Your Account').str.strip() != CARD_ACCOUNT
+    if other_account.any():
+        logger.debug(f"Skipping {other_account.sum()} row(s) of other accounts: {sorted(text('Your Account')[other_account].str.strip().unique())}")
+    # Skip rows that are likely empty or malformed
+    df = df[~other_account & df['Date'].notna() & df['Amount'].notna()]
+
+    # Combine date and time, and parse the amounts, for all rows at once.
+    datetimes = pd.to_datetime(text('Date') + " " + text('Time'), format="%d/%m/%Y %H:%M:%S", errors='coerce')
+    amounts = pd.to_numeric(text('Amount').str.replace(',', '', regex=False), errors='coerce')
+    invalid = datetimes.isna() | amounts.isna()
+    for index in df.index[invalid]:
+        logger.warning(f"Skipping row {index + 1} due to a parsing error. Row data: {df.loc[index].to_dict()}")
+    df, datetimes, amounts = df[~invalid], datetimes[~invalid], amounts[~invalid]
+
+    is_expense = (amounts < 0).to_numpy()
+    expenses = -amounts[is_expense].sum()
+    income = amounts[~is_expense].sum()
     logger.info(f"Total Income: {income:.2f}")
     logger.info(f"Total Expenses: {expenses:.2f}")
-    logger.info(f"Net Amount: {net_amount:.2f}")
-    logger.info(f"Processed {len(transactions)} transactions successfully.")
+    logger.info(f"Net Amount: {income - expenses:.2f}")
+    logger.info(f"Processed {len(df)} transactions successfully.")
 
-    if not transactions:
+    if df.empty:
         logger.warning("No valid transactions were processed from the file.")
         return None
 
-    # Create the final DataFrame
-    final_df = pd.DataFrame(transactions)
-    
-    # Reorder columns to the desired format
-    output_columns = ['Type', 'Account', 'Category', 'Amount', 'Notes', 'Datetime', 'Status', 'Description']
-    final_df = final_df[output_columns]
-    
+    # Create a clean description, only adding remarks if they exist and are not 'nan'
+    details = text('Transaction Details')
+    remarks = text('Remarks')
+    has_remarks = remarks.str.lower() != 'nan'
+    description = details.where(~(has_remarks & (remarks != '')), details + " | " + remarks)
+    # The remarks, with their first letter capitalised, become the notes.
+    notes = (remarks.str[:1].str.upper() + remarks.str[1:]).where(has_remarks, '')
+
+    final_df = pd.DataFrame({
+        'Type': pd.Series(is_expense, index=df.index).map({True: 'Expense', False: 'Income'}),
+        'Account': 'Infinity Tata Neu CC',
+        'Category': categorize_details(details),
+        'Amount': amounts.abs().astype(float),
+        'Notes': notes,
+        'Datetime': datetimes.dt.strftime('%Y-%m-%d %I:%M %p'),
+        'Status': 'Pending', # Default status
+        'Description': description,
+    }).reset_index(drop=True)
     return final_df
 
 def main():
@@ -219,6 +157,10 @@ def main():
         return
 
     transactions_df = parse_tata_neu_excel(input_excel_file)
+    # Only rows after what earlier statements of this account already covered.
+    marks = HighWaterMarks()
+    marks.load()
+    transactions_df = marks.new_rows(transactions_df)
     pd.set_option('display.max_colwidth', None)
     logger.debug(f"Parsed DataFrame:\n{transactions_df.head(100) if transactions_df is not None else 'No transactions found.'}")
 
@@ -227,10 +169,15 @@ def main():
         input_dir = os.path.dirname(input_excel_file)
         output_excel_file = os.path.join(input_dir, f"{base_name}_processed.xlsx")
         
+        # Rows already added in an earlier run, or repeated by overlapping statements, are marked 'Duplicate'.
+        transactions_df = flag_duplicates(transactions_df)
+
         try:
             transactions_df.to_excel(output_excel_file, index=False)
             logger.success(f"Successfully processed {len(transactions_df)} transactions.")
             logger.success(f"Output saved to: {os.path.abspath(output_excel_file)}")
+            marks.advance(transactions_df)
+            marks.save()
         except Exception as e:
             logger.error(f"Failed to save the Excel file. Error: {e}")
 
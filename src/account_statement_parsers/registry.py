@@ -0,0 +1,74 @@
+import os
+import re
+import zipfile
+from loguru import logger
+
+from src.account_statement_parsers.hdfc_qif_parser import parse_hdfc_qif
+from src.account_statement_parsers.paytm_parse import parse_tata_neu_excel
+from src.account_statement_parsers.splitwise_parse import parse_splitwise_html_lxml
+
+# Bytes read from the start of a file to recognise its format.
+SNIFF_BYTES = 64 * 1024
+
+_QIF_HEADER_RE = re.compile(rb'^\s*!Type:\w+', re.IGNORECASE)
+_QIF_DATE_LINE_RE = re.compile(rb'^D\d{1,2}/\d{1,2}/\d{2,4}\s*$', re.MULTILINE)
+
+
+def _sniff_hdfc_qif(file_path, head):
+    return bool(_QIF_HEADER_RE.match(head) or _QIF_DATE_LINE_RE.search(head))
+
+def _sniff_tata_neu_excel(file_path, head):
+    """An .xlsx (a zip) whose workbook has the 'Passbook Payment History' sheet."""
+    if not head.startswith(b'PK'):
+        return False
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            return b'Passbook Payment History' in archive.read('xl/workbook.xml')
+    except (zipfile.BadZipFile, KeyError):
+        return False
+
+def _sniff_splitwise_html(file_path, head):
+    text = head.lower()
+    return (b'<html' in text or b'<!doctype html' in text) and b'splitwise' in text
+
+
+# Every statement format the ingest command understands: its parse function and how
+# to recognise a file from its content. The first parser whose sniffer accepts a file is used.
+PARSERS = {
+    'hdfc_qif': {'parse': parse_hdfc_qif, 'sniff': _sniff_hdfc_qif},
+    'tata_neu_excel': {'parse': parse_tata_neu_excel, 'sniff': _sniff_tata_neu_excel},
+    'splitwise_html': {'parse': parse_splitwise_html_lxml, 'sniff': _sniff_splitwise_html},
+}
+
+
+def detect_parser(file_path):
+    """
+    Recognises a statement file by its content, not its name.
+
+    Returns:
+        str: The name of the parser in PARSERS, or None if no parser accepts the file.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError as e:
+        logger.error(f"Could not read '{file_path}': {e}")
+        return None
+    for name, parser in PARSERS.items():
+        if parser['sniff'](file_path, head):
+            return name
+    return None
+
+def parse_statement(file_path, parser_name=None, **options):
+    """
+    Parses a statement with the given parser, or the one `detect_parser` picks.
+    Extra keyword arguments are passed on to the parse function.
+
+    Returns:
+        pandas.DataFrame: The parser's output in the processed Excel layout, or None.
+    """
+    parser_name = parser_name or detect_parser(file_path)
+    if parser_name is None:
+        logger.warning(f"No parser recognises '{os.path.basename(file_path)}'. Skipping it.")
+        return None
+    return PARSERS[parser_name]['parse'](file_path, **options)
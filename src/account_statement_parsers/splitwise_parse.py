@@ -4,39 +4,134 @@ from loguru import logger
 import sys
 import os
 from bs4 import BeautifulSoup
+from lxml import etree
 
+from src.utils.duplicate_index import flag_duplicates
+from src.utils.high_water_marks import HighWaterMarks
+from src.utils.rule_engine import load_rule_engine
 
-def apply_splitwise_categorization_rules(description):
+
+def categorize_expenses(df):
     """
-    Applies a set of predefined rules to automatically categorize a transaction
-    based on its full description string.
+    Fills the category of the expense rows from their descriptions, using the
+    'splitwise' rules of the categorization rules file (see `load_rule_engine`).
+    Transfers keep their category (the destination account).
 
     Args:
-        description (str): The full description of the transaction 
-                           (e.g., "Groceries | Boiled eggs | Gaurav V. | 91.0").
-    
+        df (pd.DataFrame): The parsed transactions.
+
     Returns:
-        str: The determined category, or an empty string if no rule matches.
+        pd.DataFrame: The same DataFrame, with categories filled.
     """
-    # --- Define Your Custom Rules Here ---
-    # The script will check each rule in order. The FIRST rule that matches will be applied.
-    # The keyword is case-insensitive and is checked against the full description.
-    CATEGORIZATION_RULES = [
-        {"keywords": ["Groceries"], "category": "Groceries"},
-        # {"keywords": ["Home"], "category": "Home"},
-        # {"keywords": ["trip", "vacation"], "category": "Vacation"},
-        {"keywords": ["sports", "cricket", "badminton"], "category": "Sports"},
-        # --- Add more rules as needed ---
-    ]
-
-    for rule in CATEGORIZATION_RULES:
-        for keyword in rule['keywords']:
-            if keyword.lower() in description.lower():
-                logger.debug(f"Rule matched for description '{description}' with keyword '{keyword}'. Applying category '{rule['category']}'.")
-                return rule['category']
-    
-    logger.warning(f"No category rule found for description: '{description}'. It will be left blank.")
-    return ""
+    engine = load_rule_engine('splitwise')
+    is_expense = df['Type'] == 'Expense'
+    df.loc[is_expense, 'Category'] = engine.categorize(df.loc[is_expense, 'Description'])
+    engine.log_hits()
+    return df
+
+def _expense_entries(title, group, full_datetime, you_text, share_text, cost_text, total_paid_text, payer_info):
+    """
+    Builds the transaction rows of one expense from the texts extracted from its block.
+
+    Args:
+        title (str): The expense's title.
+        group (str): The group name, or "Non-group".
+        full_datetime (datetime): When the expense was made.
+        you_text (str): The lower-cased text of the '.you' element (the user's share).
+        share_text (str): The text of the user's share amount, or None if the block shows none.
+        cost_text (str): The lower-cased text of the '.cost' element (who paid).
+        total_paid_text (str): The text of the total amount.
+        payer_info (str): The '.cost' text before " paid", i.e. the payer.
+
+    Returns:
+        list: Zero, one or two transaction rows.
+    """
+    # --- Determine who paid and what the user's share is ---
+    user_share = 0.0
+    if 'you borrowed' in you_text and 'nothing' in you_text:
+        user_share = 0.0
+    elif share_text is not None:
+        user_share = float(share_text.replace('₹', '').replace(',', ''))
+    else:
+        logger.warning(f"Could not find amount for transaction '{title}'. Assuming share is 0.")
+
+    paid_by_you = 'you paid' in cost_text
+    multiple_payers = 'people paid' in cost_text
+    total_paid = float(total_paid_text.replace('₹', '').replace(',', ''))
+    payer = "You" if paid_by_you else payer_info
+
+    # --- Generate Transaction Records Based on Logic ---
+    base_data = {
+        'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
+        'Notes': title,
+        'Status': 'Pending',
+        'Description': f"{group} | {title} | {payer} | {total_paid}"
+    }
+    def entry(tx_type, account, category, amount):
+        data = base_data.copy()
+        data.update({'Type': tx_type, 'Account': account, 'Category': category, 'Amount': amount})
+        return data
+
+    transactions = []
+    if multiple_payers:
+        # Case 1: Multiple people paid. Create a single net expense entry.
+        if user_share > 0.01:
+            transactions.append(entry('Expense', 'Splitwise', '', user_share)) # Category filled by categorize_expenses
+    elif paid_by_you:
+        # Case 2: You paid. This creates two entries.
+        your_expense_amount = total_paid - user_share
+        if your_expense_amount > 0.01:
+            transactions.append(entry('Expense', 'Splitwise', '', your_expense_amount))
+        if user_share > 0.01:
+            transactions.append(entry('Transfer', 'X', 'Splitwise', user_share))
+    else:
+        # Case 3: Someone else paid. This is a simple expense for you.
+        if user_share > 0.01:
+            transactions.append(entry('Expense', 'Splitwise', '', user_share))
+    return transactions
+
+def _expense_datetime(iso_datetime, month_text, day_text):
+    """
+    Combines the visible day and month of an expense with the year and time of its
+    ISO timestamp, which is more reliable than the timestamp's date alone.
+    """
+    timestamp = datetime.fromisoformat(iso_datetime.replace('Z', '+00:00'))
+    reliable_date_str = f"{day_text} {month_text} {timestamp:%Y} {timestamp:%H:%M:%S}"
+    return datetime.strptime(reliable_date_str, "%d %b %Y %H:%M:%S")
+
+def _payment_entry(iso_datetime, full_description, amount_text, cost_text):
+    """
+    Builds the transfer row of one settlement payment, or None if the user is neither payer nor payee.
+    """
+    full_datetime = datetime.fromisoformat(iso_datetime.replace('Z', '+00:00'))
+    cleaned_description = full_description.split(' in “')[0].strip()
+    payment_data = {
+        'Type': 'Transfer',
+        'Amount': float(amount_text.replace('₹', '').replace(',', '')),
+        'Notes': cleaned_description,
+        'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
+        'Status': 'Pending',
+        'Description': f"Settlement | {cleaned_description}"
+    }
+    if 'you paid' in cost_text:
+        payment_data['Account'] = 'X'
+        payment_data['Category'] = 'Splitwise'
+    elif 'you received' in cost_text:
+        payment_data['Account'] = 'Splitwise'
+        payment_data['Category'] = 'X'
+    else:
+        return None
+    return payment_data
+
+def _to_frame(transactions):
+    """Builds the output DataFrame of either parser and categorises its expenses."""
+    if not transactions:
+        logger.warning("No valid and involved transactions were processed from the file.")
+        return None
+
+    df = pd.DataFrame(transactions)
+    output_columns = ['Type', 'Account', 'Category', 'Amount', 'Notes', 'Datetime', 'Status', 'Description']
+    return categorize_expenses(df[output_columns])
 
 def parse_splitwise_html(file_path):
     """
@@ -44,6 +139,7 @@ def parse_splitwise_html(file_path):
 
     The script uses BeautifulSoup to find all expense blocks, determines who paid
     and what the user's share is, and generates one or two transaction rows accordingly.
+    `parse_splitwise_html_lxml` produces the same output faster.
 
     Args:
         file_path (str): The full path to the .html file.
@@ -82,147 +178,160 @@ def parse_splitwise_html(file_path):
         datetime_str = date_element['title'] if date_element and 'title' in date_element.attrs else None
         if not datetime_str:
             continue
-
-        # --- NEW: More reliable date parsing ---
-        # Extract time from the full timestamp
-        time_part = datetime.fromisoformat(datetime_str.replace('Z', '+00:00')).strftime('%H:%M:%S')
-        # Extract visible date parts
         month_text = date_element.get_text(strip=True, separator=' ').split(' ')[0]
         day_text = date_element.find("div", class_="number").get_text(strip=True)
-        year_text = datetime.fromisoformat(datetime_str.replace('Z', '+00:00')).strftime('%Y')
-        # Combine into a reliable date string and parse
-        reliable_date_str = f"{day_text} {month_text} {year_text} {time_part}"
-        full_datetime = datetime.strptime(reliable_date_str, "%d %b %Y %H:%M:%S")
-
 
-        # --- Determine who paid and what the user's share is ---
         cost_div = expense.select_one('.cost')
         you_div = expense.select_one('.you')
-        
-        user_share = 0.0
-        you_text = you_div.get_text(strip=True, separator=' ').lower()
-        
-        if 'you borrowed' in you_text and 'nothing' in you_text:
-            user_share = 0.0
-        else:
-            amount_element = you_div.select_one('.amount, .positive, .negative')
-            if amount_element:
-                amount_text = amount_element.get_text(strip=True).replace('₹', '').replace(',', '')
-                user_share = float(amount_text)
-            else:
-                logger.warning(f"Could not find amount for transaction '{title}'. Assuming share is 0.")
-
-        cost_text = cost_div.get_text(strip=True, separator=' ').lower()
-        paid_by_you = 'you paid' in cost_text
-        multiple_payers = 'people paid' in cost_text
-        
-        total_paid_text = cost_div.select_one('.number').get_text(strip=True).replace('₹', '').replace(',', '')
-        total_paid = float(total_paid_text)
-        
-        payer_info = cost_div.get_text(" ", strip=True).split(" paid")[0]
-        payer = "You" if paid_by_you else payer_info
-
-        # --- Generate Transaction Records Based on Logic ---
-        base_data = {
-            'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
-            'Notes': title,
-            'Status': 'Pending',
-            'Description': f"{group} | {title} | {payer} | {total_paid}"
-        }
-
-        if multiple_payers:
-            # Case 1: Multiple people paid. Create a single net expense entry.
-            if user_share > 0.01:
-                expense_entry = base_data.copy()
-                expense_entry.update({
-                    'Type': 'Expense',
-                    'Account': 'Splitwise',
-                    'Category': apply_splitwise_categorization_rules(expense_entry['Description']),
-                    'Amount': user_share,
-                })
-                transactions.append(expense_entry)
-        elif paid_by_you:
-            # Case 2: You paid. This creates two entries.
-            your_expense_amount = total_paid - user_share
-            
-            if your_expense_amount > 0.01:
-                expense_entry = base_data.copy()
-                expense_entry.update({
-                    'Type': 'Expense',
-                    'Account': 'Splitwise',
-                    'Category': apply_splitwise_categorization_rules(expense_entry['Description']),
-                    'Amount': your_expense_amount,
-                })
-                transactions.append(expense_entry)
-
-            if user_share > 0.01:
-                transfer_entry = base_data.copy()
-                transfer_entry.update({
-                    'Type': 'Transfer',
-                    'Account': 'X',
-                    'Category': 'Splitwise',
-                    'Amount': user_share,
-                })
-                transactions.append(transfer_entry)
-
-        else:
-            # Case 3: Someone else paid. This is a simple expense for you.
-            if user_share > 0.01:
-                expense_entry = base_data.copy()
-                expense_entry.update({
-                    'Type': 'Expense',
-                    'Account': 'Splitwise',
-                    'Category': apply_splitwise_categorization_rules(expense_entry['Description']),
-                    'Amount': user_share,
-                })
-                transactions.append(expense_entry)
+        amount_element = you_div.select_one('.amount, .positive, .negative')
+        transactions.extend(_expense_entries(
+            title, group, _expense_datetime(datetime_str, month_text, day_text),
+            you_div.get_text(strip=True, separator=' ').lower(),
+            amount_element.get_text(strip=True) if amount_element else None,
+            cost_div.get_text(strip=True, separator=' ').lower(),
+            cost_div.select_one('.number').get_text(strip=True),
+            cost_div.get_text(" ", strip=True).split(" paid")[0],
+        ))
             
     # --- Process settlement payments ---
     payment_blocks = soup.select('#expenses_list > .expense.summary.payment.involved')
     logger.info(f"Found {len(payment_blocks)} potential settlement entries.")
     for payment in payment_blocks:
-        datetime_str = payment['data-date']
-        full_datetime = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
-        
         description_element = payment.select_one('.description a')
-        full_description = description_element.get_text(" ", strip=True) if description_element else "Unknown Payment"
-        
-        cleaned_description = full_description.split(' in “')[0].strip()
-        
-        amount_element = payment.select_one('.you .positive, .you .negative')
-        amount = float(amount_element.get_text(strip=True).replace('₹', '').replace(',', ''))
-
-        cost_text = payment.select_one('.cost').get_text(strip=True).lower()
-        
-        payment_data = {
-            'Type': 'Transfer',
-            'Amount': amount,
-            'Notes': cleaned_description,
-            'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
-            'Status': 'Pending',
-            'Description': f"Settlement | {cleaned_description}"
-        }
-
-        if 'you paid' in cost_text:
-            payment_data['Account'] = 'X'
-            payment_data['Category'] = 'Splitwise'
-        elif 'you received' in cost_text:
-            payment_data['Account'] = 'Splitwise'
-            payment_data['Category'] = 'X'
-        else:
-            continue
+        payment_data = _payment_entry(
+            payment['data-date'],
+            description_element.get_text(" ", strip=True) if description_element else "Unknown Payment",
+            payment.select_one('.you .positive, .you .negative').get_text(strip=True),
+            payment.select_one('.cost').get_text(strip=True).lower(),
+        )
+        if payment_data:
+            transactions.append(payment_data)
+
+    return _to_frame(transactions)
+
+
+def _class_test(*names):
+    """XPath predicate: the element has every one of the given classes."""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names)
+
+# Precompiled XPath expressions, equivalent to the CSS selectors of parse_splitwise_html.
+_EXPENSE_BLOCKS = etree.XPath(f"//*[@id='expenses_list']/*[{_class_test('expense')}][not(.//*[{_class_test('payment')}])]")
+_PAYMENT_BLOCKS = etree.XPath(f"//*[@id='expenses_list']/*[{_class_test('expense', 'summary', 'payment', 'involved')}]")
+_UNINVOLVED = etree.XPath(f"boolean(.//*[{_class_test('summary', 'uninvolved')}])")
+_TITLE = etree.XPath(f"(.//*[{_class_test('description')}]//a)[1]")
+_GROUP = etree.XPath(f"(.//*[{_class_test('label', 'group')}])[1]")
+_DATE = etree.XPath(f"(.//*[{_class_test('date')}])[1]")
+_DAY = etree.XPath(f"(.//div[{_class_test('number')}])[1]")
+_COST = etree.XPath(f"(.//*[{_class_test('cost')}])[1]")
+_YOU = etree.XPath(f"(.//*[{_class_test('you')}])[1]")
+_SHARE = etree.XPath(f"(.//*[{_class_test('amount')} or {_class_test('positive')} or {_class_test('negative')}])[1]")
+_NUMBER = etree.XPath(f"(.//*[{_class_test('number')}])[1]")
+_PAYMENT_AMOUNT = etree.XPath(f"(.//*[{_class_test('you')}]//*[{_class_test('positive')} or {_class_test('negative')}])[1]")
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+# Text nodes as BeautifulSoup's get_text sees them: no comments, scripts, styles or templates.
+_TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+def _text(element, separator=''):
+    """The element's text like BeautifulSoup's get_text(separator, strip=True)."""
+    return separator.join(text.strip() for text in _TEXT_NODES(element) if text.strip())
+
+def parse_splitwise_html_lxml(file_path, seen_ids=None):
+    """
+    Parses a saved Splitwise HTML file with lxml and precompiled XPath expressions.
 
-        transactions.append(payment_data)
+    Produces the same output as `parse_splitwise_html`, but without building a
+    BeautifulSoup tree: the expense list is walked once and every field is read
+    with a compiled XPath relative to its block.
 
+    Args:
+        file_path (str): The full path to the .html file.
+        seen_ids (set, optional): IDs of entries parsed by an earlier run (see
+                                  HighWaterMarks). Their blocks are skipped unread.
 
-    if not transactions:
-        logger.warning("No valid and involved transactions were processed from the file.")
+    Returns:
+        pandas.DataFrame: A DataFrame containing the parsed transactions, or None.
+                          `df.attrs['expense_ids']` maps each group to the IDs of
+                          the entries read in this run.
+    """
+    try:
+        tree = etree.parse(file_path, etree.HTMLParser(encoding='utf-8'))
+    except OSError as e:
+        if not os.path.exists(file_path):
+            logger.error(f"Error: The file '{file_path}' was not found.")
+        else:
+            logger.error(f"An error occurred while reading the file: {e}")
         return None
 
-    df = pd.DataFrame(transactions)
-    output_columns = ['Type', 'Account', 'Category', 'Amount', 'Notes', 'Datetime', 'Status', 'Description']
-    df = df[output_columns]
-    
+    seen_ids = seen_ids or set()
+    ids_by_group = {}
+    skipped = 0
+    def record_id(block, group):
+        if block.get('id'):
+            ids_by_group.setdefault(group, []).append(block.get('id'))
+
+    transactions = []
+    expense_blocks = _EXPENSE_BLOCKS(tree)
+    logger.info(f"Found {len(expense_blocks)} potential expense entries.")
+    for expense in expense_blocks:
+        # Entries an earlier run parsed are skipped before any field is read.
+        if expense.get('id') in seen_ids:
+            skipped += 1
+            continue
+        group_element = _first(_GROUP, expense)
+        group = _text(group_element) if group_element is not None else "Non-group"
+        record_id(expense, group)
+        # Skip entries where the user is not involved at all
+        if _UNINVOLVED(expense):
+            continue
+        date_element = _first(_DATE, expense)
+        datetime_str = date_element.get('title') if date_element is not None else None
+        if not datetime_str:
+            continue
+
+        title_element = _first(_TITLE, expense)
+        cost_div = _first(_COST, expense)
+        you_div = _first(_YOU, expense)
+        amount_element = _first(_SHARE, you_div)
+        transactions.extend(_expense_entries(
+            _text(title_element) if title_element is not None else "Unknown",
+            group,
+            _expense_datetime(datetime_str, _text(date_element, ' ').split(' ')[0], _text(_first(_DAY, date_element))),
+            _text(you_div, ' ').lower(),
+            _text(amount_element) if amount_element is not None else None,
+            _text(cost_div, ' ').lower(),
+            _text(_first(_NUMBER, cost_div)),
+            _text(cost_div, ' ').split(" paid")[0],
+        ))
+
+    payment_blocks = _PAYMENT_BLOCKS(tree)
+    logger.info(f"Found {len(payment_blocks)} potential settlement entries.")
+    for payment in payment_blocks:
+        if payment.get('id') in seen_ids:
+            skipped += 1
+            continue
+        description_element = _first(_TITLE, payment)
+        full_description = _text(description_element, ' ') if description_element is not None else "Unknown Payment"
+        # A payment names its group at the end of its description: '... in “Flat”'.
+        group = full_description.split(' in “')[1].rstrip('”') if ' in “' in full_description else "Non-group"
+        record_id(payment, group)
+        payment_data = _payment_entry(
+            payment.get('data-date'),
+            full_description,
+            _text(_first(_PAYMENT_AMOUNT, payment)),
+            _text(_first(_COST, payment)).lower(),
+        )
+        if payment_data:
+            transactions.append(payment_data)
+
+    if skipped:
+        logger.info(f"Skipped {skipped} entries parsed by an earlier run.")
+    df = _to_frame(transactions)
+    if df is not None:
+        df.attrs['expense_ids'] = ids_by_group
     return df
 
 def main():
@@ -240,7 +349,10 @@ def main():
         logger.error("The provided file path does not exist. Please check the path and try again.")
         return
 
-    transactions_df = parse_splitwise_html(input_html_file)
+    # Entries parsed from an earlier export are skipped.
+    marks = HighWaterMarks()
+    marks.load()
+    transactions_df = parse_splitwise_html_lxml(input_html_file, seen_ids=marks.seen_ids())
 
     if transactions_df is not None and not transactions_df.empty:
         pd.set_option('display.max_rows', None)
@@ -256,10 +368,15 @@ def main():
         logger.debug(f"Base name for output: {base_name}")
         logger.debug(f"Output Excel file will be: {output_excel_file}")
         
+        # Rows already added in an earlier run, or repeated by overlapping statements, are marked 'Duplicate'.
+        transactions_df = flag_duplicates(transactions_df)
+
         try:
             transactions_df.to_excel(output_excel_file, index=False)
             logger.success(f"Successfully processed and generated {len(transactions_df)} transaction records.")
             logger.success(f"Output saved to: {os.path.abspath(output_excel_file)}")
+            marks.add_ids(transactions_df.attrs.get('expense_ids', {}))
+            marks.save()
         except Exception as e:
             logger.error(f"Failed to save the Excel file. Error: {e}")
 
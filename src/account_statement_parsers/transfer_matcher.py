@@ -0,0 +1,173 @@
+import pandas as pd
+import numpy as np
+from loguru import logger
+import sys
+import os
+
+from src.transaction import EXCEL_COLUMNS, EXCEL_DATETIME_FORMAT
+
+# Placeholder the Splitwise parser uses for the bank side of a settlement.
+PLACEHOLDER_ACCOUNT = 'X'
+# Accounts whose expense rows are shares of a split bill, not money leaving an account.
+NON_CASH_ACCOUNTS = {'Splitwise'}
+# The two sides of a card bill payment or a settlement can be booked up to this far apart.
+DEFAULT_WINDOW_MINUTES = 24 * 60
+
+
+def _legs(df):
+    """
+    Finds the rows that can be one side of a transfer.
+
+    Outflows are uncategorised expenses (money left the account for an unknown
+    destination) and transfers to the placeholder account. Inflows are
+    uncategorised income and transfers from the placeholder account.
+
+    Returns:
+        tuple: (outflows, inflows), DataFrames with the row label, account, amount
+               in paise and minute of each leg.
+    """
+    types = df['Type'].fillna('Expense').str.lower()
+    uncategorised = df['Category'].fillna('').astype(str).str.strip().eq('')
+    cash = ~df['Account'].isin(NON_CASH_ACCOUNTS)
+    to_placeholder = types.eq('transfer') & df['Category'].eq(PLACEHOLDER_ACCOUNT)
+    from_placeholder = types.eq('transfer') & df['Account'].eq(PLACEHOLDER_ACCOUNT)
+
+    paise = np.rint(pd.to_numeric(df['Amount']).to_numpy(dtype=np.float64) * 100).astype(np.int64)
+    minutes = pd.to_datetime(df['Datetime'], format=EXCEL_DATETIME_FORMAT).to_numpy(dtype='datetime64[m]').astype(np.int64)
+    legs = pd.DataFrame({'row': df.index, 'paise': paise, 'minute': minutes})
+
+    outflow = (types.eq('expense') & uncategorised & cash) | to_placeholder
+    inflow = (types.eq('income') & uncategorised & cash) | from_placeholder
+    # A transfer from the placeholder brings money into its destination (the category).
+    inflow_account = df['Account'].where(~from_placeholder, df['Category'])
+
+    outflows = legs[outflow.to_numpy()].assign(account=df['Account'][outflow].to_numpy())
+    inflows = legs[inflow.to_numpy()].assign(account=inflow_account[inflow].to_numpy())
+    return (outflows.sort_values(['paise', 'minute'], kind='stable').reset_index(drop=True),
+            inflows.sort_values(['paise', 'minute'], kind='stable').reset_index(drop=True))
+
+def _pair_legs(outflows, inflows, window_minutes):
+    """
+    Sort-merge band join of the legs on amount, then time.
+
+    Both inputs are sorted by (amount, minute). The merge walks the two lists
+    in step, one amount group at a time; within a group each outflow takes the
+    earliest unused inflow of another account within the window. Every leg is
+    passed over a bounded number of times, so the join is linear after sorting.
+
+    Returns:
+        list: (outflow row label, inflow row label, source account, destination account) tuples.
+    """
+    out_paise, in_paise = outflows['paise'].to_numpy(), inflows['paise'].to_numpy()
+    out_minute, in_minute = outflows['minute'].to_numpy(), inflows['minute'].to_numpy()
+    out_account, in_account = outflows['account'].to_numpy(), inflows['account'].to_numpy()
+    pairs = []
+    i = j = 0
+    while i < len(outflows) and j < len(inflows):
+        if out_paise[i] < in_paise[j]:
+            i += 1
+            continue
+        if out_paise[i] > in_paise[j]:
+            j += 1
+            continue
+        # Both pointers are at the start of the same amount group.
+        amount = out_paise[i]
+        out_end, in_end = i, j
+        while out_end < len(outflows) and out_paise[out_end] == amount:
+            out_end += 1
+        while in_end < len(inflows) and in_paise[in_end] == amount:
+            in_end += 1
+
+        used = set()
+        start = j
+        for o in range(i, out_end):
+            while start < in_end and in_minute[start] < out_minute[o] - window_minutes:
+                start += 1
+            k = start
+            while k < in_end and in_minute[k] <= out_minute[o] + window_minutes:
+                if k not in used and in_account[k] != out_account[o]:
+                    used.add(k)
+                    pairs.append((outflows['row'].iat[o], inflows['row'].iat[k], out_account[o], in_account[k]))
+                    break
+                k += 1
+        i, j = out_end, in_end
+    return pairs
+
+def _joined(*texts):
+    return " | ".join(str(text) for text in texts if not pd.isna(text) and str(text).strip())
+
+def match_transfers(frames, window_minutes=DEFAULT_WINDOW_MINUTES):
+    """
+    Collapses the two sides of a transfer found in different statements into one Transfer row.
+
+    A credit card bill payment appears as an HDFC expense and as a Tata Neu
+    income; a Splitwise settlement appears in Splitwise (against the
+    placeholder account 'X') and in the bank statement. Rows with the same
+    amount, from different accounts and at most `window_minutes` apart, are
+    replaced by a single Transfer from the paying account to the receiving one,
+    which also resolves the placeholder.
+
+    Args:
+        frames (list): Parser outputs in the processed Excel layout.
+        window_minutes (int): Maximum time between the two sides of a transfer.
+
+    Returns:
+        pd.DataFrame: All rows, with each matched pair replaced by one Transfer row
+                      at the position of its outgoing side.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)[EXCEL_COLUMNS]
+    pairs = _pair_legs(*_legs(df), window_minutes)
+
+    for out_row, in_row, source, destination in pairs:
+        outgoing, incoming = df.loc[out_row], df.loc[in_row]
+        logger.debug(f"Transfer {source} -> {destination}: {outgoing['Amount']} "
+                     f"('{outgoing['Description']}' / '{incoming['Description']}')")
+        df.loc[out_row, ['Type', 'Account', 'Category', 'Notes', 'Description']] = [
+            'Transfer', source, destination,
+            _joined(outgoing['Notes']) or _joined(incoming['Notes']),
+            _joined(outgoing['Description'], incoming['Description']),
+        ]
+    df = df.drop(index=[in_row for _, in_row, _, _ in pairs]).reset_index(drop=True)
+
+    unresolved = (df['Account'].eq(PLACEHOLDER_ACCOUNT) | df['Category'].eq(PLACEHOLDER_ACCOUNT)).sum()
+    logger.info(f"Matched {len(pairs)} transfer(s) across statements.")
+    if unresolved:
+        logger.warning(f"{unresolved} row(s) still use the placeholder account '{PLACEHOLDER_ACCOUNT}'. Set their account manually.")
+    return df
+
+
+def main():
+    """
+    Main function to execute the script.
+    Prompts for processed statement files and writes them, with transfers matched, to one Excel file.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
+
+    logger.info("--- Match Transfers Across Processed Statements ---")
+    input_files = []
+    while True:
+        path = input("Enter the full path to a _processed.xlsx file (leave empty to finish): ").strip().strip('"')
+        if not path:
+            break
+        if not os.path.exists(path):
+            logger.error("The provided file path does not exist. Please check the path and try again.")
+            continue
+        input_files.append(path)
+    if not input_files:
+        return
+
+    transactions_df = match_transfers([pd.read_excel(path) for path in input_files])
+    output_excel_file = os.path.join(os.path.dirname(input_files[0]), "transfers_matched_processed.xlsx")
+    try:
+        transactions_df.to_excel(output_excel_file, index=False)
+        logger.success(f"Successfully wrote {len(transactions_df)} transactions.")
+        logger.success(f"Output saved to: {os.path.abspath(output_excel_file)}")
+    except Exception as e:
+        logger.error(f"Failed to save the Excel file. Error: {e}")
+
+if __name__ == '__main__':
+    main()
@@ -8,10 +8,16 @@ class BaseAppCoordinates:
         self.phone_name = "Generic Phone"
         self.model_name = "GenericModel"
         self.app_package_name = "com.raha.app.mymoney.pro"
+        # Launcher activity used to restart the app during recovery (None uses the launcher intent).
+        self.app_launch_activity = None
 
         # --- General Timings ---
         self.SHORT_DELAY = 0.1
         self.LONG_DELAY = 0.6
+        # Maximum time to wait for an expected screen to appear (see ScreenClassifier).
+        self.SCREEN_CHECK_TIMEOUT = 3.0
+        # Time the app needs to start after being relaunched during recovery.
+        self.APP_LAUNCH_DELAY = 3.0
 
         # --- Navigation Coordinates ---
         self.initiate_new_entry_coords = None
@@ -26,6 +32,12 @@ class BaseAppCoordinates:
         self.date_picker_entry_coords = None
         self.time_picker_entry_coords = None
         self.notes_section_coords = None
+        # Optional screen regions (x1, y1, x2, y2) that show the account/category
+        # currently selected on the form. When set, prefilled fields are detected
+        # with OCR and not selected again.
+        self.account_field_left_region = None
+        self.account_field_right_region = None
+        self.category_field_region = None
 
         # --- Amount Keypad ---
         self.keypad_coords = {}
@@ -36,6 +48,22 @@ class BaseAppCoordinates:
         self.date_grid_x_coords = []
         self.date_grid_y_coords = []
         self.date_ok_coords = None
+        # True if the picker opens on the last chosen date instead of today.
+        # The date is only tracked once its entry is saved; after a discarded form
+        # or an app restart the picker is assumed to open on today again. The
+        # picker header is not read back, so if the app behaves differently the
+        # month navigation starts from the wrong month: leave this False then.
+        self.date_picker_remembers_last_date = False
+        # Optional year jump: the year in the dialog header opens a year list
+        # centred on the current year, one year per `date_year_list_row_height` pixels.
+        self.date_year_header_coords = None
+        self.date_year_list_center_coords = None
+        self.date_year_list_row_height = 0
+        self.date_year_list_visible_years = 2  # Years reachable above/below the centre without scrolling
+        # Optional text input mode (pencil icon) to type the date directly.
+        self.date_text_input_mode_coords = None
+        self.date_text_input_field_coords = None
+        self.date_text_input_format = "%d/%m/%Y"
 
         # --- Time Picker Dialog ---
         self.time_keypad_mode_coords = None
@@ -44,9 +72,36 @@ class BaseAppCoordinates:
         self.time_ampm_selector_coords = None
         self.time_ampm_coords = {}
         self.time_ok_coords = None
+        # True if the dialog reopens in keyboard mode once it has been switched to it.
+        self.time_picker_remembers_keypad_mode = False
+        # The time a new entry form shows (e.g. "12:00 AM"), or None if it shows the current time.
+        self.default_form_time = None
+        # Key that moves the cursor from the hour field to the minute field.
+        self.time_field_advance_keycode = "KEYCODE_TAB"
 
         # --- Scrolling / Swiping ---
         self.swipe_coords = None
+
+        # --- Transaction List (entry verification) ---
+        # Region (x1, y1, x2, y2) of the main screen's transaction list that shows the latest entries.
+        self.transaction_list_region = None
+        # Height of one list item; text within this distance of an item's top belongs to it.
+        self.transaction_list_row_height = 150
+        # How the list is read: 'ocr' (screenshot) or 'hierarchy' (uiautomator dump, no OCR).
+        self.transaction_list_source = "ocr"
+
+        # --- Accounts Page (balance reconciliation) ---
+        # The button on the main screen that opens the accounts page with the balances.
+        self.accounts_page_coords = None
+        # The button that leads back to the main screen from there (None presses BACK).
+        self.accounts_page_exit_coords = None
+        # Screen regions (x1, y1, x2, y2) of the account name and balance columns on that page.
+        self.account_name_column_region = None
+        self.account_balance_column_region = None
+        # Swipes needed to see every account (0 if they all fit on one page).
+        self.accounts_page_swipes = 0
+        # Maximum vertical distance between an account name and its balance on the same row.
+        self.account_row_tolerance_pixels = 40
         
         # --- OCR Configuration ---
         self.account_list_crop_pixels = 0
@@ -9,6 +9,7 @@ class S24UCoordinates(BaseAppCoordinates):
     This makes the script portable to different devices and screen resolutions.
     """
     def __init__(self):
+        super().__init__()
         # --- App Specific Configuration ---
         # CRITICAL: You must find and set the package name for MyMoneyPro.
         # See the README for instructions on how to find this.
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from loguru import logger
+import pandas as pd
+
+from src.data_loader import iter_pending_transactions, DATETIME_FORMAT
+from src.benchmarks.synthetic import synthetic_master
+
+MASTER_ROWS = 200_000
+PENDING_ROWS = 50
+
+
+def _load_with_pandas(file_path):
+    """The previous loader: read the whole sheet, then filter the pending rows."""
+    df = pd.read_excel(file_path)
+    df.columns = [col.lower() for col in df.columns]
+    pending_df = df[df['status'].str.lower() == 'pending'].copy()
+    pending_df['original_index'] = pending_df.index
+    pending_df['datetime'] = pd.to_datetime(pending_df['datetime'], format=DATETIME_FORMAT)
+    return pending_df.to_dict('records')
+
+def _measure(load, file_path):
+    """Returns (seconds, peak MB, transactions). Time and memory are measured in separate passes."""
+    start_time = time.perf_counter()
+    transactions = load(file_path)
+    seconds = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    load(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, transactions
+
+
+def main():
+    """
+    Compares the memory and time of loading the pending rows of a large master
+    file with pandas against the streaming loader (openpyxl and, if installed, calamine).
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Master File Loader Benchmark ---")
+    loaders = {
+        'pandas read_excel': _load_with_pandas,
+        'streaming (openpyxl)': lambda path: list(iter_pending_transactions(path, engine='openpyxl')),
+    }
+    try:
+        import python_calamine  # noqa: F401
+        loaders['streaming (calamine)'] = lambda path: list(iter_pending_transactions(path, engine='calamine'))
+    except ImportError:
+        logger.warning("python-calamine is not installed; skipping the calamine engine.")
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "master.xlsx")
+        logger.info(f"Building a synthetic master with {MASTER_ROWS} rows ({PENDING_ROWS} pending)...")
+        synthetic_master(MASTER_ROWS, pending=PENDING_ROWS).to_excel(file_path, index=False)
+
+        results = []
+        for name, load in loaders.items():
+            logger.info(f"Measuring {name}...")
+            seconds, peak_mb, transactions = _measure(load, file_path)
+            if len(transactions) != PENDING_ROWS:
+                logger.error(f"{name} found {len(transactions)} pending rows instead of {PENDING_ROWS}.")
+            results.append((name, seconds, peak_mb))
+
+    logger.info("="*50)
+    logger.info(f"{'Loader':<22} | {'Time':>7} | {'Peak memory':>11}")
+    for name, seconds, peak_mb in results:
+        logger.info(f"{name:<22} | {seconds:>6.2f}s | {peak_mb:>8.1f} MB")
+    logger.info("Note: tracemalloc only sees Python allocations, not calamine's native buffers.")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
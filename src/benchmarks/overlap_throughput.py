@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+from loguru import logger
+
+from src.mymoneypro_automator import MyMoneyProAutomator
+from src.mymoney_automater_v2 import process_transactions
+from src.data_loader import load_transactions_from_excel
+from src.utils.progress_journal import ProgressJournal, assign_fingerprints, default_journal_path, merge_journal_into_excel
+
+# Both modes verify entries and reconcile balances, the OCR work that overlap hides.
+VERIFY_EVERY = 5
+
+
+def _timed_run(transactions, overlap, journal):
+    """Enters the transactions with or without overlap and returns (entries added, seconds)."""
+    added = []
+    def on_status(transaction, status):
+        journal.record(transaction, status)
+        if status == 'Added':
+            added.append(transaction)
+    automator = MyMoneyProAutomator(overlap=overlap)
+    start_time = time.perf_counter()
+    process_transactions(automator, transactions, on_status, reconcile=True, verify_every=VERIFY_EVERY)
+    return len(added), time.perf_counter() - start_time
+
+
+def main():
+    """
+    Measures the entry throughput with and without host/device overlap.
+
+    The pending rows of the given file are entered on the phone: the first half
+    without overlap, the second half with it. Both halves verify the entries
+    against the transaction list and reconcile the balances, so set up
+    `transaction_list_region` and the accounts page columns for the device.
+    This adds real entries, so use a copy of the master file with a few test
+    transactions and delete them in the app afterwards. Their statuses are
+    written back to the file.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Host/Device Overlap Throughput ---")
+    input_excel_file = input("Please enter the full path to a test .xlsx file with pending rows: ").strip().strip('"')
+    if not os.path.exists(input_excel_file):
+        logger.error("The provided file path does not exist. Please check the path and try again.")
+        return
+    transactions = assign_fingerprints(load_transactions_from_excel(input_excel_file))
+    if len(transactions) < 2:
+        logger.error("At least two pending transactions are needed, one for each mode.")
+        return
+
+    journal = ProgressJournal(default_journal_path(input_excel_file))
+    journal.load()
+    transactions = journal.pending(transactions)
+    half = len(transactions) // 2
+    input(f"{len(transactions)} entries will be added to the app. Open its main screen and press Enter...")
+    try:
+        results = {
+            'serial': _timed_run(transactions[:half], False, journal),
+            'overlap': _timed_run(transactions[half:], True, journal),
+        }
+    finally:
+        merge_journal_into_excel(input_excel_file, journal.journal_file)
+
+    logger.info("="*50)
+    logger.info(f"{'Mode':<8} | {'Entries':>7} | {'Time':>8} | {'Entries/min':>11}")
+    for mode, (entries, seconds) in results.items():
+        logger.info(f"{mode:<8} | {entries:>7} | {seconds:>7.1f}s | {entries / seconds * 60 if seconds else 0:>11.2f}")
+    logger.info("Both modes enter different rows; use similar transactions in both halves for a fair comparison.")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from loguru import logger
+
+from src.account_statement_parsers.hdfc_qif_parser import iter_hdfc_qif, _parse_block
+
+QIF_LINES = 1_000_000
+ACCOUNT = 'HDFC - UPI'
+
+
+def write_synthetic_qif(file_path, lines):
+    """Writes an HDFC-style .qif statement with about `lines` lines (five per transaction)."""
+    start = datetime(2018, 1, 1)
+    with open(file_path, 'w') as f:
+        f.write('!Type:Bank\n')
+        for i in range(lines // 5):
+            moment = start + timedelta(minutes=53 * i)
+            amount = (i % 4999 + 1) * (-1 if i % 3 else 1)
+            f.write(f"D{moment:%d/%m/%y}\n"
+                    f"T{amount:,.2f}\n"
+                    f"N{400000 + i}\n"
+                    f"PUPI-{i}-MERCHANT {i % 97}@okhdfc TXN TIME {moment:%H:%M:%S}\n"
+                    "^\n")
+
+def _parse_whole_file(file_path):
+    """The previous approach: read the whole file, then split it into blocks."""
+    with open(file_path, 'r') as f:
+        content = f.read()
+    records = []
+    for block in content.strip().split('\n^\n'):
+        record = _parse_block(block.strip().split('\n'), ACCOUNT)
+        if record:
+            records.append(record)
+    return len(records)
+
+def _stream(file_path, use_mmap):
+    """Consumes the generator without keeping the records, as a streaming consumer would."""
+    return sum(1 for _ in iter_hdfc_qif(file_path, account_name=ACCOUNT, use_mmap=use_mmap))
+
+def _measure(parse, file_path):
+    """Returns (seconds, peak MB, transactions). Time and memory are measured in separate passes."""
+    start_time = time.perf_counter()
+    count = parse(file_path)
+    seconds = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    parse(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, count
+
+
+def main():
+    """
+    Compares parsing a large synthetic .qif statement in one piece against
+    streaming it line by line and through mmap.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- HDFC QIF Parser Benchmark ---")
+    parsers = {
+        'whole file + split': _parse_whole_file,
+        'streaming (lines)': lambda path: _stream(path, use_mmap=False),
+        'streaming (mmap)': lambda path: _stream(path, use_mmap=True),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "Acct Statement_XX2562_synthetic.qif")
+        logger.info(f"Writing a synthetic statement with {QIF_LINES} lines...")
+        write_synthetic_qif(file_path, QIF_LINES)
+
+        results = []
+        for name, parse in parsers.items():
+            logger.info(f"Measuring {name}...")
+            results.append((name, *_measure(parse, file_path)))
+
+    logger.info("="*50)
+    logger.info(f"{'Parser':<20} | {'Time':>7} | {'Peak memory':>11} | {'Rows':>7}")
+    for name, seconds, peak_mb, count in results:
+        logger.info(f"{name:<20} | {seconds:>6.2f}s | {peak_mb:>8.1f} MB | {count:>7}")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from loguru import logger
+
+from src.account_statement_parsers.splitwise_parse import parse_splitwise_html, parse_splitwise_html_lxml
+from src.benchmarks.synthetic import synthetic_splitwise_html
+
+EXPENSES = 20_000
+
+
+def _measure(parse, file_path):
+    """Returns (seconds, peak MB, DataFrame). Time and memory are measured in separate passes."""
+    start_time = time.perf_counter()
+    df = parse(file_path)
+    seconds = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    parse(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, df
+
+
+def main():
+    """
+    Compares the BeautifulSoup and the lxml/XPath Splitwise parsers on a large
+    synthetic group export, and checks that their outputs are identical.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Splitwise HTML Parser Benchmark ---")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "splitwise.html")
+        logger.info(f"Writing a synthetic export with {EXPENSES} entries...")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(synthetic_splitwise_html(EXPENSES))
+
+        logger.remove()  # The parsers log every rule hit count; keep the benchmark output readable
+        results = {name: _measure(parse, file_path) for name, parse in
+                   [('BeautifulSoup', parse_splitwise_html), ('lxml + XPath', parse_splitwise_html_lxml)]}
+        logger.add(sys.stderr, level="INFO")
+
+    if not results['BeautifulSoup'][2].equals(results['lxml + XPath'][2]):
+        logger.error("The lxml parser's output differs from the BeautifulSoup parser's.")
+    logger.info("="*50)
+    logger.info(f"{'Parser':<14} | {'Time':>7} | {'Peak memory':>11} | {'Rows':>6}")
+    for name, (seconds, peak_mb, df) in results.items():
+        logger.info(f"{name:<14} | {seconds:>6.2f}s | {peak_mb:>8.1f} MB | {len(df):>6}")
+    logger.info("Note: tracemalloc only sees Python allocations, not lxml's native tree.")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import tempfile
+from loguru import logger
+import pandas as pd
+
+from src.utils.excel_status_writer import write_status_cells
+from src.benchmarks.synthetic import synthetic_master
+
+MASTER_SIZES = [1_000, 10_000, 50_000, 200_000]
+UPDATED_ROWS = 50  # About one run's worth of status changes
+
+
+def _time_to_excel(df, path, updates):
+    """The old approach: update the DataFrame and write the whole workbook again."""
+    start_time = time.perf_counter()
+    df = pd.read_excel(path)
+    for index, status in updates.items():
+        df.loc[index, 'Status'] = status
+    df.to_excel(path, index=False)
+    return time.perf_counter() - start_time
+
+def _time_in_place(path, updates):
+    start_time = time.perf_counter()
+    write_status_cells(path, updates)
+    return time.perf_counter() - start_time
+
+
+def main():
+    """
+    Compares writing run statuses back with `to_excel` against in-place cell
+    updates, for growing master files. Each run updates the last UPDATED_ROWS rows.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Status Write-Back Benchmark ---")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in MASTER_SIZES:
+            logger.info(f"Building a synthetic master with {rows} rows...")
+            df = synthetic_master(rows)
+            updates = {index: 'Pending' for index in range(rows - UPDATED_ROWS, rows)}
+
+            to_excel_path = os.path.join(directory, f"master_{rows}_to_excel.xlsx")
+            in_place_path = os.path.join(directory, f"master_{rows}_in_place.xlsx")
+            df.to_excel(to_excel_path, index=False)
+            df.to_excel(in_place_path, index=False)
+
+            results.append((rows, _time_to_excel(df, to_excel_path, updates), _time_in_place(in_place_path, updates)))
+
+    logger.info("="*50)
+    logger.info(f"{'Rows':>8} | {'read + to_excel':>15} | {'in place':>9}")
+    for rows, full_seconds, in_place_seconds in results:
+        logger.info(f"{rows:>8} | {full_seconds:>14.2f}s | {in_place_seconds:>8.2f}s")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+import pandas as pd
+
+
+def synthetic_master(rows, pending=0):
+    """
+    Builds a master DataFrame shaped like the processed statements.
+    The last `pending` rows are 'Pending', every other row is 'Added'.
+    """
+    start = datetime(2020, 1, 1)
+    return pd.DataFrame({
+        'Type': ['Expense'] * rows,
+        'Account': [f"Account {i % 12}" for i in range(rows)],
+        'Category': [f"Category {i % 40}" for i in range(rows)],
+        'Amount': [round(10 + (i % 997) * 1.37, 2) for i in range(rows)],
+        'Datetime': [(start + timedelta(minutes=37 * i)).strftime('%Y-%m-%d %I:%M %p') for i in range(rows)],
+        'Notes': [f"UPI payment reference {100000 + i}" for i in range(rows)],
+        'Status': ['Added'] * (rows - pending) + ['Pending'] * pending,
+    })
+
+
+def synthetic_splitwise_html(expenses, seed=0):
+    """
+    Builds a saved Splitwise expense list with `expenses` entries: expenses you paid,
+    others paid or several people paid, uninvolved ones and settlement payments.
+    """
+    rng = random.Random(seed)
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    titles = ['Groceries run', 'Cricket balls', 'Dinner', 'Badminton court', 'Cab', 'Movie']
+    blocks = ['<!DOCTYPE html><html><head><title>Splitwise</title></head><body><div id="expenses_list">']
+    for i in range(expenses):
+        month, day = rng.randint(1, 12), rng.randint(1, 28)
+        iso = f"2025-{month:02d}-{day:02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z"
+        if rng.random() < 0.15:
+            paid = rng.random() < 0.5
+            amount = rng.randint(10, 5000)
+            blocks.append(
+                f'<div class="expense summary payment involved" data-date="{iso}" id="expense_{i}">'
+                f'<div class="description"><a href="#">{"You paid Alex" if paid else "Alex paid you"} ₹{amount:,}.00 in “Trip”</a></div>'
+                f'<div class="cost">{"You paid" if paid else "You received"}</div>'
+                f'<div class="you"><span class="{"negative" if paid else "positive"}">₹{amount:,}.00</span></div></div>')
+            continue
+        total = rng.randint(100, 9000)
+        share = round(total / rng.randint(2, 5), 2)
+        payer = rng.random()
+        if payer < 0.5:
+            cost, you = f'you paid <span class="number">₹{total:,}.00</span>', f'you lent <span class="positive">₹{total - share:,.2f}</span>'
+        elif payer < 0.6:
+            cost, you = f'2 people paid <span class="number">₹{total:,}.00</span>', f'you borrowed <span class="negative">₹{share:,.2f}</span>'
+        elif payer < 0.65:
+            cost, you = f'Alex paid <span class="number">₹{total:,}.00</span>', 'you borrowed nothing'
+        else:
+            cost, you = f'Alex paid <span class="number">₹{total:,}.00</span>', f'you borrowed <span class="negative">₹{share:,.2f}</span>'
+        summary = 'summary uninvolved' if rng.random() < 0.05 else 'summary'
+        group = f'<span class="label group">Flat {i % 3}</span>' if i % 4 else ''
+        blocks.append(
+            f'<div class="expense" id="expense_{i}"><div class="{summary}">'
+            f'<div class="date" title="{iso}">{months[month - 1]}<div class="number">{day}</div></div>'
+            f'<div class="description"><a href="#">{rng.choice(titles)} {i}</a>{group}</div>'
+            f'<div class="cost">{cost}</div><div class="you">{you}</div></div></div>')
+    blocks.append('</div></body></html>')
+    return '\n'.join(blocks)
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import tempfile
+from datetime import datetime, timedelta
+from loguru import logger
+import pandas as pd
+
+from src.account_statement_parsers.paytm_parse import parse_tata_neu_excel, find_header_row, CARD_ACCOUNT, SHEET_NAME
+from src.utils.rule_engine import DEFAULT_RULES_FILE
+
+PASSBOOK_ROWS = 50_000
+
+
+def write_synthetic_passbook(file_path, rows):
+    """Writes a Tata Neu passbook export: a title block, the header row and `rows` transactions."""
+    start = datetime(2023, 1, 1)
+    merchants = ["Elior India Pvt", "Bmtc Bus KA57", "Swiggy", "Amazon Pay", "GMS Salad Counter", "Bill Payment"]
+    body = []
+    for i in range(rows):
+        moment = start + timedelta(minutes=41 * i)
+        body.append([
+            moment.strftime('%d/%m/%Y'),
+            moment.strftime('%H:%M:%S'),
+            f"{merchants[i % len(merchants)]} {i}",
+            CARD_ACCOUNT if i % 10 else "Paytm Wallet",
+            f"{(i % 2999 + 1) * (1 if i % 17 == 0 else -1):,}",
+            "lunch" if i % 3 == 0 else None,
+        ])
+    title = [["Passbook Payment History", None, None, None, None, None], [None] * 6,
+             ["Date", "Time", "Transaction Details", "Your Account", "Amount", "Remarks"]]
+    with pd.ExcelWriter(file_path) as writer:
+        pd.DataFrame(title + body).to_excel(writer, sheet_name=SHEET_NAME, header=False, index=False)
+
+def _parse_row_by_row(file_path):
+    """The previous approach: read the sheet twice, then convert each row with iterrows."""
+    raw_df = pd.read_excel(file_path, sheet_name=SHEET_NAME, header=None)
+    df = pd.read_excel(file_path, sheet_name=SHEET_NAME, header=find_header_row(raw_df))
+    with open(DEFAULT_RULES_FILE, 'r', encoding='utf-8') as f:
+        rules = json.load(f)['tata_neu']
+    transactions = []
+    for _, row in df.iterrows():
+        if str(row.get('Your Account', '')).strip() != CARD_ACCOUNT or pd.isna(row['Date']) or pd.isna(row['Amount']):
+            continue
+        full_datetime = datetime.strptime(f"{row['Date']} {row['Time']}", "%d/%m/%Y %H:%M:%S")
+        amount = float(str(row['Amount']).replace(',', ''))
+        details, remarks = str(row['Transaction Details']), str(row['Remarks'])
+        category = next((rule['category'] for rule in rules
+                         for keyword in rule['keywords'] if keyword.lower() in details.lower()), '')
+        transactions.append({
+            'Type': 'Income' if amount >= 0 else 'Expense',
+            'Account': 'Infinity Tata Neu CC',
+            'Category': category,
+            'Amount': abs(amount),
+            'Notes': remarks[:1].upper() + remarks[1:] if remarks.lower() != 'nan' else '',
+            'Datetime': full_datetime.strftime('%Y-%m-%d %I:%M %p'),
+            'Status': 'Pending',
+            'Description': details + (f" | {remarks}" if remarks and remarks.lower() != 'nan' else ''),
+        })
+    return pd.DataFrame(transactions)
+
+
+def main():
+    """
+    Compares the row-by-row Tata Neu parser with the vectorized one on a large synthetic passbook.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Tata Neu Passbook Parser Benchmark ---")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "passbook.xlsx")
+        logger.info(f"Writing a synthetic passbook with {PASSBOOK_ROWS} rows...")
+        write_synthetic_passbook(file_path, PASSBOOK_ROWS)
+
+        logger.remove()  # The parsers log every total; keep the benchmark output readable
+        start_time = time.perf_counter()
+        expected = _parse_row_by_row(file_path)
+        row_by_row_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        parsed = parse_tata_neu_excel(file_path)
+        vectorized_seconds = time.perf_counter() - start_time
+        logger.add(sys.stderr, level="INFO")
+
+    if not parsed.equals(expected):
+        logger.error("The vectorized parser's output differs from the row-by-row parser's.")
+    logger.info("="*50)
+    logger.info(f"{'Parser':<12} | {'Time':>7} | {'Rows':>7}")
+    logger.info(f"{'row by row':<12} | {row_by_row_seconds:>6.2f}s | {len(expected):>7}")
+    logger.info(f"{'vectorized':<12} | {vectorized_seconds:>6.2f}s | {len(parsed):>7}")
+    logger.info("Both times include reading the sheet, which the vectorized parser does once instead of twice.")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import sys
+from loguru import logger
+
+from src.mymoneypro_automator import MyMoneyProAutomator
+
+# Long note with the characters that `input text` struggles with (₹, curly quotes, Hindi).
+SAMPLE_TEXT = "Dinner at “Swagath” ₹1,250 (split 3 ways) - धन्यवाद; paid via UPI & card"
+
+
+def main():
+    """
+    Compares the per-character latency of the 'input text' and ADBKeyBoard IME backends.
+    Open the Notes field of an entry in MyMoneyPro before running this script.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    logger.info("--- Text Input Backend Latency ---")
+    input("Open an entry's Notes field on the phone and press Enter...")
+    automator = MyMoneyProAutomator()
+    # Plain ASCII for 'input text', which cannot type the full sample.
+    ascii_sample = SAMPLE_TEXT.encode('ascii', 'ignore').decode('ascii')
+    latencies = automator.measure_text_latency(ascii_sample)
+
+    logger.info("="*50)
+    logger.info(f"input text : {latencies['input'] * 1000:.2f} ms/char")
+    logger.info(f"ADB IME    : {latencies['ime'] * 1000:.2f} ms/char")
+    if latencies['ime'] > 0:
+        logger.info(f"Speed-up   : {latencies['input'] / latencies['ime']:.1f}x")
+    logger.info("="*50)
+
+if __name__ == '__main__':
+    main()
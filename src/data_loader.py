@@ -2,28 +2,107 @@ from datetime import datetime
 from loguru import logger
 import pandas as pd
 
+from src.transaction import Transaction, to_transactions
 
-def load_transactions_from_excel(file_path):
+
+DATETIME_FORMAT = '%Y-%m-%d %I:%M %p'
+
+
+def _iter_rows_openpyxl(file_path):
+    """Yields the first sheet's rows as tuples, streaming them from disk (read-only mode)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _iter_rows_calamine(file_path):
+    """Yields the first sheet's rows as lists using the Rust-based calamine reader."""
+    from python_calamine import CalamineWorkbook
+
+    sheet = CalamineWorkbook.from_path(file_path).get_sheet_by_index(0)
+    # Empty cells come back as '', like openpyxl's None they mean "no value".
+    for row in sheet.iter_rows():
+        yield [None if value == '' else value for value in row]
+
+# Row readers for `iter_pending_transactions`. calamine is optional (pip install python-calamine).
+EXCEL_ROW_READERS = {
+    'openpyxl': _iter_rows_openpyxl,
+    'calamine': _iter_rows_calamine,
+}
+
+def _row_reader(engine):
+    """Returns the row reader for `engine`, falling back to openpyxl if it is not installed."""
+    if engine not in EXCEL_ROW_READERS:
+        raise ValueError(f"Unknown Excel engine '{engine}'. Choose one of {list(EXCEL_ROW_READERS)}.")
+    if engine == 'calamine':
+        try:
+            import python_calamine  # noqa: F401
+        except ImportError:
+            logger.warning("python-calamine is not installed. Falling back to openpyxl.")
+            engine = 'openpyxl'
+    return EXCEL_ROW_READERS[engine]
+
+def _parse_datetime(value):
+    """Parses the 'Datetime' column, which is text in processed files but may be a real date."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value).strip(), DATETIME_FORMAT)
+
+def iter_pending_transactions(file_path, engine='openpyxl'):
+    """
+    Streams the pending transactions of a processed Excel file.
+
+    Rows are read one at a time and only the rows whose 'Status' is 'Pending'
+    are turned into transaction dictionaries, so memory use does not grow with
+    the size of the history in the file. Each row is converted to a
+    Transaction record with its 'original_index' and parsed 'datetime'.
+
+    Args:
+        file_path (str): The processed Excel file.
+        engine (str): 'openpyxl' (default) or 'calamine' (faster, needs python-calamine).
+
+    Yields:
+        Transaction: One pending transaction at a time, in file order.
+    """
+    rows = _row_reader(engine)(file_path)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(name).lower() if name is not None else f"unnamed: {i}" for i, name in enumerate(header)]
+    if 'status' not in columns:
+        raise KeyError("The Excel file has no 'Status' column.")
+    status_position = columns.index('status')
+
+    for original_index, row in enumerate(rows):
+        if status_position >= len(row):
+            continue
+        status = row[status_position]
+        if not isinstance(status, str) or status.lower() != 'pending':
+            continue
+        tx = {column: (row[i] if i < len(row) and row[i] is not None else float('nan')) for i, column in enumerate(columns)}
+        tx['original_index'] = original_index
+        tx['datetime'] = _parse_datetime(tx['datetime'])
+        yield Transaction.from_dict(tx)
+
+def load_transactions_from_excel(file_path, engine='openpyxl', duplicate_index=None):
     """
     Loads transactions from a processed Excel file.
     Only loads rows where the 'Status' is 'Pending'.
+    The sheet is streamed row by row (see `iter_pending_transactions`).
+    If a DuplicateIndex is given, rows it holds (added in an earlier run) are left out.
     """
     try:
-        df = pd.read_excel(file_path)
-        df.columns = [col.lower() for col in df.columns]  # Make all column names lower case
+        transactions = list(iter_pending_transactions(file_path, engine=engine))
+        if duplicate_index is not None:
+            transactions, duplicates = duplicate_index.split(transactions)
+            if duplicates:
+                logger.warning(f"Skipped {len(duplicates)} pending transaction(s) that were already added.")
         logger.info(f"Successfully loaded '{file_path}'.")
-        
-        # Filter for pending transactions
-        pending_df = df[df['status'].str.lower() == 'pending'].copy()
-        # --- NEW: Add original index to track rows for updating ---
-        pending_df['original_index'] = pending_df.index
-        logger.info(f"Found {len(pending_df)} pending transactions to process.")
-
-        # Convert 'Datetime' string back to datetime object
-        pending_df['datetime'] = pd.to_datetime(pending_df['datetime'], format='%Y-%m-%d %I:%M %p')
-        
-        # Convert DataFrame to a list of dictionaries
-        return pending_df.to_dict('records')
+        logger.info(f"Found {len(transactions)} pending transactions to process.")
+        return transactions
 
     except FileNotFoundError:
         logger.error(f"Input Excel file not found at: {file_path}")
@@ -37,7 +116,7 @@ def load_sample_transactions():
         Loads a sample set of transactions for testing purposes.
         This is useful for quick testing without needing an Excel file.
         """
-        transactions_to_add = [
+        transactions_to_add = to_transactions([
             # --- Expenses (3) ---
             {
                 'type': 'Expense',
@@ -131,5 +210,5 @@ def load_sample_transactions():
                 'notes': 'Lent to friend~ will get back later',
                 'datetime': datetime.strptime("2025-10-28 01:00 PM", "%Y-%m-%d %I:%M %p"),
             },
-        ]
+        ])
         return transactions_to_add
@@ -6,6 +6,7 @@ from datetime import datetime
 import calendar
 import re
 import json
+from concurrent.futures import Future
 from PIL import Image
 import pytesseract
 from loguru import logger
@@ -16,8 +17,15 @@ import numpy as np
 
 from src.mymoneypro_automator import MyMoneyProAutomator
 from src.data_loader import load_transactions_from_excel, load_sample_transactions
+from src.transaction import to_transactions
 from src.utils.validate_transactions import validate_transactions
 from src.utils.misc import serialize_datetimes, calculate_and_print_net_diffs
+from src.utils.transaction_scheduler import EntryCostModel, schedule_transactions
+from src.utils.device_pool import DevicePool
+from src.utils.balance_reconciliation import BalanceReconciler
+from src.utils.entry_verifier import EntryVerifier
+from src.utils.duplicate_index import DuplicateIndex, DEFAULT_INDEX_FILE
+from src.utils.progress_journal import ProgressJournal, assign_fingerprints, default_journal_path, merge_journal_into_excel
 
 # --- Configuration Section ---
 # If Tesseract is not in your system's PATH, uncomment and set the path below.
@@ -25,12 +33,142 @@ from src.utils.misc import serialize_datetimes, calculate_and_print_net_diffs
 # Example for Windows:
 # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def run_automation_workflow(transactions_to_add, input_excel_file=None, main_df=None):
+def process_transactions(automator, transactions, on_status, max_attempts=3, reconcile=False, verify_every=0):
+    """
+    Enters the transactions one by one on a single device.
+    Failed entries are recovered and retried (see enter_with_recovery); a
+    transaction that still fails is marked 'Failed' and the batch moves on.
+    The batch only stops if the app cannot be brought back to its main screen.
+
+    Args:
+        automator (MyMoneyProAutomator): The device to enter the transactions on.
+        transactions (list): The transactions to enter, in order.
+        on_status (callable): Called with (transaction, 'Added' or 'Failed') for each finished transaction,
+                              and again with 'Unverified' for an added one that verification could not find.
+        max_attempts (int): Attempts per transaction before it is marked 'Failed'.
+        reconcile (bool): Read the account balances before and after the batch and
+                          check them against the added transactions (see BalanceReconciler).
+        verify_every (int): Check every N added entries against the app's transaction list
+                            (see EntryVerifier). 0 disables the check.
+    """
+    total_transactions = len(transactions)
+    completed = 0
+    added = []
+    verifier = EntryVerifier(automator, every=verify_every) if verify_every else None
+    def flag_unverified(missing):
+        for tx in missing:
+            logger.warning(f"MARKING '{tx['notes']}' as Unverified. Check it in the app; set it back to Pending to retry it.")
+            on_status(tx, 'Unverified')
+    try:
+        reconciler = BalanceReconciler(automator) if reconcile else None
+        balances_before = None
+        if reconciler:
+            pages_before = reconciler.capture()
+            # The pages are captured before the first entry; with overlap, they are OCR'd while the entries are added.
+            if pages_before and automator.overlap:
+                balances_before = automator.overlap.submit(reconciler.read_balances, pages_before)
+            else:
+                balances_before = reconciler.read_balances(pages_before)
+        if automator.text_backend == 'ime':
+            automator.enable_ime_backend()
+        for i, transaction in enumerate(transactions):
+            logger.info(f"--- Processing transaction {i + 1} of {total_transactions} ---")
+            next_entry = transactions[i + 1] if i + 1 < total_transactions else None
+            status = automator.enter_with_recovery(transaction, next_entry=next_entry, max_attempts=max_attempts)
+            if status == 'Added':
+                logger.success(f"MARKING '{transaction['notes']}' as Done.")
+                on_status(transaction, status)
+                added.append(transaction)
+                completed += 1
+                if verifier:
+                    flag_unverified(verifier.record(transaction))
+            elif status == 'Failed':
+                logger.error(f"MARKING '{transaction['notes']}' as Failed. Continuing with the next transaction.")
+                on_status(transaction, status)
+            else:
+                logger.error(f"STOPPING SCRIPT due to failure on '{transaction['notes']}'.")
+                break
+            time.sleep(automator.coords.SHORT_DELAY)
+
+        if verifier:
+            flag_unverified(verifier.verify())
+            logger.info(f"Verified {verifier.checked} entries: {verifier.unmatched} not found in the transaction list.")
+        if isinstance(balances_before, Future):
+            balances_before = automator.overlap.result(balances_before)
+        if balances_before is not None:
+            balances_after = reconciler.snapshot()
+            if balances_after is not None:
+                reconciler.reconcile(balances_before, balances_after, added)
+    finally:
+        if automator.text_backend == 'ime':
+            automator.restore_ime()
+        if automator.overlap:
+            automator.overlap.report(completed)
+            automator.overlap.shutdown()
+
+def run_automation_workflow(transactions_to_add, input_excel_file=None, reorder=False, text_backend='input',
+                            multi_device=False, device_accounts=None, overlap=False, journal_file=None, reconcile=False,
+                            verify_every=0, duplicate_index_file=DEFAULT_INDEX_FILE):
+    """
+    Validates, summarises and enters the pending transactions, then saves their statuses.
+
+    Every finished transaction is recorded in a progress journal right away, so
+    an interrupted run can be resumed: transactions the journal already marks as
+    'Added', 'Unverified' or 'Duplicate' are skipped. The journal is merged into
+    the Excel file at the end.
+
+    Args:
+        transactions_to_add (list): The pending transactions (Transaction records or dictionaries).
+        input_excel_file (str, optional): The master Excel file to write statuses back to.
+        reorder (bool): Reorder the queue to minimise UI actions (see schedule_transactions).
+        text_backend (str): 'input' or 'ime' (see MyMoneyProAutomator).
+        multi_device (bool): Shard the transactions across every connected device.
+        device_accounts (dict, optional): Device serial -> accounts it owns, for multi_device runs.
+        overlap (bool): Overlap host work with device work (see MyMoneyProAutomator).
+        journal_file (str, optional): The progress journal. Defaults to one next to the Excel file.
+        reconcile (bool): Check the account balances on the accounts page after the run (see BalanceReconciler).
+        verify_every (int): Check every N added entries against the app's transaction list; entries
+                            that are not found are marked 'Unverified' (see EntryVerifier).
+        duplicate_index_file (str, optional): The index of transactions added in earlier runs (see
+                                              DuplicateIndex); by default the one the statement parsers
+                                              check. Transactions it already holds are marked 'Duplicate'
+                                              instead of being entered, and every newly added one is
+                                              recorded in it (and removed again if verification marks
+                                              it 'Unverified'). None disables the check.
+    """
     # --- 2. Pre-run Verification ---
+    transactions_to_add = to_transactions(transactions_to_add)
     if not validate_transactions(transactions_to_add):
         logger.error("Validation failed for one or more transactions. Please check the logs for details.")
         sys.exit(1)
     
+    # --- Resume: skip transactions a previous run already added ---
+    journal = None
+    journal_file = journal_file or (default_journal_path(input_excel_file) if input_excel_file else None)
+    if journal_file:
+        journal = ProgressJournal(journal_file)
+        journal.load()
+        transactions_to_add = journal.pending(assign_fingerprints(transactions_to_add))
+
+    duplicate_index = DuplicateIndex(duplicate_index_file) if duplicate_index_file else None
+
+    # Statuses only go to the journal (and the index); the journal and the index
+    # are thread-safe, so device threads of a multi-device run can call this at once.
+    def mark_status(transaction, status):
+        if journal:
+            journal.record(transaction, status)
+        if duplicate_index and status == 'Added':
+            duplicate_index.add(transaction)
+        elif duplicate_index and status == 'Unverified':
+            # Not found in the app after all: it must stay retryable once set back to Pending.
+            duplicate_index.remove(transaction)
+
+    # --- Cross-run duplicates: skip transactions an earlier run (or statement) already added ---
+    if duplicate_index:
+        transactions_to_add, duplicates = duplicate_index.split(transactions_to_add)
+        for transaction in duplicates:
+            mark_status(transaction, 'Duplicate')
+
     calculate_and_print_net_diffs(transactions_to_add)
     
     # --- Debug: Print loaded transactions ---
@@ -55,33 +193,34 @@ def run_automation_workflow(transactions_to_add, input_excel_file=None, main_df=
     logger.info("="*50)
 
     # --- 4. Main Automation Loop ---
-    automator = MyMoneyProAutomator()
-    total_transactions = len(transactions_to_add)
-
     try:
-        for i, transaction in enumerate(transactions_to_add):
-            logger.info(f"--- Processing transaction {i + 1} of {total_transactions} ---")
-            success = automator.begin_entry(transaction)
-            if success:
-                logger.success(f"MARKING '{transaction['notes']}' as Done.")
-                if main_df:
-                    original_index = transaction['original_index']
-                    main_df.loc[original_index, 'status'] = 'Added'
-            else:
-                logger.error(f"STOPPING SCRIPT due to failure on '{transaction['notes']}'.")
-                break
-            time.sleep(automator.coords.SHORT_DELAY)
+        if multi_device:
+            pool = DevicePool(device_accounts)
+            pool.connect(text_backend=text_backend, overlap=overlap)
+            shards, _ = pool.shard(transactions_to_add)
+            if reorder:
+                shards = {serial: schedule_transactions(shard, EntryCostModel.for_automator(pool.automators[serial]))
+                          for serial, shard in shards.items()}
+            pool.run(shards, lambda automator, shard: process_transactions(
+                automator, shard, mark_status, reconcile=reconcile, verify_every=verify_every))
+        else:
+            automator = MyMoneyProAutomator(text_backend=text_backend, overlap=overlap)
+            # --- Optional: reorder the queue to minimise UI actions ---
+            if reorder:
+                transactions_to_add = schedule_transactions(transactions_to_add, EntryCostModel.for_automator(automator))
+            process_transactions(automator, transactions_to_add, mark_status, reconcile=reconcile, verify_every=verify_every)
     finally:
         # --- 5. Save Progress ---
-        # This block runs whether the loop finishes, breaks, or is interrupted (Ctrl+C)
-        if input_excel_file and main_df:
+        # This block runs whether the loop finishes, breaks, or is interrupted (Ctrl+C).
+        # Progress is already safe in the journal; merging it is a separate step
+        # that can be re-run with `python -m src.utils.progress_journal` if it fails here.
+        if input_excel_file and journal:
             logger.info("="*50)
-            logger.info("Saving updated statuses back to the Excel file...")
+            logger.info("Merging the progress journal into the Excel file...")
             try:
-                main_df.to_excel(input_excel_file, index=False)
-                logger.success("Successfully saved the updated Excel file.")
+                merge_journal_into_excel(input_excel_file, journal.journal_file)
             except Exception as e:
-                logger.exception("Failed to save the updated Excel file.")
+                logger.exception("Failed to merge the journal into the Excel file. Progress is kept in the journal.")
 
 if __name__ == '__main__':
     # Configure Loguru for real-time, debug-level logging
@@ -89,7 +228,6 @@ if __name__ == '__main__':
     logger.add(sys.stderr, level="DEBUG", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
 
     input_excel_file = None
-    main_df = None
 
     # --- Load transactions from Excel ---
     # input_excel_file = input("Please enter the full path to your statement .xlsx file: ")
@@ -99,20 +237,9 @@ if __name__ == '__main__':
     # input_excel_file = input_excel_file.strip('"')
 
     # --- 1. Load Data ---
-    # --- NEW: Read the main DataFrame once ---
-    # try:
-    #     main_df = pd.read_excel(input_excel_file)
-    #     main_df.columns = [col.lower() for col in main_df.columns]
-    # except FileNotFoundError:
-    #     logger.error(f"Input Excel file not found at: {input_excel_file}")
-    #     sys.exit(1)
-    # except Exception as e:
-    #     logger.exception("Failed to read the main Excel file.")
-    #     sys.exit(1)
-
     transactions_to_add = load_sample_transactions()  # For testing purposes, you can use this instead
     # transactions_to_add = load_transactions_from_excel(input_excel_file)
 
-    run_automation_workflow(transactions_to_add, input_excel_file, main_df)
+    run_automation_workflow(transactions_to_add, input_excel_file)
 
     logger.info("\nAutomation script finished.")
@@ -5,6 +5,9 @@ import subprocess
 from datetime import datetime
 import calendar
 import re
+import base64
+from functools import partial
+import xml.etree.ElementTree as ET
 import pytesseract
 from loguru import logger
 import cv2
@@ -12,27 +15,93 @@ import pandas as pd
 import numpy as np
 
 from src.utils.ui_cache import UICache
-from src.utils.adb_utils import get_device_coordinates
+from src.utils.adb_utils import get_device_coordinates, adb_command
+from src.utils.overlap import OverlapExecutor
+from src.utils.account_categories_list import accounts_list, income_categories_list, expense_categories_list
+from src.utils.screen_state import (
+    ScreenClassifier, KNOWN_SCREENS, ENTRY_FORM_SCREENS, MAIN_SCREEN,
+    ACCOUNT_LIST_SCREEN, CATEGORY_GRID_SCREEN, DATE_DIALOG_SCREEN, TIME_DIALOG_SCREEN,
+    ACCOUNTS_PAGE_SCREEN,
+)
+
+
+# The ADBKeyBoard IME (https://github.com/senzhk/ADBKeyBoard) used by the 'ime' text backend.
+ADB_KEYBOARD_IME = "com.android.adbkeyboard/.AdbIME"
+# Every name an account or category field of the add form can show.
+KNOWN_FIELD_NAMES = accounts_list + income_categories_list + expense_categories_list
 
 
 class MyMoneyProAutomator:
     """
     A class to automate expense entry in the MyMoneyPro app using ADB and OCR.
+
+    Args:
+        text_backend (str): 'input' types text with `input text` (default).
+                            'ime' sends whole UTF-8 strings in one broadcast
+                            through the ADBKeyBoard IME, which must be installed.
+        serial (str, optional): Serial of the device to drive, when several are connected.
+                                The device then gets its own UI cache, screen probes and screenshot
+                                files, starting from those of its phone model until it has its own.
+        overlap (bool): Run host-side work in the background while the device is busy: OCR of
+                        captured verification and balance frames, and planning the next entry
+                        during the save. Device actions stay in order.
     """
-    def __init__(self):
-        self.coords = get_device_coordinates()
+    def __init__(self, text_backend='input', serial=None, overlap=False):
+        self.serial = serial
+        self.overlap = OverlapExecutor() if overlap else None
+        self._next_plan = None  # (transaction, Future) of the prefetched plan for the next entry
+        self._entry_cache_hits = []  # Cached list items tapped during the current entry
+        self._save_tapped = False  # Whether the current entry reached the save tap
+        self.adb = adb_command(serial)
+        self.coords = get_device_coordinates(serial)
+        self.text_backend = text_backend
+        self._previous_ime = None  # The user's IME, restored after an 'ime' backend run
         self.calendar = calendar.Calendar(firstweekday=calendar.SUNDAY)
+        self._last_picked_date = None  # Tracks the date picker state between entries (saved entries only)
+        self._pending_picked_date = None  # Date picked in the current form, tracked once the entry is saved
+        self._time_keypad_mode_active = False  # Tracks the time picker input mode between entries
         # Initialize and load the UI cache
-        phone_name = self.coords.phone_name.strip().replace(" ", "").replace("\n", "")
-        cache_filename = f"{phone_name}_ui_cache.json"
+        model_name = self.coords.phone_name.strip().replace(" ", "").replace("\n", "")
+        phone_name = f"{model_name}_{serial}" if serial else model_name
         cache_dir = os.path.join(os.path.dirname(__file__), "app_coordinates")
-        cache_path = os.path.join(cache_dir, cache_filename)
-        self.cache = UICache(cache_path)
-        self.cache.load()
+        self.cache = UICache(os.path.join(cache_dir, f"{phone_name}_ui_cache.json"))
+        self._load_device_file(self.cache, 'cache_file', os.path.join(cache_dir, f"{model_name}_ui_cache.json"))
+        # Initialize and load the learned screen probes for this device
+        self.screens = ScreenClassifier(os.path.join(cache_dir, f"{phone_name}_screen_probes.json"))
+        self._load_device_file(self.screens, 'probe_file', os.path.join(cache_dir, f"{model_name}_screen_probes.json"))
+
+    @staticmethod
+    def _load_device_file(store, path_attribute, model_path):
+        """
+        Loads a device's UI cache or screen probes. A device of a multi-device pool
+        that has no file of its own yet starts from the file of its phone model,
+        and saves its own file from then on.
+        """
+        device_path = getattr(store, path_attribute)
+        if device_path != model_path and not os.path.exists(device_path) and os.path.exists(model_path):
+            setattr(store, path_attribute, model_path)
+            store.load()
+            setattr(store, path_attribute, device_path)
+        else:
+            store.load()
 
     def _execute_adb(self, command, check=True):
         """Executes a given ADB command."""
-        return subprocess.run(f"adb shell {command}", shell=True, check=check, capture_output=True, text=True)
+        return subprocess.run(f"{self.adb} shell {command}", shell=True, check=check, capture_output=True, text=True)
+
+    def _focused_app_info(self):
+        """Returns the window manager's description of the currently focused window."""
+        # This command gets information about the currently focused window
+        # result = self._execute_adb("dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'")
+        result = self._execute_adb('dumpsys window | findstr "mCurrentFocus mFocusedApp"')
+        return result.stdout.strip()
+
+    def _is_app_focused(self):
+        """Returns True if the target app is in the foreground. Never aborts."""
+        try:
+            return self.coords.app_package_name in self._focused_app_info()
+        except Exception:
+            return False
 
     def _check_app_focus(self):
         """
@@ -40,10 +109,7 @@ class MyMoneyProAutomator:
         If the wrong app is open, it aborts the script to prevent unintended taps.
         """
         try:
-            # This command gets information about the currently focused window
-            # result = self._execute_adb("dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'")
-            result = self._execute_adb('dumpsys window | findstr "mCurrentFocus mFocusedApp"')
-            focused_app_info = result.stdout.strip()
+            focused_app_info = self._focused_app_info()
             
             if self.coords.app_package_name not in focused_app_info:
                 logger.critical("!!! SAFETY ABORT !!!")
@@ -81,18 +147,118 @@ class MyMoneyProAutomator:
         escaped_text = re.sub(pattern, r'\\\1', text_to_escape)
         return escaped_text
     
-    def _type_text(self, text):
-        self._check_app_focus() # Security check
-        
+    def enable_ime_backend(self):
+        """
+        Makes ADBKeyBoard the active IME for the run, remembering the current one.
+        Call `restore_ime` afterwards to give the user their keyboard back.
+        """
+        result = self._execute_adb("settings get secure default_input_method")
+        self._previous_ime = result.stdout.strip()
+        self._execute_adb(f"ime enable {ADB_KEYBOARD_IME}")
+        self._execute_adb(f"ime set {ADB_KEYBOARD_IME}")
+        logger.info(f"Switched IME from '{self._previous_ime}' to '{ADB_KEYBOARD_IME}'.")
+
+    def restore_ime(self):
+        """Restores the IME that was active before `enable_ime_backend`."""
+        if self._previous_ime and self._previous_ime != ADB_KEYBOARD_IME:
+            self._execute_adb(f"ime set {self._previous_ime}", check=False)
+            logger.info(f"Restored IME '{self._previous_ime}'.")
+        self._previous_ime = None
+
+    def _ime_text_command(self, text):
+        """Returns the ADBKeyBoard broadcast that types the string as base64-encoded UTF-8."""
+        encoded_text = base64.b64encode(str(text).encode('utf-8')).decode('ascii')
+        return f"am broadcast -a ADB_INPUT_B64 --es msg {encoded_text}"
+
+    def _input_text_command(self, text):
+        """Returns the `input text` command for the string, with shell metacharacters escaped."""
         # Use the new helper method to handle all special characters
         formatted_text = self._escape_shell_text(text)
         
         # Replace spaces for adb compatibility
         formatted_text = formatted_text.replace(" ", "%s")
-        
-        logger.debug(f"Typing text: '{text}' (Formatted: {formatted_text})")
+        return f'input text "{formatted_text}"'
+
+    def text_command(self, text):
+        """Returns the shell command that types the string with the configured text backend."""
+        if self.text_backend == 'ime':
+            return self._ime_text_command(text)
+        return self._input_text_command(text)
+
+    def _type_text_ime(self, text):
+        """Sends the whole string as base64-encoded UTF-8 in a single ADBKeyBoard broadcast."""
+        logger.debug(f"Typing text via IME: '{text}'")
+        self._execute_adb(self._ime_text_command(text))
+        time.sleep(self.coords.SHORT_DELAY)
+
+    def _type_text(self, text, command=None):
+        """
+        Types the string with the configured backend. `command` is the
+        precomputed `text_command` of the string, if the caller has it.
+        """
+        self._check_app_focus() # Security check
+        if command:
+            logger.debug(f"Typing text: '{text}'")
+            self._execute_adb(command)
+            time.sleep(self.coords.SHORT_DELAY)
+            return
+        if self.text_backend == 'ime':
+            return self._type_text_ime(text)
+        return self._type_text_input(text)
+
+    def _type_text_input(self, text):
+        """Types the string with `input text`, escaping shell metacharacters."""
+        command = self._input_text_command(text)
+        logger.debug(f"Typing text: '{text}' (Command: {command})")
         # The command is now more robust as it handles a wide range of special characters
-        self._execute_adb(f'input text "{formatted_text}"')
+        self._execute_adb(command)
+        time.sleep(self.coords.SHORT_DELAY)
+
+    def measure_text_latency(self, sample_text, repeats=3):
+        """
+        Measures the per-character latency of the 'input' and 'ime' text backends.
+        A text field must be focused on the phone; the typed text is deleted after each try.
+
+        Returns:
+            dict: Backend name -> average seconds per character.
+        """
+        self._check_app_focus() # Security check
+        latencies = {}
+        for backend, type_func in [('input', self._type_text_input), ('ime', self._type_text_ime)]:
+            if backend == 'ime':
+                self.enable_ime_backend()
+            try:
+                elapsed = 0.0
+                for _ in range(repeats):
+                    start_time = time.time()
+                    type_func(sample_text)
+                    elapsed += time.time() - start_time - self.coords.SHORT_DELAY
+                    self._press_key(" ".join(["KEYCODE_MOVE_END"] + ["KEYCODE_DEL"] * len(str(sample_text))))
+                latencies[backend] = elapsed / (repeats * max(len(str(sample_text)), 1))
+            finally:
+                if backend == 'ime':
+                    self.restore_ime()
+            logger.info(f"Text backend '{backend}': {latencies[backend] * 1000:.2f} ms per character")
+        return latencies
+
+    def _type_sequence(self, steps):
+        """
+        Types text and presses keys in a single ADB round trip.
+
+        Args:
+            steps (list): ('text', value) or ('key', keycode) tuples, in order.
+        """
+        self._check_app_focus() # Security check
+        commands = []
+        for kind, value in steps:
+            if kind == 'text':
+                formatted_text = self._escape_shell_text(value).replace(" ", "%s")
+                commands.append(f'input text "{formatted_text}"')
+            else:
+                commands.append(f"input keyevent {value}")
+        logger.debug(f"Typing sequence: {steps}")
+        # Passed as a single argument so the host shell does not split on '&&'.
+        subprocess.run([*self.adb.split(), "shell", " && ".join(commands)], check=True, capture_output=True, text=True)
         time.sleep(self.coords.SHORT_DELAY)
 
     def _press_key(self, keycode):
@@ -107,6 +273,65 @@ class MyMoneyProAutomator:
         self._execute_adb(f"input swipe {x1} {y1} {x2} {y2} {duration}")
         time.sleep(self.coords.LONG_DELAY)
 
+    def _capture_screen(self):
+        """
+        Captures the current screen straight into memory (no temporary files).
+
+        Returns:
+            numpy.ndarray: The screenshot as a BGR image.
+        """
+        self._check_app_focus() # Check focus before taking a screenshot
+        result = subprocess.run(f"{self.adb} exec-out screencap -p", shell=True, check=True, capture_output=True)
+        img = cv2.imdecode(np.frombuffer(result.stdout, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise RuntimeError("Could not decode the screenshot received from the device.")
+        return img
+
+    def _wait_for_screen(self, screen_name, fallback_delay=0):
+        """
+        Checkpoint: waits until the given screen is showing.
+
+        If probes have been learned for the screen, the screen is polled until it
+        matches or SCREEN_CHECK_TIMEOUT expires. Otherwise it falls back to
+        sleeping for `fallback_delay`, which is the old blind behaviour.
+
+        Returns:
+            bool: True if the screen was detected (or could not be checked), False otherwise.
+        """
+        if not self.screens.knows(screen_name):
+            time.sleep(fallback_delay)
+            return True
+
+        deadline = time.time() + self.coords.SCREEN_CHECK_TIMEOUT
+        detected = None
+        while True:
+            detected = self.screens.classify(self._capture_screen())
+            if detected == screen_name:
+                logger.trace(f"Checkpoint passed: on '{screen_name}' screen.")
+                return True
+            if time.time() >= deadline:
+                break
+            time.sleep(self.coords.SHORT_DELAY)
+        logger.error(f"Checkpoint failed: expected '{screen_name}' screen but detected '{detected}'.")
+        return False
+
+    def learn_current_screen(self, screen_name):
+        """Captures the current screen and learns it as `screen_name` for this device."""
+        self.screens.learn(screen_name, self._capture_screen())
+        self.screens.save()
+
+    def calibrate_screens(self, screen_names=KNOWN_SCREENS):
+        """
+        Interactive calibration: asks the user to open each screen in turn and learns it.
+        This only needs to be done once per device configuration.
+        """
+        for screen_name in screen_names:
+            answer = input(f"Open the '{screen_name}' screen on the phone and press Enter (or type 's' to skip): ")
+            if answer.strip().lower() == 's':
+                continue
+            self.learn_current_screen(screen_name)
+        logger.success(f"Screen calibration finished. Known screens: {sorted(self.screens.probes)}")
+
     def print_ocr_data(self, ocr_data):
         # After ocr_data is obtained:
         df = pd.DataFrame(ocr_data)
@@ -136,19 +361,21 @@ class MyMoneyProAutomator:
                     self._swipe(*self.coords.swipe_coords)
             
             logger.info(f"Tapping cached coordinates for '{target_text}'.")
+            self._entry_cache_hits.append(target_text)
             self._tap(coords[0], coords[1], purpose=f"Select cached item '{target_text}'")
             return True
 
         logger.warning(f"'{target_text}' not in cache. Starting OCR fallback...")
         screenshot_path_phone = "/sdcard/screen.png"
-        screenshot_path_local = "screen.png"
+        screenshot_path_local = f"screen_{self.serial}.png" if self.serial else "screen.png"
+        processed_path_local = screenshot_path_local.replace(".png", "-processed.png")
 
         for i in range(max_swipes):
             try:
                 self._check_app_focus() # Check focus before taking a screenshot
                 logger.debug(f"Scan attempt {i+1}/{max_swipes} for '{target_text}'")
                 self._execute_adb(f"screencap -p {screenshot_path_phone}")
-                subprocess.run(f"adb pull {screenshot_path_phone} {screenshot_path_local}", shell=True, check=True, capture_output=True)
+                subprocess.run(f"{self.adb} pull {screenshot_path_phone} {screenshot_path_local}", shell=True, check=True, capture_output=True)
                 
                 # --- Image Pre-processing for better OCR accuracy ---
                 img = cv2.imread(screenshot_path_local)
@@ -169,7 +396,7 @@ class MyMoneyProAutomator:
                 _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
 
                 # Save the pre-processed image for debugging/inspection
-                cv2.imwrite("screen-processed.png", thresh)
+                cv2.imwrite(processed_path_local, thresh)
                 
                 # Configure Tesseract to use a specific engine mode and page segmentation
                 tesseract_config = r'--oem 3 --psm 6'
@@ -230,14 +457,90 @@ class MyMoneyProAutomator:
             finally:
                 if os.path.exists(screenshot_path_local):
                     os.remove(screenshot_path_local)
-                if os.path.exists("screen-processed.png"):  # Uncomment for debugging
-                    os.remove("screen-processed.png")
+                if os.path.exists(processed_path_local):  # Uncomment for debugging
+                    os.remove(processed_path_local)
                 self._execute_adb(f"rm {screenshot_path_phone}", check=False)
                 # logger.debug("Cleaned up screenshot files.")
         
         logger.error(f"Could not find '{target_text}' after {max_swipes} swipes.")
         return False
 
+    @property
+    def detects_prefilled_fields(self):
+        """True if the device configuration defines the regions needed to read the form fields."""
+        return any([self.coords.account_field_left_region, self.coords.account_field_right_region, self.coords.category_field_region])
+
+    def _ocr_region_text(self, img, region):
+        """OCRs a single line of text from the (x1, y1, x2, y2) region of a frame."""
+        x1, y1, x2, y2 = region
+        gray = cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
+        return pytesseract.image_to_string(thresh, config=r'--oem 3 --psm 7').strip()
+
+    def ocr_region_lines(self, img, region):
+        """
+        OCRs a multi-line (x1, y1, x2, y2) region of a frame, such as a list column.
+
+        Returns:
+            list: (y centre on the screen, text) for every line of text, top to bottom.
+        """
+        x1, y1, x2, y2 = region
+        gray = cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
+        ocr_data = pytesseract.image_to_data(thresh, config=r'--oem 3 --psm 6', output_type=pytesseract.Output.DICT)
+
+        lines = {}
+        for i, word in enumerate(ocr_data['text']):
+            if not word.strip() or float(ocr_data['conf'][i]) < 0:
+                continue
+            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+            lines.setdefault(key, []).append((ocr_data['top'][i] + ocr_data['height'][i] / 2, word.strip()))
+        return sorted((y1 + sum(y for y, _ in words) / len(words), " ".join(word for _, word in words)) for words in lines.values())
+
+    def read_form_fields(self):
+        """
+        Reads the account and category values currently shown on the add form
+        from a single screenshot.
+
+        Returns:
+            dict: 'account_left', 'account_right' and 'category' -> OCR text,
+                  for the regions configured for this device.
+        """
+        return self._read_form_fields_from(self._capture_screen())
+
+    def _read_form_fields_from(self, img):
+        """OCRs the configured form field regions of an already captured frame."""
+        regions = {
+            'account_left': self.coords.account_field_left_region,
+            'account_right': self.coords.account_field_right_region,
+            'category': self.coords.category_field_region,
+        }
+        fields = {name: self._ocr_region_text(img, region) for name, region in regions.items() if region}
+        logger.debug(f"Form fields detected: {fields}")
+        return fields
+
+    def _field_matches(self, field_text, target_text):
+        """
+        Returns True if an OCR'd form field shows `target_text`.
+
+        Long names are truncated by the app with '...'. A truncated field only
+        counts as a match if no other known account or category starts with the
+        same text; otherwise the field is selected again to be safe.
+        """
+        if not field_text:
+            return False
+        normalize = lambda text: re.sub(r'[^a-z0-9]', '', str(text).lower())
+        field, target = normalize(field_text), normalize(target_text)
+        if field == target:
+            return True
+        if len(field) < len(normalize(target_text[:self.coords.category_name_crop])) or not target.startswith(field):
+            return False
+        others = [name for name in KNOWN_FIELD_NAMES if normalize(name) != target and normalize(name).startswith(field)]
+        if others:
+            logger.debug(f"Form field '{field_text}' could also be {others}. Selecting '{target_text}' again.")
+            return False
+        return True
+
     def select_account(self, account_name, left_or_right='left'):
         """
         Selects an account from the list.
@@ -249,6 +552,7 @@ class MyMoneyProAutomator:
             self._tap(self.coords.account_entry_left_coords[0], self.coords.account_entry_left_coords[1], purpose="Open account list(left side)")
         else:
             self._tap(self.coords.account_entry_right_coords[0], self.coords.account_entry_right_coords[1], purpose="Open account list (right side)")
+        if not self._wait_for_screen(ACCOUNT_LIST_SCREEN): return False
         return self._find_and_tap_text(account_name, screen_type='account')
 
     def select_category(self, category_name):
@@ -260,14 +564,16 @@ class MyMoneyProAutomator:
         logger.info(f"--- Selecting Category: {category_name} ---")
         category_name = category_name[:self.coords.category_name_crop]  # Ensure the category name is not too long
         self._tap(self.coords.category_entry_coords[0], self.coords.category_entry_coords[1], purpose="Open category list")
+        if not self._wait_for_screen(CATEGORY_GRID_SCREEN): return False
         return self._find_and_tap_text(category_name, screen_type='category')
 
-    def enter_amount(self, amount_str):
+    def enter_amount(self, amount_str, entry_type='expense'):
         """
         Enters the transaction amount using the on-screen custom keypad.
         It iterates through each character of the amount string and taps the
         corresponding key on the screen.
         It also removes trailing '.0' from whole numbers.
+        The keypad is part of the add form, so the form of `entry_type` must be showing.
         """
         # Convert amount to string and check if it's a whole number ending in .0
         amount_to_type = str(amount_str)
@@ -275,93 +581,236 @@ class MyMoneyProAutomator:
             amount_to_type = amount_to_type[:-2] # Remove the ".0"
 
         logger.info(f"--- Entering Amount: {amount_to_type} (Original: {amount_str}) ---")
+        if not self._wait_for_screen(ENTRY_FORM_SCREENS[entry_type.lower()]):
+            raise RuntimeError(f"The add {entry_type.lower()} form (with the amount keypad) is not showing.")
         for char in amount_to_type:
             if char in self.coords.keypad_coords:
                 self._tap(self.coords.keypad_coords[char][0], self.coords.keypad_coords[char][1], purpose=f"Enter amount digit '{char}'")
 
-    def set_date(self, target_date: datetime):
+    def _picker_start_date(self):
+        """Returns the date the date picker will show when it opens."""
+        if self.coords.date_picker_remembers_last_date and self._last_picked_date:
+            return self._last_picked_date
+        return datetime.now()
+
+    def _forget_picker_state(self):
         """
-        Sets the date using the app's date picker dialog.
+        Forgets the tracked date and time picker state, e.g. after a discarded
+        form or an app restart, when it is no longer known what the pickers show.
+        """
+        self._last_picked_date = None
+        self._pending_picked_date = None
+        self._time_keypad_mode_active = False
 
-        This method is designed to be robust against the changing layout of the
-        calendar grid from month to month. It works by programmatically
-        calculating the correct position of the target day rather than relying
-        on hardcoded coordinates for each day.
+    def date_navigation_costs(self, target_date: datetime, start_date: datetime = None):
+        """
+        Estimates the number of device actions needed to select `target_date` with
+        each navigation path the date picker supports on this device.
 
         Args:
-            target_date (datetime): The specific date to be selected.
+            target_date (datetime): The date to be selected.
+            start_date (datetime, optional): The date the picker opens on.
+                                             Defaults to the tracked picker state.
+
+        Returns:
+            dict: Path name ('arrows', 'year_jump', 'text_input') -> action count.
+                  Paths the device configuration does not support are left out.
+        """
+        start_date = start_date or self._picker_start_date()
+        month_diff = (target_date.year - start_date.year) * 12 + (target_date.month - start_date.month)
+        # Month arrows, then the day cell.
+        costs = {'arrows': abs(month_diff) + 1}
+
+        year_diff = target_date.year - start_date.year
+        if (self.coords.date_year_header_coords and self.coords.date_year_list_center_coords
+                and year_diff != 0 and abs(year_diff) <= self.coords.date_year_list_visible_years):
+            # Header, year, remaining month arrows, then the day cell.
+            costs['year_jump'] = 2 + abs(target_date.month - start_date.month) + 1
+
+        if self.coords.date_text_input_mode_coords and self.coords.date_text_input_field_coords:
+            # Mode switch, field tap, one clear sequence and one typed date.
+            costs['text_input'] = 4
+        return costs
+
+    def _tap_month_arrows(self, month_diff):
+        """Taps the '<' or '>' arrow once per month of difference."""
+        direction = 'next' if month_diff > 0 else 'prev'
+        for _ in range(abs(month_diff)):
+            self._tap(self.coords.date_month_change_coords[direction][0], self.coords.date_month_change_coords[direction][1], purpose=f"{direction.capitalize()} month")
+
+    def _tap_day_cell(self, target_date: datetime):
+        """
+        Dynamically finds the position of the target day and taps it.
+        It builds a virtual calendar for the target month and finds the row/column of the target day.
         """
-        logger.info(f"--- Setting Date to: {target_date.strftime('%Y-%m-%d')} ---")
-        # 1. Open the date picker dialog.
-        self._tap(self.coords.date_picker_entry_coords[0], self.coords.date_picker_entry_coords[1], purpose="Open date picker")
-        
-        # 2. Navigate to the correct month and year by tapping the '<' or '>' arrows.
-        # It calculates how many months to move forward or backward from the current view.
-        self._current_picker_date = datetime.now()
-        month_diff = (target_date.year - self._current_picker_date.year) * 12 + (target_date.month - self._current_picker_date.month)
-        logger.debug(f"Current Picker Date: {self._current_picker_date}, Target Date: {target_date}, Month Difference: {month_diff}")
-        if month_diff > 0:
-            for _ in range(month_diff): self._tap(self.coords.date_month_change_coords['next'][0], self.coords.date_month_change_coords['next'][1], purpose="Next month")
-        elif month_diff < 0:
-            for _ in range(abs(month_diff)): self._tap(self.coords.date_month_change_coords['prev'][0], self.coords.date_month_change_coords['prev'][1], purpose="Previous month")
-        
-        # 3. Dynamically find the position of the target day.
-        # It builds a virtual calendar for the target month and finds the row/column of the target day.
         month_calendar = self.calendar.monthdayscalendar(target_date.year, target_date.month)
         for week_index, week in enumerate(month_calendar):
             if target_date.day in week:
-                # 4. Map the row/column to the actual screen coordinates and tap.
+                # Map the row/column to the actual screen coordinates and tap.
                 day_index = week.index(target_date.day)
                 self._tap(self.coords.date_grid_x_coords[day_index], self.coords.date_grid_y_coords[week_index], purpose=f"Select day {target_date.day}")
                 break
-        
-        # 5. Finalize by tapping the 'OK' button.
+
+    def set_date(self, target_date: datetime, path=None):
+        """
+        Sets the date using the app's date picker dialog.
+
+        The picker's current month is tracked rather than assumed, and the
+        cheapest navigation path (see `date_navigation_costs`) is used: month
+        arrows for nearby dates, the header year list or the text input mode
+        for backfills. The day cell is located programmatically so the method
+        is robust against the changing layout of the calendar grid.
+
+        Args:
+            target_date (datetime): The specific date to be selected.
+            path (str, optional): Force a navigation path instead of the cheapest one.
+        """
+        logger.info(f"--- Setting Date to: {target_date.strftime('%Y-%m-%d')} ---")
+        start_date = self._picker_start_date()
+        costs = self.date_navigation_costs(target_date, start_date)
+        if path not in costs:
+            # A planned path may not fit the picker state any more (e.g. the year list cannot reach the year).
+            path = min(costs, key=costs.get)
+        logger.debug(f"Picker opens on: {start_date:%Y-%m}, Target Date: {target_date:%Y-%m-%d}, Path: {path}, Costs: {costs}")
+
+        # 1. Open the date picker dialog.
+        self._tap(self.coords.date_picker_entry_coords[0], self.coords.date_picker_entry_coords[1], purpose="Open date picker")
+        if not self._wait_for_screen(DATE_DIALOG_SCREEN):
+            raise RuntimeError("Date picker dialog did not open.")
+
+        # 2. Navigate to the target date.
+        if path == 'text_input':
+            self._tap(self.coords.date_text_input_mode_coords[0], self.coords.date_text_input_mode_coords[1], purpose="Switch to date text input")
+            self._tap(self.coords.date_text_input_field_coords[0], self.coords.date_text_input_field_coords[1], purpose="Tap date field")
+            # Clear the prefilled date in a single round trip: jump to the end, then delete.
+            self._press_key(" ".join(["KEYCODE_MOVE_END"] + ["KEYCODE_DEL"] * 12))
+            self._type_text(target_date.strftime(self.coords.date_text_input_format))
+        else:
+            month_diff = (target_date.year - start_date.year) * 12 + (target_date.month - start_date.month)
+            if path == 'year_jump':
+                year_diff = target_date.year - start_date.year
+                center_x, center_y = self.coords.date_year_list_center_coords
+                self._tap(self.coords.date_year_header_coords[0], self.coords.date_year_header_coords[1], purpose="Open year list")
+                self._tap(center_x, center_y + year_diff * self.coords.date_year_list_row_height, purpose=f"Select year {target_date.year}")
+                # The picker keeps the month when the year changes.
+                month_diff = target_date.month - start_date.month
+            self._tap_month_arrows(month_diff)
+            self._tap_day_cell(target_date)
+
+        # 3. Finalize by tapping the 'OK' button.
         self._tap(self.coords.date_ok_coords[0], self.coords.date_ok_coords[1], purpose="Confirm date (OK)")
+        # Only tracked once the entry is saved; a discarded form may not leave the picker on this date.
+        self._pending_picked_date = target_date
+
+    def _form_default_time(self):
+        """Returns the time a new entry form shows before it is changed."""
+        if self.coords.default_form_time:
+            return datetime.strptime(self.coords.default_form_time, '%I:%M %p')
+        return datetime.now()
 
     def set_time(self, target_time: datetime):
         """
         Sets the time using the app's time picker dialog.
 
-        This method smartly switches the time picker to its keyboard input mode,
-        which is more reliable to automate than the clock face. It handles
-        entering the hour, minute, and selecting AM/PM.
+        The dialog is skipped entirely when the target equals the form's default
+        time. Otherwise it is switched to its keyboard input mode (unless it is
+        already in it), AM/PM is only changed when it differs from the value the
+        dialog opens with, and the hour and minute are entered as one typed
+        sequence using the field-advance key.
 
         Args:
             target_time (datetime): The specific time to be selected.
         """
         logger.info(f"--- Setting Time to: {target_time.strftime('%I:%M %p')} ---")
+        default_time = self._form_default_time()
+        if target_time.strftime('%I:%M %p') == default_time.strftime('%I:%M %p'):
+            logger.debug("Target time equals the form default. Skipping the time picker.")
+            return
+
         # 1. Open the time picker dialog.
         self._tap(self.coords.time_picker_entry_coords[0], self.coords.time_picker_entry_coords[1], purpose="Open time picker")
+        if not self._wait_for_screen(TIME_DIALOG_SCREEN):
+            raise RuntimeError("Time picker dialog did not open.")
         
         # 2. Switch to the more reliable keyboard input mode.
-        self._tap(self.coords.time_keypad_mode_coords[0], self.coords.time_keypad_mode_coords[1], purpose="Switch to time keypad mode")
+        if not self._time_keypad_mode_active:
+            self._tap(self.coords.time_keypad_mode_coords[0], self.coords.time_keypad_mode_coords[1], purpose="Switch to time keypad mode")
+            self._time_keypad_mode_active = self.coords.time_picker_remembers_keypad_mode
 
-        # 3. Select AM or PM.
+        # 3. Select AM or PM, unless the dialog already shows it.
         target_ampm = target_time.strftime('%p')
-        logger.debug(f"Attempting to select {target_ampm}")
-        self._tap(self.coords.time_ampm_selector_coords[0], self.coords.time_ampm_selector_coords[1], purpose="Open AM/PM selector")
-        self._tap(self.coords.time_ampm_coords[target_ampm][0], self.coords.time_ampm_coords[target_ampm][1], purpose=f"Select {target_ampm}")
+        if target_ampm != default_time.strftime('%p'):
+            logger.debug(f"Attempting to select {target_ampm}")
+            self._tap(self.coords.time_ampm_selector_coords[0], self.coords.time_ampm_selector_coords[1], purpose="Open AM/PM selector")
+            self._tap(self.coords.time_ampm_coords[target_ampm][0], self.coords.time_ampm_coords[target_ampm][1], purpose=f"Select {target_ampm}")
         
-        # 4. Enter the hour.
+        # 4. Enter the hour and minute in one go.
         self._tap(self.coords.time_hour_coords[0], self.coords.time_hour_coords[1], purpose="Tap hour field")
-        self._type_text(target_time.strftime('%I')) # %I is for 12-hour format
+        self._type_sequence([
+            ('text', target_time.strftime('%I')), # %I is for 12-hour format
+            ('key', self.coords.time_field_advance_keycode),
+            ('text', target_time.strftime('%M')),
+        ])
         
-        # 5. Enter the minute.
-        self._tap(self.coords.time_minute_coords[0], self.coords.time_minute_coords[1], purpose="Tap minute field")
-        self._type_text(target_time.strftime('%M'))
-        
-        # 6. Finalize by tapping the 'OK' button.
+        # 5. Finalize by tapping the 'OK' button.
         self._tap(self.coords.time_ok_coords[0], self.coords.time_ok_coords[1], purpose="Confirm time (OK)")
 
-    def enter_notes(self, notes_text):
+    def enter_notes(self, notes_text, command=None):
         """
         Enters the transaction notes into the appropriate text field.
+        `command` is the precomputed typing command (see `text_command`), if planned.
         """
         logger.info(f"--- Entering Notes: {notes_text} ---")
         self._tap(self.coords.notes_section_coords[0], self.coords.notes_section_coords[1], purpose="Enter notes section")
-        self._type_text(notes_text)
+        self._type_text(notes_text, command=command)
 
-    def add_entry(self, expense_data, type):
+    def plan_entry(self, expense_data, start_date=None):
+        """
+        Works out the host-side part of an entry ahead of time: the amount, the
+        cheapest date picker path and the command that types the notes.
+        It never touches the device, so it can run while the device is busy.
+
+        Args:
+            expense_data (dict): The transaction to plan.
+            start_date (datetime, optional): The date the picker is expected to open on.
+                                             Defaults to the tracked picker state.
+
+        Returns:
+            dict: The entry plan used by `add_entry`.
+        """
+        start_date = start_date or self._picker_start_date()
+        date_costs = self.date_navigation_costs(expense_data['datetime'], start_date)
+        plan = {
+            'amount': expense_data['amount'],
+            'date_start': (start_date.year, start_date.month),
+            'date_path': min(date_costs, key=date_costs.get),
+            'notes_command': self.text_command(expense_data['notes']),
+        }
+        logger.trace(f"Entry plan for '{expense_data['notes']}': {plan}")
+        return plan
+
+    def _take_plan(self, expense_data):
+        """
+        Returns the prefetched plan for this entry, or builds it now. A prefetched
+        plan whose picker start month is not the tracked one (the previous save
+        failed) is built again.
+        """
+        plan = None
+        if self._next_plan and self._next_plan[0] is expense_data:
+            plan = self.overlap.result(self._next_plan[1])
+            start_date = self._picker_start_date()
+            if plan['date_start'] != (start_date.year, start_date.month):
+                plan = None
+        self._next_plan = None
+        return plan or self.plan_entry(expense_data)
+
+    def _enter_amount_date_time(self, expense_data, plan):
+        """Fills the fields that do not depend on the account or category."""
+        self.enter_amount(plan['amount'], expense_data.get('type', 'expense'))
+        self.set_date(expense_data['datetime'], path=plan['date_path'])
+        self.set_time(expense_data['datetime'])
+
+    def add_entry(self, expense_data, type, next_entry=None):
         """
         Orchestrates the entire process of adding a single expense.
 
@@ -372,29 +821,50 @@ class MyMoneyProAutomator:
         Args:
             expense_data (dict): A dictionary containing all necessary details
                                  for a single transaction.
+            next_entry (dict, optional): The transaction that follows. With overlap
+                                         enabled, its plan is prepared during the save.
 
         Returns:
             bool: True if the expense was added successfully, False otherwise.
         """
         logger.info(f"--- Adding {expense_data.get('type')}: {expense_data['notes']} ---")
         try:
+            plan = self._take_plan(expense_data)
             # 1. Fill in all the details in the specified order.
             # If any step fails, it will return False and stop this transaction.
-            if not self.select_account(expense_data['account'], left_or_right='left'): return False
+            # Fields the form already shows (the app preselects the last used values) are not selected again.
+            prefilled = self.read_form_fields() if self.detects_prefilled_fields else {}
+            if self._field_matches(prefilled.get('account_left'), expense_data['account']):
+                logger.info(f"Account '{expense_data['account']}' is already selected. Skipping.")
+            elif not self.select_account(expense_data['account'], left_or_right='left'): return False
             if type.lower() == 'income' or type.lower() == 'expense':
-                if not self.select_category(expense_data['category']): return False
+                if self._field_matches(prefilled.get('category'), expense_data['category']):
+                    logger.info(f"Category '{expense_data['category']}' is already selected. Skipping.")
+                elif not self.select_category(expense_data['category']): return False
             elif type.lower() == 'transfer':
-                if not self.select_account(expense_data['category'], left_or_right='right'): return False  # It's actual value will be an Account in case of Transfer
+                # It's actual value will be an Account in case of Transfer
+                if self._field_matches(prefilled.get('account_right'), expense_data['category']):
+                    logger.info(f"Destination account '{expense_data['category']}' is already selected. Skipping.")
+                elif not self.select_account(expense_data['category'], left_or_right='right'): return False
 
-            self.enter_amount(expense_data['amount'])
-            self.set_date(expense_data['datetime'])
-            self.set_time(expense_data['datetime'])
-            self.enter_notes(expense_data['notes'])
+            self._enter_amount_date_time(expense_data, plan)
+            self.enter_notes(expense_data['notes'], command=plan['notes_command'])
             
             # 2. Save the expense and wait for the app to return to the main screen.
             logger.info("--- Saving Expense ---")
             self._tap(self.coords.save_button_coords[0], self.coords.save_button_coords[1], purpose="Save expense")
-            time.sleep(self.coords.LONG_DELAY)
+            self._save_tapped = True
+            if self.overlap and next_entry is not None:
+                # Plan the next entry while the app animates back to the main screen,
+                # assuming the save succeeds and the picker keeps this entry's date.
+                expected_start = self._pending_picked_date if self.coords.date_picker_remembers_last_date else None
+                self._next_plan = (next_entry, self.overlap.submit(self.plan_entry, next_entry, expected_start))
+            if not self._wait_for_screen(MAIN_SCREEN, fallback_delay=self.coords.LONG_DELAY):
+                logger.error("The app did not return to the main screen after saving.")
+                return False
+            if self._pending_picked_date:
+                self._last_picked_date = self._pending_picked_date
+                self._pending_picked_date = None
             
             return True
         except Exception as e:
@@ -402,29 +872,37 @@ class MyMoneyProAutomator:
             logger.error("You may need to manually press CANCEL on the phone to reset the app state.")
             return False
     
-    def begin_entry(self, expense_data):
+    def begin_entry(self, expense_data, next_entry=None):
         """
         Starts the process of adding a new expense.
         This method is called to ensure the app is ready for a new entry.
         It can be used to reset the app state if needed.
+        `next_entry` is passed on to `add_entry` for planning ahead.
         """
         self._check_app_focus() # Security check before every tap
         start_time = time.time()
+        self._entry_cache_hits = []
+        self._save_tapped = False
+        self._pending_picked_date = None
         logger.info(f"\n>>> PROCESSING ENTRY: {expense_data['notes']} <<<")
         try:
             # 1. Start from the main screen and tap the button to add a new entry.
+            if not self._wait_for_screen(MAIN_SCREEN):
+                logger.error("Not on the main screen. Refusing to start a new entry.")
+                return False
             logger.info("--- Navigating to Add Expense screen ---")
             self._tap(self.coords.initiate_new_entry_coords[0], self.coords.initiate_new_entry_coords[1], purpose="Initiate new expense entry")
-            time.sleep(self.coords.LONG_DELAY)
+            if not self._wait_for_screen(ENTRY_FORM_SCREENS['expense'], fallback_delay=self.coords.LONG_DELAY): return False
 
             # 2. Check if the entry is an Income or Transfer and navigate accordingly.
             if expense_data.get('type').lower() == 'income':
                 self._tap(self.coords.income_entry_coords[0], self.coords.income_entry_coords[1], purpose="Select Income Entry")
             elif expense_data.get('type').lower() == 'transfer':
                 self._tap(self.coords.transfer_entry_coords[0], self.coords.transfer_entry_coords[1], purpose="Select Transfer Entry")
+            if not self._wait_for_screen(ENTRY_FORM_SCREENS[expense_data.get('type', 'expense').lower()]): return False
             
             # 3. Now we are on the appropriate Income/Expense/Transfer screen, ready to fill in details.
-            success = self.add_entry(expense_data, type=expense_data.get('type', 'expense'))
+            success = self.add_entry(expense_data, type=expense_data.get('type', 'expense'), next_entry=next_entry)
             
             logger.success(">>> SUCCESSFULLY ADDED ENTRY! <<<")
             elapsed_time = time.time() - start_time
@@ -435,3 +913,169 @@ class MyMoneyProAutomator:
             logger.exception("An error occurred while processing the entry.")
             logger.error("You may need to manually press CANCEL on the phone to reset the app state.")
             return False
+
+    def _dump_hierarchy(self):
+        """Returns the uiautomator dump of the current screen as XML text."""
+        self._check_app_focus()
+        result = subprocess.run(f"{self.adb} exec-out uiautomator dump /dev/tty", shell=True, check=True, capture_output=True)
+        xml = result.stdout.decode('utf-8', errors='replace')
+        # The dump is followed by a status line ("UI hierchary dumped to: /dev/tty").
+        return xml[:xml.rfind('>') + 1]
+
+    def _hierarchy_lines(self, xml, region):
+        """Returns (y centre, text) of every text node inside the region of a uiautomator dump."""
+        x1, y1, x2, y2 = region
+        lines = []
+        for node in ET.fromstring(xml).iter('node'):
+            text = (node.get('text') or '').strip()
+            bounds = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', node.get('bounds', ''))
+            if not text or not bounds:
+                continue
+            left, top, right, bottom = map(int, bounds.groups())
+            x, y = (left + right) / 2, (top + bottom) / 2
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                lines.append((y, text))
+        return sorted(lines)
+
+    def capture_transaction_list(self):
+        """
+        Device part of reading the main screen's transaction list
+        (`transaction_list_region`): one screenshot or hierarchy dump.
+
+        Returns:
+            callable: Host-side work that turns the capture into (y centre, text)
+                      lines, top to bottom. It never touches the device, so it can
+                      run in the background. None if the list could not be captured.
+        """
+        region = self.coords.transaction_list_region
+        if not region:
+            logger.warning("'transaction_list_region' is not set for this device. Cannot verify entries.")
+            return None
+        if not self._wait_for_screen(MAIN_SCREEN):
+            logger.error("Not on the main screen. Cannot read the transaction list.")
+            return None
+        if self.coords.transaction_list_source == 'hierarchy':
+            return partial(self._hierarchy_lines, self._dump_hierarchy(), region)
+        return partial(self.ocr_region_lines, self._capture_screen(), region)
+
+    def read_transaction_list(self):
+        """
+        Reads the lines of text in the main screen's transaction list
+        (`transaction_list_region`), with a single screenshot or hierarchy dump.
+
+        Returns:
+            list: (y centre, text) for every line, top to bottom, or None if the list could not be read.
+        """
+        read_lines = self.capture_transaction_list()
+        return read_lines() if read_lines else None
+
+    def capture_accounts_pages(self):
+        """
+        Opens the accounts page from the main screen, captures each page of the
+        account list once (see `accounts_page_swipes`) and returns to the main screen.
+
+        Returns:
+            list: One screenshot per page, or an empty list if the page could not be captured.
+        """
+        if not self.coords.accounts_page_coords:
+            logger.warning("'accounts_page_coords' is not set for this device. Cannot read account balances.")
+            return []
+        if not self._wait_for_screen(MAIN_SCREEN):
+            logger.error("Not on the main screen. Cannot open the accounts page.")
+            return []
+
+        pages = []
+        self._tap(self.coords.accounts_page_coords[0], self.coords.accounts_page_coords[1], purpose="Open accounts page")
+        try:
+            if not self._wait_for_screen(ACCOUNTS_PAGE_SCREEN, fallback_delay=self.coords.LONG_DELAY):
+                return []
+            for page in range(self.coords.accounts_page_swipes + 1):
+                if page:
+                    self._swipe(*self.coords.swipe_coords)
+                pages.append(self._capture_screen())
+        finally:
+            if self.coords.accounts_page_exit_coords:
+                self._tap(self.coords.accounts_page_exit_coords[0], self.coords.accounts_page_exit_coords[1], purpose="Leave accounts page")
+            else:
+                self._press_key("KEYCODE_BACK")
+            self._wait_for_screen(MAIN_SCREEN, fallback_delay=self.coords.LONG_DELAY)
+        logger.info(f"Captured {len(pages)} accounts page(s).")
+        return pages
+
+    def _relaunch_app(self):
+        """Force-stops the app and starts it again, which always lands on the main screen."""
+        package = self.coords.app_package_name
+        logger.warning(f"Force-stopping and relaunching '{package}'...")
+        self._forget_picker_state()  # The restarted app opens its pickers in their default state
+        self._execute_adb(f"am force-stop {package}", check=False)
+        if self.coords.app_launch_activity:
+            self._execute_adb(f"am start -n {package}/{self.coords.app_launch_activity}", check=False)
+        else:
+            self._execute_adb(f"monkey -p {package} -c android.intent.category.LAUNCHER 1", check=False)
+        time.sleep(self.coords.APP_LAUNCH_DELAY)
+
+    def recover_to_main_screen(self, max_back_presses=4):
+        """
+        Brings the app back to its main screen after a failed entry, discarding
+        the half-filled form.
+
+        It presses BACK until the main screen is detected. If that does not work,
+        or the main screen has not been learned for this device, the app is
+        force-stopped and relaunched.
+
+        Returns:
+            bool: True if the app is on its main screen (or was relaunched), False otherwise.
+        """
+        logger.warning("--- Recovering app state ---")
+        # The half-filled form is discarded, so the picker may not show its date.
+        self._forget_picker_state()
+        if self.screens.knows(MAIN_SCREEN):
+            for _ in range(max_back_presses):
+                if not self._is_app_focused():
+                    break
+                if self.screens.matches(MAIN_SCREEN, self._capture_screen()):
+                    logger.success("Recovered: back on the main screen.")
+                    return True
+                self._press_key("KEYCODE_BACK")
+                time.sleep(self.coords.LONG_DELAY)
+
+        self._relaunch_app()
+        if not self._is_app_focused():
+            logger.error("The app is not in the foreground after relaunching.")
+            return False
+        if self.screens.knows(MAIN_SCREEN) and not self._wait_for_screen(MAIN_SCREEN):
+            return False
+        logger.success("Recovered: app relaunched on the main screen.")
+        return True
+
+    def enter_with_recovery(self, expense_data, next_entry=None, max_attempts=3):
+        """
+        Adds an entry, recovering the app state and retrying on failure.
+
+        After a failed attempt, the app is brought back to the main screen and the
+        cache entries used in that attempt are invalidated, since a stale location
+        is the most common cause of a wrong tap. An entry is never retried once
+        its save button was tapped, to avoid adding it twice.
+
+        Returns:
+            str: 'Added', or 'Failed' for a hard failure of this entry.
+            None: The app could not be recovered, so the batch cannot continue.
+        """
+        for attempt in range(1, max_attempts + 1):
+            if self.begin_entry(expense_data, next_entry=next_entry):
+                return 'Added'
+
+            logger.warning(f"Attempt {attempt}/{max_attempts} failed for '{expense_data['notes']}'.")
+            for name in self._entry_cache_hits:
+                logger.info(f"Invalidating cached location of '{name}'.")
+                self.cache.invalidate(name)
+            self.cache.save()
+            if not self.recover_to_main_screen():
+                logger.critical("Could not bring the app back to its main screen.")
+                return None
+            if self._save_tapped:
+                logger.error(f"'{expense_data['notes']}' failed after its save tap. It may have been saved; not retrying.")
+                return 'Failed'
+
+        logger.error(f"Giving up on '{expense_data['notes']}' after {max_attempts} attempts.")
+        return 'Failed'
@@ -0,0 +1,256 @@
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Column order of the processed statement files.
+EXCEL_COLUMNS = ['Type', 'Account', 'Category', 'Amount', 'Notes', 'Datetime', 'Status', 'Description']
+EXCEL_DATETIME_FORMAT = '%Y-%m-%d %I:%M %p'
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and pd.isna(value))
+
+def _intern(value):
+    """Interns names (account, category, type) so every record shares one copy of each."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Transaction:
+    """
+    One transaction to be entered, as a compact immutable record.
+
+    Fields are stored in __slots__ and account, category and type names are
+    interned, so thousands of records share a single copy of every name. The
+    record cannot be changed after creation; use `replace` to derive a new one.
+
+    For compatibility with code written against the old dictionaries, fields
+    can also be read with `tx['account']`, `tx.get('sequence')` and
+    `'notes' in tx`. Optional fields that are not set (None) behave like
+    missing dictionary keys.
+    """
+    __slots__ = ('type', 'account', 'category', 'amount', 'notes', 'datetime',
+                 'status', 'description', 'source', 'original_index', 'sequence', 'fingerprint')
+
+    def __init__(self, account=None, category=None, amount=None, notes=None, datetime=None, type='Expense',
+                 status=None, description=None, source=None, original_index=None, sequence=None, fingerprint=None):
+        set_field = object.__setattr__
+        set_field(self, 'type', _intern(type))
+        set_field(self, 'account', _intern(account))
+        set_field(self, 'category', _intern(category))
+        set_field(self, 'amount', amount)
+        if notes is not None and not isinstance(notes, str):
+            # Empty note cells come out of Excel as NaN; they are entered as an empty note.
+            notes = '' if _is_missing(notes) else str(notes)
+        set_field(self, 'notes', notes)
+        set_field(self, 'datetime', datetime)
+        set_field(self, 'status', status)
+        set_field(self, 'description', None if _is_missing(description) else description)
+        # The statement the transaction came from (e.g. 'HDFC'), if the master file records it.
+        set_field(self, 'source', None if _is_missing(source) else _intern(source))
+        set_field(self, 'original_index', None if _is_missing(original_index) else int(original_index))
+        set_field(self, 'sequence', None if _is_missing(sequence) else sequence)
+        set_field(self, 'fingerprint', fingerprint)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a record from a transaction dictionary (lower-case keys). Unknown keys are
+        ignored and missing ones stay unset, so validation can still report them.
+        Passing a Transaction returns it unchanged.
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def replace(self, **changes):
+        """Returns a copy of the record with the given fields changed."""
+        fields = {field: getattr(self, field) for field in self.__slots__}
+        fields.update(changes)
+        return Transaction(**fields)
+
+    def to_dict(self):
+        """Returns the set fields as a plain dictionary."""
+        return dict(self.items())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Transaction records are immutable. Use replace() instead.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Transaction records are immutable.")
+
+    # --- Read-only mapping interface, for code written against dictionaries ---
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def keys(self):
+        return [field for field in self.__slots__ if getattr(self, field) is not None]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.keys()]
+
+    def __eq__(self, other):
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self):
+        return (f"Transaction({self.type} {self.amount} {self.account} -> {self.category}, "
+                f"{self.datetime}, notes={self.notes!r})")
+
+
+def to_transactions(transactions):
+    """Converts transaction dictionaries (or records) to Transaction records."""
+    return [Transaction.from_dict(tx) for tx in transactions]
+
+
+class TransactionBatch:
+    """
+    Columnar form of a list of transactions, for bulk operations.
+
+    The numeric fields live in one NumPy structured array. Account and category
+    names are stored as integer codes into a shared `names` table (a transfer's
+    category is an account, so both columns use the same codes), and types as
+    codes into `types`. Amounts are also kept in integer paise, so sums are
+    exact. Notes, statuses, descriptions and sources are kept in separate
+    object arrays, since they are only needed when converting back.
+    """
+    DTYPE = np.dtype([
+        ('type', np.uint8),
+        ('account', np.int32),
+        ('category', np.int32),
+        ('amount', np.float64),
+        ('amount_paise', np.int64),
+        ('datetime', 'datetime64[m]'),
+        ('original_index', np.int64),  # -1 when the transaction has no Excel row
+        ('sequence', np.float64),  # NaN when unset
+    ])
+
+    def __init__(self, records, types, names, notes, statuses, descriptions, sources):
+        self.records = records
+        self.types = list(types)
+        self.names = list(names)
+        self.notes = notes
+        self.statuses = statuses
+        self.descriptions = descriptions
+        self.sources = sources
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Builds a batch from a DataFrame of transactions (as read from a processed
+        Excel file; column names are matched case-insensitively).
+
+        Raises:
+            ValueError: If a transaction has no account or no category, since
+                        there is no name code to store for it.
+        """
+        df = df.rename(columns=str.lower)
+        types, type_names = pd.factorize(df['type'].fillna('Expense') if 'type' in df else pd.Series(['Expense'] * len(df)))
+        names, name_table = pd.factorize(pd.concat([df['account'], df['category']], ignore_index=True))
+        missing = (names[:len(df)] == -1) | (names[len(df):] == -1)
+        if missing.any():
+            raise ValueError(f"Transactions without an account or category at rows {df.index[missing].tolist()}. "
+                             f"Fill them in (validate_transactions reports them) before building a batch.")
+
+        records = np.empty(len(df), dtype=cls.DTYPE)
+        records['type'] = types
+        records['account'] = names[:len(df)]
+        records['category'] = names[len(df):]
+        records['amount'] = pd.to_numeric(df['amount']).to_numpy(dtype=np.float64)
+        records['amount_paise'] = np.rint(records['amount'] * 100).astype(np.int64)
+        datetimes = df['datetime']
+        if not pd.api.types.is_datetime64_any_dtype(datetimes):
+            datetimes = pd.to_datetime(datetimes, format=EXCEL_DATETIME_FORMAT)
+        records['datetime'] = datetimes.to_numpy(dtype='datetime64[m]')
+        records['original_index'] = (df['original_index'] if 'original_index' in df else pd.Series(df.index)).fillna(-1).to_numpy(dtype=np.int64)
+        records['sequence'] = pd.to_numeric(df['sequence'], errors='coerce').to_numpy(dtype=np.float64) if 'sequence' in df else np.nan
+
+        def column(name):
+            return df[name].to_numpy(dtype=object) if name in df else np.full(len(df), None, dtype=object)
+        return cls(records, [_intern(name) for name in type_names], [_intern(name) for name in name_table],
+                   column('notes'), column('status'), column('description'), column('source'))
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """Builds a batch from Transaction records or transaction dictionaries."""
+        transactions = to_transactions(transactions)
+        return cls.from_frame(pd.DataFrame({
+            'type': [tx.type for tx in transactions],
+            'account': [tx.account for tx in transactions],
+            'category': [tx.category for tx in transactions],
+            'amount': [tx.amount for tx in transactions],
+            'datetime': pd.to_datetime([tx.datetime for tx in transactions]),
+            'original_index': pd.array([tx.original_index for tx in transactions], dtype='Int64'),
+            'sequence': [tx.sequence for tx in transactions],
+            'notes': [tx.notes for tx in transactions],
+            'status': [tx.status for tx in transactions],
+            'description': [tx.description for tx in transactions],
+            'source': [tx.source for tx in transactions],
+        }))
+
+    @classmethod
+    def from_excel(cls, file_path, engine='openpyxl'):
+        """Loads the pending transactions of a processed Excel file as a batch."""
+        from src.data_loader import iter_pending_transactions
+
+        return cls.from_transactions(iter_pending_transactions(file_path, engine=engine))
+
+    def column(self, field):
+        """Returns a column with codes resolved to names ('type', 'account', 'category') or as stored."""
+        if field == 'type':
+            return np.asarray(self.types, dtype=object)[self.records['type']]
+        if field in ('account', 'category'):
+            return np.asarray(self.names, dtype=object)[self.records[field]]
+        return self.records[field]
+
+    def to_transactions(self):
+        """Converts the batch back to Transaction records."""
+        types = self.column('type')
+        accounts = self.column('account')
+        categories = self.column('category')
+        transactions = []
+        for i, record in enumerate(self.records):
+            transactions.append(Transaction(
+                type=types[i],
+                account=accounts[i],
+                category=categories[i],
+                amount=float(record['amount']),
+                notes=self.notes[i],
+                datetime=record['datetime'].astype(datetime),
+                status=self.statuses[i],
+                description=self.descriptions[i],
+                source=self.sources[i],
+                original_index=None if record['original_index'] < 0 else int(record['original_index']),
+                sequence=None if np.isnan(record['sequence']) else float(record['sequence']),
+            ))
+        return transactions
+
+    def to_frame(self):
+        """Returns the batch as a DataFrame in the processed Excel file layout."""
+        return pd.DataFrame({
+            'Type': self.column('type'),
+            'Account': self.column('account'),
+            'Category': self.column('category'),
+            'Amount': self.records['amount'],
+            'Notes': self.notes,
+            'Datetime': pd.to_datetime(self.records['datetime']).strftime(EXCEL_DATETIME_FORMAT),
+            'Status': self.statuses,
+            'Description': self.descriptions,
+        })[EXCEL_COLUMNS]
@@ -21,6 +21,13 @@ accounts_list = [
     "Splitwise",
 ]
 
+# Statement files name the account by the last digits of its number (e.g. 'Acct Statement_XX2562_...').
+# Maps those digits to the account in the app.
+account_number_suffixes = {
+    "2562": "HDFC - UPI",
+    "6642": "HDFC - Special Gold",
+}
+
 income_categories_list = [
     # Income Categories
     "Bonus",    "Capital Gains",    "Others",
@@ -6,16 +6,51 @@ from src.app_coordinates.realme_coordinates import Realme7Coordinates
 from src.app_coordinates.s24u_coordinates import S24UCoordinates
 
 
-def get_phone_model():
+def adb_command(serial=None):
+    """
+    Returns the ADB command prefix for a device.
+
+    Args:
+        serial (str, optional): The device serial. Without it, ADB talks to the only connected device.
+    """
+    return f"adb -s {serial}" if serial else "adb"
+
+def list_connected_serials():
+    """
+    Lists the serials of all devices that are connected and authorized.
+
+    Returns:
+        list: Device serials as reported by `adb devices`.
+    """
+    try:
+        result = subprocess.run("adb devices", shell=True, check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        logger.critical("ADB not found. Please ensure it is installed and in your system's PATH.")
+        return []
+    except subprocess.CalledProcessError:
+        logger.critical("Could not list ADB devices.")
+        return []
+    serials = []
+    for line in result.stdout.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) == 2 and parts[1] == "device":
+            serials.append(parts[0])
+    logger.info(f"Connected devices: {serials}")
+    return serials
+
+def get_phone_model(serial=None):
     """
     Identifies the connected Android device's model name using ADB.
+
+    Args:
+        serial (str, optional): The device serial, when several devices are connected.
     
     Returns:
         str: The model name of the device (e.g., "RMX2151"), or None if not found.
     """
     try:
         result = subprocess.run(
-            "adb shell getprop ro.product.model",
+            f"{adb_command(serial)} shell getprop ro.product.model",
             shell=True,
             check=True,
             capture_output=True,
@@ -50,15 +85,18 @@ def get_device_config(model_name):
         logger.error("Please create a new coordinate file for your device and add it to the DEVICE_MAPPING.")
         return None
 
-def get_device_coordinates():
+def get_device_coordinates(serial=None):
     """
     Main function to get the device coordinates based on the connected phone model.
+
+    Args:
+        serial (str, optional): The device serial, when several devices are connected.
     
     Returns:
         An instance of the appropriate AppCoordinates subclass, or None if not found.
     """
     # --- NEW: Automatically detect phone and load config ---
-    connected_model = get_phone_model()
+    connected_model = get_phone_model(serial)
     if not connected_model:
         logger.error("Could not detect connected phone model.")
         raise
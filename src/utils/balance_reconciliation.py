@@ -0,0 +1,163 @@
+import re
+import difflib
+import pandas as pd
+from loguru import logger
+
+from src.transaction import TransactionBatch
+from src.utils.account_categories_list import accounts_list
+from src.utils.misc import net_diff_rollups
+
+# A balance as shown on the accounts page, e.g. '₹1,23,456.78', '-₹500' or '₹ -12.5'.
+_BALANCE_RE = re.compile(r'(-)?(?:₹|Rs\.?|INR)?(-)?(\d[\d,]*(?:\.\d{1,2})?)')
+
+
+def parse_balance(text):
+    """
+    Parses an OCR'd balance into paise.
+
+    Returns:
+        int: The balance in paise, or None if the text holds no amount.
+    """
+    match = _BALANCE_RE.search(text.replace(' ', ''))
+    if not match:
+        return None
+    rupees, _, fraction = match.group(3).replace(',', '').partition('.')
+    paise = int(rupees) * 100 + int((fraction + '00')[:2])
+    return -paise if match.group(1) or match.group(2) else paise
+
+
+class BalanceReconciler:
+    """
+    Batch-level verification of a run from the app's accounts page.
+
+    The accounts page is captured once before and once after the run, and the
+    change of every account's balance is compared with the net change the
+    added transactions should have caused. The account names are OCR'd only
+    in the first snapshot, which also records the row position of each
+    account; later snapshots OCR just the balance column and map each balance
+    to an account by its row.
+    """
+    def __init__(self, automator, accounts=None):
+        """
+        Args:
+            automator (MyMoneyProAutomator): The device whose accounts page is read.
+            accounts (list, optional): The valid account names. Defaults to `accounts_list`.
+        """
+        self.automator = automator
+        self.accounts = accounts or accounts_list
+        self.row_layout = None  # [(page, y, account)], learned from the first snapshot
+
+    def _match_account(self, text):
+        """Maps an OCR'd account name to a known account, tolerating small OCR errors."""
+        by_lower = {account.lower(): account for account in self.accounts}
+        if text.lower() in by_lower:
+            return by_lower[text.lower()]
+        close = difflib.get_close_matches(text.lower(), list(by_lower), n=1, cutoff=0.8)
+        return by_lower[close[0]] if close else None
+
+    def _learn_layout(self, pages):
+        region = self.automator.coords.account_name_column_region
+        self.row_layout = []
+        for page, img in enumerate(pages):
+            for y, text in self.automator.ocr_region_lines(img, region):
+                account = self._match_account(text)
+                if account:
+                    self.row_layout.append((page, y, account))
+        logger.debug(f"Accounts page layout: {[(page, round(y), account) for page, y, account in self.row_layout]}")
+
+    def snapshot(self):
+        """
+        Reads the balance of every account on the accounts page.
+
+        Returns:
+            dict: Account -> balance in paise, or None if the page could not be read.
+        """
+        return self.read_balances(self.capture())
+
+    def capture(self):
+        """
+        Device part of a snapshot: captures the pages of the accounts page.
+
+        Returns:
+            list: One screenshot per page, or None if the page is not configured or could not be captured.
+        """
+        coords = self.automator.coords
+        if not (coords.account_name_column_region and coords.account_balance_column_region):
+            logger.warning("The accounts page columns are not configured for this device. Skipping balance reconciliation.")
+            return None
+        return self.automator.capture_accounts_pages() or None
+
+    def read_balances(self, pages):
+        """
+        Host part of a snapshot: OCRs the captured pages. It never touches the
+        device, so it can run in the background (see OverlapExecutor).
+
+        Returns:
+            dict: Account -> balance in paise, or None if there are no pages.
+        """
+        if not pages:
+            return None
+        coords = self.automator.coords
+        if self.row_layout is None:
+            self._learn_layout(pages)
+
+        balances = {}
+        for page, img in enumerate(pages):
+            rows = [(y, account) for row_page, y, account in self.row_layout if row_page == page]
+            if not rows:
+                continue
+            for y, text in self.automator.ocr_region_lines(img, coords.account_balance_column_region):
+                balance = parse_balance(text)
+                if balance is None:
+                    continue
+                row_y, account = min(rows, key=lambda row: abs(row[0] - y))
+                if abs(row_y - y) <= coords.account_row_tolerance_pixels:
+                    balances[account] = balance
+        logger.info(f"Read {len(balances)} account balance(s) from the accounts page.")
+        return balances
+
+    def reconcile(self, before, after, added_transactions):
+        """
+        Compares the balance changes with the net changes the added transactions should cause.
+
+        Args:
+            before (dict): Balances from `snapshot` before the run.
+            after (dict): Balances from `snapshot` after the run.
+            added_transactions (list): The transactions that were added during the run.
+
+        Returns:
+            pd.DataFrame: One row per account with expected, observed and difference
+                          (in paise) and a status of 'OK', 'Mismatch' or 'Unreadable'.
+        """
+        expected = {}
+        if added_transactions:
+            accounts = net_diff_rollups(TransactionBatch.from_transactions(added_transactions))['accounts']
+            expected = dict(zip(accounts['account'], accounts['net']))
+        # Accounts that should have changed, and accounts that changed without being expected to.
+        changed = [account for account in after if account in before and after[account] != before[account]]
+        rows = []
+        for account in list(expected) + [account for account in changed if account not in expected]:
+            expected_net = expected.get(account, 0)
+            if account not in before or account not in after:
+                if expected_net:
+                    rows.append((account, expected_net, None, None, 'Unreadable'))
+                continue
+            observed = after[account] - before[account]
+            rows.append((account, expected_net, observed, observed - expected_net, 'OK' if observed == expected_net else 'Mismatch'))
+        report = pd.DataFrame(rows, columns=['account', 'expected', 'observed', 'difference', 'status'])
+
+        logger.info("="*50)
+        logger.info("POST-RUN VERIFICATION: BALANCE RECONCILIATION")
+        logger.info("="*50)
+        for row in report.itertuples(index=False):
+            if row.status == 'OK':
+                logger.success(f"{row.account}: {row.expected / 100:,.2f} as expected")
+            elif row.status == 'Mismatch':
+                logger.error(f"{row.account}: expected {row.expected / 100:,.2f}, balance changed by {row.observed / 100:,.2f} "
+                             f"(off by {row.difference / 100:,.2f})")
+            else:
+                logger.warning(f"{row.account}: expected {row.expected / 100:,.2f}, but its balance could not be read")
+        if report.empty:
+            logger.info("No balance changes expected or observed.")
+        logger.info("="*50)
+        return report
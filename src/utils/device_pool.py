@@ -0,0 +1,101 @@
+import threading
+from loguru import logger
+
+from src.utils.adb_utils import list_connected_serials
+
+
+class DevicePool:
+    """
+    Drives several connected phones at once, one MyMoneyProAutomator per device.
+
+    Every device owns a disjoint set of accounts (e.g. one phone per user
+    profile). Transactions are sharded by account so that each one is entered on
+    the device that owns its account, and every device works through its shard
+    in its own thread.
+    """
+    def __init__(self, device_accounts=None, serials=None):
+        """
+        Args:
+            device_accounts (dict, optional): Device serial -> list of accounts it owns.
+                                              Without it, accounts are spread evenly
+                                              across the devices (each account stays on one device).
+            serials (list, optional): The devices to use. Defaults to every connected device.
+        """
+        self.device_accounts = device_accounts
+        self.serials = serials or list_connected_serials()
+        self.automators = {}
+
+    def connect(self, text_backend='input', overlap=False):
+        """Builds one automator (own coordinates, cache and ADB serial) per device."""
+        from src.mymoneypro_automator import MyMoneyProAutomator
+
+        if not self.serials:
+            raise RuntimeError("No ADB devices connected.")
+        for serial in self.serials:
+            self.automators[serial] = MyMoneyProAutomator(text_backend=text_backend, serial=serial, overlap=overlap)
+            logger.success(f"Device '{serial}' ready ({self.automators[serial].coords.phone_name}).")
+        return self.automators
+
+    def _account_owners(self, transactions):
+        """Returns account -> serial for every account the transactions touch."""
+        if self.device_accounts:
+            return {account: serial for serial, accounts in self.device_accounts.items() for account in accounts}
+        accounts = sorted({tx['account'] for tx in transactions})
+        return {account: self.serials[i % len(self.serials)] for i, account in enumerate(accounts)}
+
+    def shard(self, transactions):
+        """
+        Splits the transactions by the device that owns their account.
+        For transfers, the source account decides; the destination must be owned by the same device.
+
+        Returns:
+            tuple: (dict serial -> list of transactions, list of unassigned transactions)
+        """
+        owners = self._account_owners(transactions)
+        shards = {serial: [] for serial in self.serials}
+        unassigned = []
+        for tx in transactions:
+            serial = owners.get(tx['account'])
+            if tx.get('type', 'expense').lower() == 'transfer' and self.device_accounts:
+                destination_owner = owners.get(tx['category'])
+                if destination_owner != serial:
+                    logger.error(f"Transfer '{tx['notes']}' spans accounts on different devices ({tx['account']} -> {tx['category']}).")
+                    serial = None
+            if serial not in shards:
+                logger.error(f"No connected device owns account '{tx['account']}'. Skipping '{tx['notes']}'.")
+                unassigned.append(tx)
+                continue
+            shards[serial].append(tx)
+
+        for serial, shard in shards.items():
+            logger.info(f"Device '{serial}': {len(shard)} transaction(s).")
+        return shards, unassigned
+
+    def run(self, shards, process_shard):
+        """
+        Processes every shard on its own device in parallel.
+
+        Args:
+            shards (dict): Device serial -> list of transactions.
+            process_shard (callable): (automator, transactions) -> None. It runs in a
+                                      worker thread, so any shared state it updates
+                                      must be protected by the caller.
+        """
+        threads = []
+        for serial, shard in shards.items():
+            if not shard:
+                continue
+            thread = threading.Thread(target=self._run_shard, args=(serial, shard, process_shard), name=f"device-{serial}")
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    def _run_shard(self, serial, shard, process_shard):
+        with logger.contextualize(device=serial):
+            try:
+                process_shard(self.automators[serial], shard)
+            except SystemExit:
+                logger.critical(f"Device '{serial}' aborted (safety check failed).")
+            except Exception:
+                logger.exception(f"Device '{serial}' stopped with an error.")
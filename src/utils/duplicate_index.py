@@ -0,0 +1,197 @@
+import os
+import re
+import sys
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from loguru import logger
+import pandas as pd
+
+from src.transaction import EXCEL_DATETIME_FORMAT
+
+# The index is shared by every master file and statement of the user.
+DEFAULT_INDEX_FILE = os.path.join(os.path.expanduser("~"), ".mymoneypro_added_index.sqlite")
+# Two transactions with the same key this many minutes apart or less are the same transaction.
+DEFAULT_WINDOW_MINUTES = 1
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _normalise_description(text):
+    """Lower-cases the text and drops punctuation and repeated spaces."""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ''
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', str(text).lower())).strip()
+
+def duplicate_key(account, amount, description):
+    """Returns the time-independent part of a transaction's identity."""
+    parts = [str(account).strip(), str(round(abs(float(amount)) * 100)), _normalise_description(description)]
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+def _minute(value):
+    """Minutes since the epoch for a datetime or a 'YYYY-MM-DD hh:mm AM' string."""
+    if not isinstance(value, datetime):
+        value = datetime.strptime(str(value).strip(), EXCEL_DATETIME_FORMAT)
+    return int((value.replace(tzinfo=None) - _EPOCH).total_seconds() // 60)
+
+def _description_of(tx):
+    """The bank narration identifies a transaction best; hand-written notes are the fallback."""
+    description = tx.get('description')
+    if description is None or (isinstance(description, float) and pd.isna(description)) or not str(description).strip():
+        description = tx.get('notes')
+    return description
+
+
+class DuplicateIndex:
+    """
+    Persistent index of every transaction that was added to the app.
+
+    Each added transaction is stored under a hash of its account, amount and
+    normalised description, together with its time bucket (minutes divided by
+    the tolerance window). A lookup only reads the index entries of the same
+    key in the neighbouring buckets, so it stays a single indexed query however
+    long the history grows.
+    """
+    def __init__(self, index_file=DEFAULT_INDEX_FILE, window_minutes=DEFAULT_WINDOW_MINUTES):
+        """
+        Args:
+            index_file (str): The SQLite file that holds the index.
+            window_minutes (int): Time tolerance; transactions with the same key at most
+                                  this many minutes apart are duplicates.
+        """
+        self.index_file = index_file
+        self.window_minutes = max(int(window_minutes), 1)
+        self._lock = threading.Lock()  # Device threads record added transactions concurrently
+        self._connection = sqlite3.connect(index_file, check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS added (key TEXT NOT NULL, bucket INTEGER NOT NULL, minute INTEGER NOT NULL, added_at TEXT);
+            CREATE INDEX IF NOT EXISTS added_key_bucket ON added (key, bucket);
+            CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._rebucket_if_needed()
+
+    def _rebucket_if_needed(self):
+        """Buckets depend on the window, so they are recomputed if it changed since the last run."""
+        row = self._connection.execute("SELECT value FROM settings WHERE name = 'window_minutes'").fetchone()
+        if row and int(row[0]) == self.window_minutes:
+            return
+        with self._connection:
+            self._connection.execute("UPDATE added SET bucket = minute / ?", (self.window_minutes,))
+            self._connection.execute("INSERT OR REPLACE INTO settings VALUES ('window_minutes', ?)", (str(self.window_minutes),))
+
+    def _key_and_minute(self, tx):
+        return duplicate_key(tx['account'], tx['amount'], _description_of(tx)), _minute(tx['datetime'])
+
+    def contains(self, tx):
+        """Returns True if the transaction (record, dictionary or row) was already added."""
+        key, minute = self._key_and_minute(tx)
+        bucket = minute // self.window_minutes
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM added WHERE key = ? AND bucket BETWEEN ? AND ? AND ABS(minute - ?) <= ? LIMIT 1",
+                (key, bucket - 1, bucket + 1, minute, self.window_minutes)).fetchone()
+        return row is not None
+
+    def add(self, tx):
+        """Records an added transaction. It is written to disk before returning."""
+        key, minute = self._key_and_minute(tx)
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO added VALUES (?, ?, ?, ?)",
+                                     (key, minute // self.window_minutes, minute, datetime.now().isoformat(timespec='seconds')))
+
+    def remove(self, tx):
+        """
+        Forgets one recorded occurrence of a transaction, e.g. when verification
+        could not find it in the app, so it can be entered again later.
+        """
+        key, minute = self._key_and_minute(tx)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM added WHERE rowid IN (SELECT rowid FROM added WHERE key = ? AND minute = ? ORDER BY rowid DESC LIMIT 1)",
+                (key, minute))
+
+    def add_from_excel(self, excel_file):
+        """Seeds the index with the rows of a master file whose status is 'Added'."""
+        df = pd.read_excel(excel_file)
+        df.columns = [col.lower() for col in df.columns]
+        added = df[df['status'].astype(str).str.lower() == 'added']
+        rows = []
+        for tx in added.to_dict('records'):
+            key, minute = self._key_and_minute(tx)
+            rows.append((key, minute // self.window_minutes, minute, datetime.now().isoformat(timespec='seconds')))
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO added VALUES (?, ?, ?, ?)", rows)
+        logger.success(f"Indexed {len(rows)} added transaction(s) from {excel_file}")
+        return len(rows)
+
+    def split(self, transactions):
+        """
+        Separates transactions that were already added.
+
+        Returns:
+            tuple: (new transactions, duplicates), both in their original order.
+        """
+        fresh, duplicates = [], []
+        for tx in transactions:
+            (duplicates if self.contains(tx) else fresh).append(tx)
+        for tx in duplicates:
+            logger.warning(f"Already added in an earlier run: '{tx['notes']}' ({tx['amount']} on {tx['account']}, {tx['datetime']}).")
+        return fresh, duplicates
+
+    def close(self):
+        self._connection.close()
+
+
+def flag_duplicates(df, index=None):
+    """
+    Marks parsed statement rows that are already in the ledger, or repeated within
+    the same output (e.g. two overlapping exports), with the status 'Duplicate'.
+
+    Args:
+        df (pd.DataFrame): Parser output in the processed Excel layout.
+        index (DuplicateIndex, optional): The index to check. Defaults to the shared index.
+
+    Returns:
+        pd.DataFrame: The same rows, with duplicate statuses set.
+    """
+    if df is None or df.empty:
+        return df
+    index = index or DuplicateIndex()
+    df = df.copy()
+    records = df.rename(columns=str.lower).to_dict('records')
+    keys = [index._key_and_minute(tx) for tx in records]
+    # Rows seen so far, bucketed like the index: (key, bucket) -> minutes.
+    seen = {}
+    def seen_before(key, minute):
+        bucket = minute // index.window_minutes
+        return any(abs(minute - other) <= index.window_minutes
+                   for nearby in (bucket - 1, bucket, bucket + 1) for other in seen.get((key, nearby), ()))
+    flagged = 0
+    for position, (tx, (key, minute)) in enumerate(zip(records, keys)):
+        if seen_before(key, minute) or index.contains(tx):
+            df.iloc[position, df.columns.get_loc('Status')] = 'Duplicate'
+            flagged += 1
+        seen.setdefault((key, minute // index.window_minutes), []).append(minute)
+    if flagged:
+        logger.warning(f"Marked {flagged} row(s) as 'Duplicate': they were already added or appear twice in the statements.")
+    return df
+
+
+def main():
+    """
+    Seeds the duplicate index with the 'Added' rows of a master Excel file.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG")
+
+    logger.info("--- Build Duplicate Index from Master File ---")
+    input_excel_file = input("Please enter the full path to your master .xlsx file: ").strip().strip('"')
+    if not os.path.exists(input_excel_file):
+        logger.error("The provided file path does not exist. Please check the path and try again.")
+        return
+    index = DuplicateIndex()
+    index.add_from_excel(input_excel_file)
+    index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import re
+import difflib
+from concurrent.futures import Future
+from datetime import datetime
+from loguru import logger
+
+from src.utils.balance_reconciliation import parse_balance
+
+# Number of leading characters of the notes that must match a list item.
+NOTES_PREFIX_LENGTH = 15
+# Date headers the transaction list may show above its items.
+_DATE_FORMATS = ['%d %b %Y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y', '%d/%m/%Y', '%d-%m-%Y', '%a, %d %b %Y']
+_AMOUNT_RE = re.compile(r'\d[\d,]*(?:\.\d{1,2})?')
+
+
+def _normalise(text):
+    return re.sub(r'\s+', ' ', str(text)).strip().lower()
+
+def _parse_date_header(text):
+    """Returns the date of a date header line, or None if the line is not one."""
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
+def group_list_items(lines, row_height):
+    """
+    Groups the text lines of the transaction list into list items.
+
+    A date header starts a new date; every other line belongs to the item whose
+    first line is less than `row_height` above it.
+
+    Args:
+        lines (list): (y, text) pairs, top to bottom.
+        row_height (int): Height of one list item in pixels.
+
+    Returns:
+        list: Items as dicts with 'date' (the last header above it, or None),
+              'text' (all lines joined) and 'amounts' (set of amounts in paise).
+    """
+    items = []
+    current_date = None
+    item_top = None
+    for y, text in lines:
+        header_date = _parse_date_header(text)
+        if header_date:
+            current_date = header_date
+            item_top = None
+            continue
+        if item_top is None or y - item_top >= row_height:
+            items.append({'date': current_date, 'text': '', 'amounts': set()})
+            item_top = y
+        items[-1]['text'] = f"{items[-1]['text']} {text}".strip()
+        for amount in _AMOUNT_RE.findall(text):
+            paise = parse_balance(amount)
+            if paise:
+                items[-1]['amounts'].add(abs(paise))
+    return items
+
+def item_matches(tx, item):
+    """
+    True if a list item shows the transaction: same amount, the notes' prefix
+    (allowing small OCR errors) and, if the list shows dates, the same date.
+    """
+    if round(abs(float(tx['amount'])) * 100) not in item['amounts']:
+        return False
+    if item['date'] is not None and item['date'] != tx['datetime'].date():
+        return False
+    prefix = _normalise(tx['notes'])[:NOTES_PREFIX_LENGTH]
+    if not prefix:
+        return True
+    text = _normalise(item['text'])
+    if prefix in text:
+        return True
+    # OCR may garble a character or two: compare the prefix with every window of the same length.
+    windows = (text[i:i + len(prefix)] for i in range(max(len(text) - len(prefix), 0) + 1))
+    return any(difflib.SequenceMatcher(None, prefix, window).ratio() >= 0.85 for window in windows)
+
+
+class EntryVerifier:
+    """
+    Periodically checks that saved entries really appear in the app.
+
+    Instead of verifying every entry on its own, the verifier collects the
+    entries added since the last check and, every `every` entries, reads the
+    transaction list of the main screen once. Each entry must match a distinct
+    list item by amount, notes prefix and date; entries without a match are
+    returned so the caller can flag them.
+
+    With overlap enabled on the automator, the list is still captured at the
+    same point of the run, but its OCR runs in the background while the next
+    entries are entered; the entries are matched by a later call once it is done.
+    """
+    def __init__(self, automator, every=10):
+        """
+        Args:
+            automator (MyMoneyProAutomator): The device the entries were added on.
+            every (int): Number of added entries per check. The list region must
+                         be able to show this many items.
+        """
+        self.automator = automator
+        self.every = every
+        self.window = []  # Entries added since the last check
+        self._checks = []  # (entries, list lines or Future of them) of captured checks, oldest first
+        self.checked = 0
+        self.unmatched = 0
+
+    def record(self, tx):
+        """
+        Records an added entry and captures a check once `every` entries are collected.
+
+        Returns:
+            list: The entries of finished checks that were not found (empty if none finished).
+        """
+        self.window.append(tx)
+        if len(self.window) >= self.every:
+            self._capture_check()
+        return self._collect(wait=False)
+
+    def verify(self):
+        """
+        Checks the entries collected so far and waits for every check still running.
+
+        Returns:
+            list: The entries that were not found in the list.
+        """
+        self._capture_check()
+        return self._collect(wait=True)
+
+    def _capture_check(self):
+        """Captures the transaction list for the collected entries; the OCR runs now or in the background."""
+        if not self.window:
+            return
+        window, self.window = self.window, []
+        read_lines = self.automator.capture_transaction_list()
+        overlap = self.automator.overlap
+        if read_lines is None:
+            self._checks.append((window, None))
+        elif overlap:
+            self._checks.append((window, overlap.submit(read_lines)))
+        else:
+            self._checks.append((window, read_lines()))
+
+    def _collect(self, wait):
+        """Matches the checks whose list lines are ready, oldest first, and returns the missing entries."""
+        missing = []
+        while self._checks:
+            window, lines = self._checks[0]
+            if isinstance(lines, Future):
+                if not wait and not lines.done():
+                    break
+                try:
+                    lines = self.automator.overlap.result(lines)
+                except Exception:
+                    logger.exception("Reading the transaction list failed.")
+                    lines = None
+            self._checks.pop(0)
+            missing.extend(self._match(window, lines))
+        return missing
+
+    def _match(self, window, lines):
+        """Matches the entries of one check against the list lines; returns the ones not found."""
+        if lines is None:
+            logger.warning(f"Could not read the transaction list. {len(window)} entries were not verified.")
+            return list(window)
+
+        items = group_list_items(lines, self.automator.coords.transaction_list_row_height)
+        used = set()
+        missing = []
+        for tx in window:
+            match = next((i for i, item in enumerate(items) if i not in used and item_matches(tx, item)), None)
+            if match is None:
+                missing.append(tx)
+            else:
+                used.add(match)
+
+        self.checked += len(window)
+        self.unmatched += len(missing)
+        if missing:
+            logger.error(f"Verification: {len(missing)} of the {len(window)} entries of a check were not found in the transaction list: "
+                         f"{[tx['notes'] for tx in missing]}")
+        else:
+            logger.success(f"Verification: all {len(window)} entries found in the transaction list.")
+        return missing
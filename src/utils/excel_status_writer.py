@@ -0,0 +1,200 @@
+import os
+import re
+import tempfile
+import zipfile
+import posixpath
+from xml.sax.saxutils import escape, unescape
+import xml.etree.ElementTree as ET
+from loguru import logger
+
+# Namespaces used inside .xlsx packages.
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+_ROW_START_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"[^>]*?(/?)>')
+_CELL_RE = re.compile(rb'<c\b[^>]*?\br="([A-Z]+)\d+"[^>]*?(?:/>|>.*?</c>)', re.DOTALL)
+_STYLE_RE = re.compile(rb'\bs="(\d+)"')
+
+
+def _column_letter(index):
+    """Converts a 1-based column index to its Excel letter (1 -> 'A', 27 -> 'AA')."""
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def _column_index(letters):
+    """Converts an Excel column letter to its 1-based index ('A' -> 1, 'AA' -> 27)."""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index
+
+def _first_sheet_path(package):
+    """Returns the zip path of the first worksheet, which is the one pandas reads."""
+    workbook = ET.fromstring(package.read("xl/workbook.xml"))
+    first_sheet = workbook.find(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet")
+    relation_id = first_sheet.get(f"{_DOC_REL_NS}id")
+    relations = ET.fromstring(package.read("xl/_rels/workbook.xml.rels"))
+    for relation in relations.iter(f"{_REL_NS}Relationship"):
+        if relation.get("Id") == relation_id:
+            target = relation.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError("Could not locate the first worksheet in the workbook.")
+
+def _shared_strings(package, wanted):
+    """
+    Returns {index: text} for the wanted shared string indices only.
+    Parsing stops as soon as the highest wanted index is reached, so the
+    (potentially huge) string table of the history is not loaded.
+    """
+    found = {}
+    if not wanted or "xl/sharedStrings.xml" not in package.namelist():
+        return found
+    last_wanted = max(wanted)
+    with package.open("xl/sharedStrings.xml") as f:
+        index = 0
+        for _, element in ET.iterparse(f):
+            if element.tag != f"{_MAIN_NS}si":
+                continue
+            if index in wanted:
+                found[index] = "".join(t.text or "" for t in element.iter(f"{_MAIN_NS}t"))
+            element.clear()
+            if index >= last_wanted:
+                break
+            index += 1
+    return found
+
+def _find_status_column(package, sheet_xml, header_name):
+    """Returns the column letter whose header (row 1) is `header_name`, case-insensitively."""
+    match = _ROW_START_RE.search(sheet_xml)
+    if not match or match.group(1) != b"1" or match.group(2) == b"/":
+        raise ValueError("The first worksheet has no header row.")
+    header_row = sheet_xml[match.end():sheet_xml.index(b"</row>", match.end())]
+
+    cells = []
+    for cell in _CELL_RE.finditer(header_row):
+        xml = cell.group(0).decode("utf-8")
+        cell_type = re.search(r'\bt="(\w+)"', xml[:xml.index(">")])
+        if cell_type and cell_type.group(1) == "s":
+            cells.append((cell.group(1).decode(), "s", int(re.search(r"<v>(\d+)</v>", xml).group(1))))
+        else:
+            text = re.search(r"<(?:v|t)\b[^>]*>(.*?)</(?:v|t)>", xml, re.DOTALL)
+            cells.append((cell.group(1).decode(), "text", unescape(text.group(1)) if text else ""))
+
+    strings = _shared_strings(package, {value for _, kind, value in cells if kind == "s"})
+    for column, kind, value in cells:
+        text = strings.get(value, "") if kind == "s" else value
+        if str(text).strip().lower() == header_name.lower():
+            return column
+    raise ValueError(f"No '{header_name}' column found in the header row.")
+
+def _status_cell(reference, style, value):
+    """Builds an inline-string cell, keeping the original cell style."""
+    style_attribute = f' s="{style.decode()}"' if style else ""
+    return f'<c r="{reference}"{style_attribute} t="inlineStr"><is><t>{escape(value)}</t></is></c>'.encode("utf-8")
+
+def _patch_rows(sheet_xml, column, updates):
+    """
+    Rewrites the status cell of every updated row in the sheet XML.
+
+    Args:
+        sheet_xml (bytes): The worksheet XML.
+        column (str): The status column letter.
+        updates (dict): Excel row number -> new status.
+
+    Returns:
+        tuple: (patched XML, number of cells changed)
+    """
+    column_number = _column_index(column)
+    pieces = []
+    position = 0
+    changed = 0
+    for match in _ROW_START_RE.finditer(sheet_xml):
+        row_number = int(match.group(1))
+        if row_number not in updates:
+            continue
+        status = updates[row_number]
+        reference = f"{column}{row_number}"
+        if match.group(2) == b"/":
+            # An empty <row/>: expand it with the status cell.
+            pieces.append(sheet_xml[position:match.end() - 2])
+            pieces.append(b">" + _status_cell(reference, None, status) + b"</row>")
+            position = match.end()
+            changed += 1
+            continue
+
+        row_end = sheet_xml.index(b"</row>", match.end())
+        row_body = sheet_xml[match.end():row_end]
+        style = None
+        for cell in _CELL_RE.finditer(row_body):
+            cell_column = _column_index(cell.group(1).decode())
+            if cell_column == column_number:
+                style_match = _STYLE_RE.search(cell.group(0)[:cell.group(0).index(b">")])
+                style = style_match.group(1) if style_match else None
+                insert_at, replace_end = cell.start(), cell.end()
+                break
+            if cell_column > column_number:
+                insert_at = replace_end = cell.start()
+                break
+        else:
+            insert_at = replace_end = len(row_body)
+
+        body_start = match.end()
+        pieces.append(sheet_xml[position:body_start + insert_at])
+        pieces.append(_status_cell(reference, style, status))
+        position = body_start + replace_end
+        changed += 1
+    pieces.append(sheet_xml[position:])
+    return b"".join(pieces), changed
+
+def write_status_cells(excel_file, updates, header_name="Status"):
+    """
+    Updates the status cells of the given rows in place, without re-serializing
+    the workbook through pandas.
+
+    Only the cells of the changed rows are rewritten; every other part of the
+    package (other columns and sheets, styles, column widths, filters) is copied
+    as is, so the sheet keeps its formatting. The new file is written next to
+    the original and swapped in atomically.
+
+    Args:
+        excel_file (str): The master .xlsx file.
+        updates (dict): DataFrame row index ('original_index') -> new status.
+        header_name (str): The header of the status column.
+
+    Returns:
+        int: The number of cells that changed.
+    """
+    if not updates:
+        return 0
+    # DataFrame index 0 is the first row below the header, i.e. Excel row 2.
+    row_updates = {int(index) + 2: str(status) for index, status in updates.items()}
+
+    with zipfile.ZipFile(excel_file) as package:
+        sheet_path = _first_sheet_path(package)
+        sheet_xml = package.read(sheet_path)
+        column = _find_status_column(package, sheet_xml, header_name)
+        patched_xml, changed = _patch_rows(sheet_xml, column, row_updates)
+        if not changed:
+            logger.info("All status cells are already up to date.")
+            return 0
+
+        directory = os.path.dirname(os.path.abspath(excel_file))
+        handle, temp_path = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as output:
+                for item in package.infolist():
+                    data = patched_xml if item.filename == sheet_path else package.read(item.filename)
+                    output.writestr(item, data, compress_type=item.compress_type)
+            os.replace(temp_path, excel_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    logger.success(f"Updated {changed} status cell(s) in {excel_file}")
+    return changed
@@ -0,0 +1,113 @@
+import os
+import json
+from collections import Counter
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.transaction import EXCEL_DATETIME_FORMAT
+from src.utils.duplicate_index import duplicate_key
+
+DEFAULT_MARKS_FILE = os.path.join(os.path.expanduser("~"), ".mymoneypro_high_water_marks.json")
+SPLITWISE_PREFIX = "Splitwise | "
+
+
+def _fingerprint(row):
+    return duplicate_key(row['Account'], row['Amount'], row['Description'])
+
+
+class HighWaterMarks:
+    """
+    Remembers how far every statement source has already been parsed.
+
+    A bank or card account's mark is the datetime of its latest parsed row plus
+    the fingerprints of all rows at that instant. Rows before the mark are old,
+    and rows at the mark are old if their fingerprint is recorded, so an
+    overlapping download only yields the rows after the previous one. Splitwise
+    expenses can be back-dated, so a Splitwise group's mark is the set of
+    expense IDs already parsed instead.
+    """
+    def __init__(self, marks_file=DEFAULT_MARKS_FILE):
+        self.marks_file = marks_file
+        self.marks = {}
+
+    def load(self):
+        """Loads the marks from the JSON file if it exists."""
+        try:
+            if os.path.exists(self.marks_file):
+                with open(self.marks_file, 'r') as f:
+                    self.marks = json.load(f)
+                logger.success(f"Successfully loaded high-water marks from {self.marks_file}")
+        except Exception as e:
+            logger.error(f"Could not load high-water marks: {e}")
+
+    def save(self):
+        """Saves the marks. Call it only once the parsed rows are safely written."""
+        try:
+            with open(self.marks_file, 'w') as f:
+                json.dump(self.marks, f, indent=4)
+            logger.debug(f"Saved high-water marks to {self.marks_file}")
+        except Exception as e:
+            logger.error(f"Could not save high-water marks: {e}")
+
+    # --- Bank and card statements: one mark per account ---
+    def new_rows(self, df):
+        """
+        Drops the rows of a parsed statement that earlier runs already parsed.
+
+        Args:
+            df (pd.DataFrame): Parser output in the processed Excel layout.
+
+        Returns:
+            pd.DataFrame: The rows after each account's mark.
+        """
+        if df is None or df.empty:
+            return df
+        datetimes = pd.to_datetime(df['Datetime'], format=EXCEL_DATETIME_FORMAT).to_numpy()
+        keep = np.ones(len(df), dtype=bool)
+        for account, rows in df.groupby('Account', sort=False).indices.items():
+            mark = self.marks.get(account)
+            if not mark:
+                continue
+            mark_time = np.datetime64(datetime.fromisoformat(mark['datetime']))
+            keep[rows[datetimes[rows] < mark_time]] = False
+            # At the mark itself, only rows that were not seen there before are new.
+            remaining = Counter(mark['fingerprints'])
+            for row in rows[datetimes[rows] == mark_time]:
+                fingerprint = _fingerprint(df.iloc[row])
+                if remaining[fingerprint]:
+                    remaining[fingerprint] -= 1
+                    keep[row] = False
+        if not keep.all():
+            logger.info(f"Skipped {(~keep).sum()} row(s) that an earlier statement already covered.")
+        return df[keep]
+
+    def advance(self, df):
+        """Moves each account's mark to the latest of the given (new) rows."""
+        if df is None or df.empty:
+            return
+        datetimes = pd.to_datetime(df['Datetime'], format=EXCEL_DATETIME_FORMAT)
+        for account, rows in df.groupby('Account', sort=False).indices.items():
+            latest = datetimes.iloc[rows].max()
+            fingerprints = [_fingerprint(df.iloc[row]) for row in rows if datetimes.iloc[row] == latest]
+            mark = self.marks.get(account)
+            if mark:
+                mark_time = datetime.fromisoformat(mark['datetime'])
+                if latest < mark_time:
+                    continue
+                if latest == mark_time:
+                    fingerprints = mark['fingerprints'] + fingerprints
+            self.marks[account] = {'datetime': latest.isoformat(), 'fingerprints': fingerprints}
+
+    # --- Splitwise: seen expense IDs per group ---
+    def seen_ids(self):
+        """Returns the IDs of every Splitwise expense and payment parsed so far, across all groups."""
+        return {expense_id for key, mark in self.marks.items() if key.startswith(SPLITWISE_PREFIX)
+                for expense_id in mark['seen_ids']}
+
+    def add_ids(self, ids_by_group):
+        """Records newly parsed Splitwise entries, given as group -> list of IDs."""
+        for group, ids in ids_by_group.items():
+            mark = self.marks.setdefault(f"{SPLITWISE_PREFIX}{group}", {'seen_ids': []})
+            mark['seen_ids'] = sorted(set(mark['seen_ids']) | set(ids))
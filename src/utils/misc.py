@@ -1,51 +1,106 @@
 from datetime import datetime
 from loguru import logger
+import numpy as np
+import pandas as pd
 
 
 def serialize_datetimes(transactions):
-    for tx in transactions:
-        for k, v in tx.items():
-            if isinstance(v, datetime):
-                tx[k] = v.strftime("%Y-%m-%d %I:%M %p")
-    return transactions
+    """Returns the transactions as plain dictionaries with their datetimes formatted as text."""
+    return [{k: v.strftime("%Y-%m-%d %I:%M %p") if isinstance(v, datetime) else v for k, v in tx.items()}
+            for tx in transactions]
+
+def net_diff_rollups(batch):
+    """
+    Computes the expected credit, debit and net change of every account in a
+    single grouped aggregation, in integer paise so totals are exact.
+
+    Each transaction becomes one "leg" per account it touches: expenses and
+    incomes one, transfers two (a debit on the source account and a credit on
+    the destination account). The legs are grouped once by (account, month,
+    source); the per-account, per-month and per-source tables are then derived
+    from that small aggregate.
+
+    Args:
+        batch (TransactionBatch): The transactions.
+
+    Returns:
+        dict: DataFrames 'accounts', 'months' and 'sources', each with credit,
+              debit and net columns in paise. Accounts keep the order in which
+              they first appear in the transactions.
+    """
+    records = batch.records
+    type_names = np.char.lower(np.asarray(batch.types, dtype=str)) if batch.types else np.array([], dtype=str)
+    tx_types = type_names[records['type']] if len(records) else np.array([], dtype=str)
+    is_income = tx_types == 'income'
+    is_transfer = tx_types == 'transfer'
+    is_debit = (tx_types == 'expense') | is_transfer
+    paise = records['amount_paise']
+    source_codes, source_names = pd.factorize(pd.Series(batch.sources, dtype=object).fillna('Unknown'))
+
+    # Legs are interleaved (source leg, destination leg) per transaction, so the
+    # order of first appearance matches the transaction order. Every key is an
+    # integer code until the aggregate is built.
+    keep = np.column_stack([is_income | is_debit, is_transfer]).ravel()
+    legs = pd.DataFrame({
+        'account': np.column_stack([records['account'], records['category']]).ravel()[keep],
+        'month': np.repeat(records['datetime'].astype('datetime64[M]').astype(np.int64), 2)[keep],
+        'source': np.repeat(source_codes, 2)[keep],
+        'credit': np.column_stack([np.where(is_income, paise, 0), np.where(is_transfer, paise, 0)]).ravel()[keep],
+        'debit': np.column_stack([np.where(is_debit, paise, 0), np.zeros_like(paise)]).ravel()[keep],
+    })
+
+    grouped = legs.groupby(['account', 'month', 'source'], sort=False)[['credit', 'debit']].sum().reset_index()
+    grouped['net'] = grouped['credit'] - grouped['debit']
+    # Codes are resolved to names only now, on the aggregate.
+    grouped['account'] = np.asarray(batch.names, dtype=object)[grouped['account'].to_numpy()]
+    grouped['month'] = grouped['month'].to_numpy().astype('datetime64[M]')
+    grouped['source'] = np.asarray(source_names, dtype=object)[grouped['source'].to_numpy()]
+
+    def rollup(keys):
+        return grouped.groupby(keys, sort=False)[['credit', 'debit', 'net']].sum().reset_index()
+    return {
+        'accounts': rollup(['account']),
+        'months': rollup(['month', 'account']).sort_values(['month'], kind='stable').reset_index(drop=True),
+        'sources': rollup(['source', 'account']),
+    }
+
+def _rupees(paise):
+    """Formats an amount in paise as rupees with commas and two decimal places."""
+    return f"{paise / 100:,.2f}"
 
 def calculate_and_print_net_diffs(transactions):
     """
     Calculates and prints the net change for each account in the transaction list.
     This provides a summary for the user to verify before the automation starts.
+    Per-month and per-source breakdowns are logged at debug level.
+
+    Args:
+        transactions (list or TransactionBatch): The transactions to summarise.
+
+    Returns:
+        dict: The rollup tables (see `net_diff_rollups`).
     """
-    net_diffs = {}
-    net_credit = {}
-    net_debit = {}
-    for tx in transactions:
-        tx_type = tx.get('type', 'expense').lower()
-        amount = tx['amount']
-        account = tx['account']
-        
-        if tx_type == 'income':
-            net_diffs[account] = net_diffs.get(account, 0) + amount
-            net_credit[account] = net_credit.get(account, 0) + amount
-        elif tx_type == 'expense':
-            net_diffs[account] = net_diffs.get(account, 0) - amount
-            net_debit[account] = net_debit.get(account, 0) + amount
-        elif tx_type == 'transfer':
-            destination_account = tx['category']
-            # Subtract from the source account
-            net_diffs[account] = net_diffs.get(account, 0) - amount
-            net_debit[account] = net_debit.get(account, 0) + amount
-            # Add to the destination account
-            net_diffs[destination_account] = net_diffs.get(destination_account, 0) + amount
-            net_credit[destination_account] = net_credit.get(destination_account, 0) + amount
+    from src.transaction import TransactionBatch
+
+    batch = transactions if isinstance(transactions, TransactionBatch) else TransactionBatch.from_transactions(transactions)
+    rollups = net_diff_rollups(batch) if len(batch) else None
 
     logger.info("="*50)
     logger.info("PRE-RUN VERIFICATION: EXPECTED NET CHANGES")
     logger.info("="*50)
-    if not net_diffs:
+    if rollups is None or rollups['accounts'].empty:
         logger.info("No transactions to process.")
     else:
-        for account, diff in net_diffs.items():
-            # Format the number with commas and two decimal places
-            formatted_diff = f"{diff:,.2f}"
-            logger.info(f"{account}: {formatted_diff}")
-            logger.debug(f"  (Total Credit: {net_credit.get(account, 0):,.2f}, Total Debit: {net_debit.get(account, 0):,.2f})")
+        for row in rollups['accounts'].itertuples(index=False):
+            logger.info(f"{row.account}: {_rupees(row.net)}")
+            logger.debug(f"  (Total Credit: {_rupees(row.credit)}, Total Debit: {_rupees(row.debit)})")
+        if len(rollups['months']['month'].unique()) > 1:
+            logger.debug("Per month:")
+            for row in rollups['months'].itertuples(index=False):
+                logger.debug(f"  {row.month:%Y-%m} | {row.account}: {_rupees(row.net)}")
+        if len(rollups['sources']['source'].unique()) > 1:
+            logger.debug("Per source:")
+            for row in rollups['sources'].itertuples(index=False):
+                logger.debug(f"  {row.source} | {row.account}: {_rupees(row.net)}")
     logger.info("="*50)
+    return rollups
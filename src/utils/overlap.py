@@ -0,0 +1,66 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+
+
+class OverlapExecutor:
+    """
+    Runs host-side work (OCR, planning) in a background thread while the device
+    is busy animating, and measures how much host time was hidden that way.
+
+    Device actions never go through this executor: taps, swipes, typing and the
+    app focus check always run on the calling thread, in order. Background tasks
+    only compute things and run one at a time in submission order.
+    """
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="overlap")
+        self._lock = threading.Lock()
+        self.background_seconds = 0.0  # Time spent running background tasks
+        self.blocked_seconds = 0.0  # Time the caller spent waiting for unfinished tasks
+        self.tasks = 0
+        self.started_at = time.time()
+
+    def _timed(self, func, *args, **kwargs):
+        start_time = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.background_seconds += time.time() - start_time
+                self.tasks += 1
+
+    def submit(self, func, *args, **kwargs):
+        """Starts `func` in the background and returns its Future."""
+        return self._pool.submit(self._timed, func, *args, **kwargs)
+
+    def result(self, future):
+        """Waits for a Future from `submit` and returns its result, recording any wait."""
+        start_time = time.time()
+        try:
+            return future.result()
+        finally:
+            self.blocked_seconds += time.time() - start_time
+
+    @property
+    def hidden_seconds(self):
+        """Host time that ran concurrently with the device instead of in series."""
+        return max(self.background_seconds - self.blocked_seconds, 0.0)
+
+    def report(self, completed_entries):
+        """Logs the overlap statistics and throughput of a run."""
+        elapsed = time.time() - self.started_at
+        logger.info("="*50)
+        logger.info("RUN REPORT: HOST/DEVICE OVERLAP")
+        logger.info("="*50)
+        logger.info(f"Entries completed: {completed_entries} in {elapsed:.1f}s")
+        logger.info(f"Background tasks: {self.tasks} ({self.background_seconds:.2f}s of host work)")
+        logger.info(f"Waited on background work: {self.blocked_seconds:.2f}s")
+        logger.info(f"Host time hidden behind device work: {self.hidden_seconds:.2f}s")
+        if completed_entries and elapsed > 0:
+            logger.info(f"Throughput: {completed_entries / elapsed * 60:.2f} entries/min")
+        logger.info("="*50)
+
+    def shutdown(self):
+        """Stops the background thread once the pending tasks are done."""
+        self._pool.shutdown(wait=True)
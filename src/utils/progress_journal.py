@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+from datetime import datetime
+from loguru import logger
+import pandas as pd
+
+from src.transaction import to_transactions
+from src.utils.excel_status_writer import write_status_cells
+
+
+# Journal statuses of transactions that are already in the app. 'Failed' ones are retried.
+DONE_STATUSES = {'Added', 'Unverified', 'Duplicate'}
+
+
+def _fingerprint_text(value):
+    """Normalises a field for fingerprinting (missing values and NaN become '')."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+def transaction_fingerprint(tx):
+    """
+    Returns a stable fingerprint of a transaction's content.
+    It does not depend on the row position, so it survives rows being added to
+    or removed from the master file between runs.
+    """
+    parts = [
+        _fingerprint_text(tx.get('type', 'Expense')).lower(),
+        _fingerprint_text(tx['account']),
+        _fingerprint_text(tx['category']),
+        f"{float(tx['amount']):.2f}",
+        tx['datetime'].strftime('%Y-%m-%d %H:%M'),
+        _fingerprint_text(tx['notes']),
+    ]
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+def assign_fingerprints(transactions):
+    """
+    Returns the transactions as records with their 'fingerprint' set.
+    Identical transactions (e.g. two equal bus fares on the same minute) get an
+    occurrence suffix in load order, so each one is journaled separately.
+    """
+    seen = {}
+    fingerprinted = []
+    for tx in to_transactions(transactions):
+        fingerprint = transaction_fingerprint(tx)
+        occurrence = seen.get(fingerprint, 0)
+        seen[fingerprint] = occurrence + 1
+        fingerprinted.append(tx.replace(fingerprint=f"{fingerprint}#{occurrence}"))
+    return fingerprinted
+
+def default_journal_path(excel_file):
+    """Returns the journal file that belongs to a master Excel file."""
+    return os.path.splitext(excel_file)[0] + ".journal.jsonl"
+
+
+class ProgressJournal:
+    """
+    Append-only, per-transaction progress log (JSON lines).
+
+    Every finished transaction is appended and fsynced immediately, so progress
+    survives crashes and interruptions. Statuses are merged back into the
+    master Excel file as a separate step (see `merge_journal_into_excel`).
+    """
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self.statuses = {}  # fingerprint -> latest status
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Loads the statuses recorded by previous runs, if the journal exists."""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a torn last line behind.
+                    logger.warning(f"Ignoring unreadable journal line {line_number} in {self.journal_file}")
+                    continue
+                self.statuses[entry['fingerprint']] = entry['status']
+        logger.success(f"Loaded {len(self.statuses)} journaled transaction(s) from {self.journal_file}")
+
+    def record(self, tx, status):
+        """Appends a transaction's status and flushes it to disk before returning."""
+        entry = {
+            'fingerprint': tx['fingerprint'],
+            'status': status,
+            'original_index': tx.get('original_index'),
+            'notes': _fingerprint_text(tx['notes']),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.statuses[tx['fingerprint']] = status
+
+    def is_done(self, tx):
+        """
+        Returns True if a previous run finished this transaction: it was added
+        (and possibly marked 'Unverified' afterwards) or found to be a duplicate.
+        Either way it is in the app already and must not be entered again.
+        """
+        return self.statuses.get(tx['fingerprint']) in DONE_STATUSES
+
+    def pending(self, transactions):
+        """Returns the transactions that are not done yet, skipping journaled ones."""
+        remaining = [tx for tx in transactions if not self.is_done(tx)]
+        skipped = len(transactions) - len(remaining)
+        if skipped:
+            logger.info(f"Resuming: skipping {skipped} transaction(s) already added according to the journal.")
+        return remaining
+
+
+def merge_journal_into_excel(excel_file, journal_file=None):
+    """
+    Writes the journaled statuses back into the master Excel file.
+
+    Pending rows are matched to journal entries by fingerprint, and the file
+    is only rewritten if at least one status changed. Afterwards the journal is
+    archived (renamed to '<journal>.<timestamp>.merged', so earlier archives are
+    kept), because the occurrence numbers of identical rows shift once some of
+    them are no longer pending.
+
+    Returns:
+        int: The number of rows whose status was updated.
+    """
+    from src.data_loader import load_transactions_from_excel
+
+    journal = ProgressJournal(journal_file or default_journal_path(excel_file))
+    journal.load()
+    if not journal.statuses:
+        logger.info("Nothing to merge: the journal is empty.")
+        return 0
+
+    pending = assign_fingerprints(load_transactions_from_excel(excel_file))
+    updates = {tx['original_index']: journal.statuses[tx['fingerprint']] for tx in pending if tx['fingerprint'] in journal.statuses}
+    if updates:
+        # Only the changed status cells are rewritten, so the merge stays fast on a large master.
+        write_status_cells(excel_file, updates)
+        logger.success(f"Merged {len(updates)} status update(s) into {excel_file}")
+    else:
+        logger.info("Nothing to merge: the Excel file is already up to date.")
+
+    archive_file = f"{journal.journal_file}.{datetime.now().strftime('%Y%m%d-%H%M%S')}.merged"
+    os.replace(journal.journal_file, archive_file)
+    logger.info(f"Archived the merged journal as {archive_file}")
+    return len(updates)
+
+
+def main():
+    """
+    Merges a run's progress journal into the master Excel file.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG")
+
+    logger.info("--- Merge Progress Journal into Excel ---")
+    logger.warning("Close the Excel file before merging, otherwise it may cause an error.")
+    input_excel_file = input("Please enter the full path to your master .xlsx file: ").strip().strip('"')
+
+    if not os.path.exists(input_excel_file):
+        logger.error("The provided file path does not exist. Please check the path and try again.")
+        return
+
+    merge_journal_into_excel(input_excel_file)
+
+if __name__ == '__main__':
+    main()
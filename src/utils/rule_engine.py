@@ -0,0 +1,144 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Categorization rules of every parser, grouped by rule set (e.g. 'tata_neu', 'splitwise').
+# Each rule has "keywords" and a "category"; the first rule with a keyword in the text wins.
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'account_statement_parsers', 'categorization_rules.json')
+
+_engines = {}  # (rules file, rule set, file hash) -> RuleEngine, for the life of the process
+
+
+def build_pattern(rules):
+    """
+    Compiles the keywords of all rules into one regular expression.
+
+    Every rule becomes a lookahead alternative anchored at the start of the text,
+    in rule order. The regex engine tries the alternatives in that order and the
+    first whose lookahead finds one of its keywords anywhere in the text matches,
+    so the first matching rule wins, as with checking the rules one by one.
+    """
+    alternatives = [f"(?=.*?(?P<r{i}>{'|'.join(re.escape(keyword) for keyword in rule['keywords'])}))"
+                    for i, rule in enumerate(rules)]
+    return f"^(?:{'|'.join(alternatives)})"
+
+
+class RuleEngine:
+    """
+    Applies a list of keyword rules to whole columns of text with one compiled regex.
+
+    Keywords are matched case-insensitively anywhere in the text. The engine
+    counts how often each rule matched; `log_hits` reports the counts.
+    """
+    def __init__(self, pattern, categories, names):
+        """
+        Args:
+            pattern (str): The pattern from `build_pattern`.
+            categories (list): The category of each rule, in rule order.
+            names (list): A readable name of each rule, for the hit report.
+        """
+        self.pattern = pattern
+        self.regex = re.compile(pattern, re.IGNORECASE | re.DOTALL) if categories else None
+        self.categories = list(categories)
+        self.names = list(names)
+        self.hits = [0] * len(categories)
+        self.unmatched = 0
+
+    @classmethod
+    def from_rules(cls, rules):
+        names = [f"{rule['category']}: {', '.join(rule['keywords'])}" for rule in rules]
+        return cls(build_pattern(rules), [rule['category'] for rule in rules], names)
+
+    def categorize(self, texts):
+        """
+        Returns the category of the first matching rule for every text.
+
+        Args:
+            texts (pd.Series): The texts to categorise.
+
+        Returns:
+            pd.Series: The categories ('' where no rule matches), with the index of `texts`.
+        """
+        if self.regex is None or texts.empty:
+            self.unmatched += len(texts)
+            return pd.Series([''] * len(texts), index=texts.index)
+        matched = texts.fillna('').map(str).str.extract(self.regex).notna().to_numpy()
+        any_rule = matched.any(axis=1)
+        first_rule = matched.argmax(axis=1)
+        self.hits = list(np.add(self.hits, np.bincount(first_rule[any_rule], minlength=len(self.categories))))
+        self.unmatched += int((~any_rule).sum())
+        categories = np.where(any_rule, np.asarray(self.categories, dtype=object)[first_rule], '')
+        return pd.Series(categories.tolist(), index=texts.index)
+
+    def log_hits(self, title="CATEGORIZATION RULES"):
+        """Logs how many texts each rule categorised, and how many no rule matched, then resets the counts."""
+        logger.info("="*50)
+        logger.info(title)
+        logger.info("="*50)
+        for name, hits in zip(self.names, self.hits):
+            logger.info(f"{hits:>6}  {name}")
+        if self.unmatched:
+            logger.warning(f"{self.unmatched:>6}  matched no rule; their category is left blank")
+        logger.info("="*50)
+        self.hits = [0] * len(self.categories)
+        self.unmatched = 0
+
+
+def _file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_rule_engine(ruleset, rules_file=DEFAULT_RULES_FILE):
+    """
+    Returns the rule engine for one rule set of a rules file.
+
+    The generated patterns of all rule sets are cached next to the rules file,
+    keyed by the file's hash, so they are only rebuilt after the rules change.
+    Within a process the engine is built once and shared.
+
+    Args:
+        ruleset (str): The rule set, e.g. 'tata_neu' or 'splitwise'.
+        rules_file (str): The JSON rules file.
+
+    Returns:
+        RuleEngine: The engine, shared by every caller in the process.
+    """
+    digest = _file_hash(rules_file)
+    key = (os.path.abspath(rules_file), ruleset, digest)
+    if key in _engines:
+        return _engines[key]
+
+    cache_file = f"{rules_file}.compiled.json"
+    compiled = None
+    try:
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('hash') == digest:
+                compiled = cached['rulesets']
+    except Exception as e:
+        logger.error(f"Could not load the compiled rules cache: {e}")
+
+    if compiled is None:
+        with open(rules_file, 'r', encoding='utf-8') as f:
+            rulesets = json.load(f)
+        compiled = {}
+        for name, rules in rulesets.items():
+            engine = RuleEngine.from_rules(rules)
+            compiled[name] = {'pattern': engine.pattern, 'categories': engine.categories, 'names': engine.names}
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'hash': digest, 'rulesets': compiled}, f, indent=4)
+            logger.debug(f"Saved compiled rules to {cache_file}")
+        except Exception as e:
+            logger.error(f"Could not save the compiled rules cache: {e}")
+
+    if ruleset not in compiled:
+        raise ValueError(f"Rule set '{ruleset}' not found in {rules_file}. Available: {list(compiled)}")
+    entry = compiled[ruleset]
+    _engines[key] = RuleEngine(entry['pattern'], entry['categories'], entry['names'])
+    return _engines[key]
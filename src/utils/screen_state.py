@@ -0,0 +1,180 @@
+import os
+import json
+import numpy as np
+from loguru import logger
+
+# --- Known Screens ---
+# Every screen the automation moves through. The classifier can only recognise
+# screens that have been learned for the current device (see `learn`).
+MAIN_SCREEN = "main"
+ADD_EXPENSE_SCREEN = "add_expense"
+ADD_INCOME_SCREEN = "add_income"
+ADD_TRANSFER_SCREEN = "add_transfer"
+ACCOUNT_LIST_SCREEN = "account_list"
+CATEGORY_GRID_SCREEN = "category_grid"
+DATE_DIALOG_SCREEN = "date_dialog"
+TIME_DIALOG_SCREEN = "time_dialog"
+ACCOUNTS_PAGE_SCREEN = "accounts_page"
+
+KNOWN_SCREENS = [
+    MAIN_SCREEN,
+    ADD_EXPENSE_SCREEN,
+    ADD_INCOME_SCREEN,
+    ADD_TRANSFER_SCREEN,
+    ACCOUNT_LIST_SCREEN,
+    CATEGORY_GRID_SCREEN,
+    DATE_DIALOG_SCREEN,
+    TIME_DIALOG_SCREEN,
+    ACCOUNTS_PAGE_SCREEN,
+]
+
+# Maps a transaction type to the form screen that should be visible for it.
+# The amount keypad is part of every form, so it is not a screen of its own.
+ENTRY_FORM_SCREENS = {
+    "expense": ADD_EXPENSE_SCREEN,
+    "income": ADD_INCOME_SCREEN,
+    "transfer": ADD_TRANSFER_SCREEN,
+}
+
+
+class ScreenClassifier:
+    """
+    Identifies which app screen is showing by comparing a handful of pixel probes.
+
+    While learning, a coarse grid of pixels is sampled from a reference screenshot
+    of every screen. From those samples each screen keeps only the probe points
+    whose colour sets it apart from all other learned screens, so classifying a
+    frame costs a few dozen pixel reads instead of an OCR pass.
+    The status bar is never sampled: its clock and battery icons change between
+    frames of the same screen and would make screens that look alike differ.
+    The learned probes are stored per device, next to the UI cache.
+    """
+    def __init__(self, probe_file='screen_probes.json', grid_size=(12, 24), probes_per_screen=8, tolerance=30,
+                 status_bar_fraction=0.05):
+        self.probe_file = probe_file
+        self.grid_size = grid_size  # (columns, rows) of the sampling grid
+        self.status_bar_fraction = status_bar_fraction  # Top part of the frame left out of the grid
+        self.probes_per_screen = probes_per_screen
+        self.tolerance = tolerance  # Max mean per-channel difference for a probe set to match
+        self.samples = {}  # screen name -> list of [x, y, b, g, r] for the full grid
+        self.probes = {}  # screen name -> list of [x, y, b, g, r] for the selected probes
+
+    def load(self):
+        """Loads learned samples and probes from the JSON file if it exists."""
+        try:
+            if os.path.exists(self.probe_file):
+                with open(self.probe_file, 'r') as f:
+                    data = json.load(f)
+                self.samples = data.get("samples", {})
+                self.probes = data.get("probes", {})
+                logger.success(f"Loaded screen probes for {sorted(self.probes)} from {self.probe_file}")
+        except Exception as e:
+            logger.error(f"Could not load screen probe file: {e}")
+
+    def save(self):
+        """Saves the learned samples and probes to the JSON file."""
+        try:
+            with open(self.probe_file, 'w') as f:
+                json.dump({"samples": self.samples, "probes": self.probes}, f, indent=4)
+            logger.debug(f"Saved screen probes to {self.probe_file}")
+        except Exception as e:
+            logger.error(f"Could not save screen probe file: {e}")
+
+    def knows(self, screen_name):
+        """Returns True if probes have been learned for the given screen."""
+        return screen_name in self.probes
+
+    def _grid_points(self, height, width):
+        """Returns the (x, y) sampling points for a frame of the given size, below the status bar."""
+        columns, rows = self.grid_size
+        top = int(height * self.status_bar_fraction)
+        xs = np.linspace(0, width - 1, columns + 2, dtype=int)[1:-1]
+        ys = np.linspace(top, height - 1, rows + 2, dtype=int)[1:-1]
+        return [(int(x), int(y)) for y in ys for x in xs]
+
+    def learn(self, screen_name, img):
+        """
+        Samples the grid from a reference screenshot of `screen_name` and
+        re-selects the discriminating probes for every learned screen.
+        """
+        height, width = img.shape[:2]
+        self.samples[screen_name] = [[x, y, *[int(c) for c in img[y, x][:3]]] for x, y in self._grid_points(height, width)]
+        self._select_probes()
+        logger.success(f"Learned screen '{screen_name}' ({len(self.probes[screen_name])} probes).")
+
+    def _select_probes(self):
+        """Picks, for each screen, the grid points that differ most from every other screen."""
+        names = list(self.samples)
+        colours = {name: np.array([s[2:] for s in self.samples[name]], dtype=int) for name in names}
+        self.probes = {}
+        for name in names:
+            others = [colours[other] for other in names if other != name]
+            if others:
+                # A point is only as distinctive as its closest competitor.
+                distance = np.min([np.abs(colours[name] - other).mean(axis=1) for other in others], axis=0)
+                chosen = np.argsort(distance)[::-1][:self.probes_per_screen]
+            else:
+                chosen = np.arange(min(self.probes_per_screen, len(self.samples[name])))
+            self.probes[name] = [self.samples[name][i] for i in sorted(chosen)]
+
+    def score(self, screen_name, img):
+        """Returns the mean colour difference between the frame and a screen's probes."""
+        probes = self.probes[screen_name]
+        height, width = img.shape[:2]
+        diffs = []
+        for x, y, *bgr in probes:
+            if x >= width or y >= height:
+                return float('inf')
+            diffs.append(np.abs(img[y, x][:3].astype(int) - np.array(bgr)).mean())
+        return float(np.mean(diffs))
+
+    def classify(self, img):
+        """
+        Returns the name of the learned screen that best matches the frame,
+        or None if no screen is within tolerance.
+        """
+        best_name, best_score = None, float('inf')
+        for name in self.probes:
+            score = self.score(name, img)
+            if score < best_score:
+                best_name, best_score = name, score
+        logger.trace(f"Screen classified as '{best_name}' (score {best_score:.1f})")
+        return best_name if best_score <= self.tolerance else None
+
+    def matches(self, screen_name, img):
+        """Returns True if the frame shows the given screen."""
+        return self.classify(img) == screen_name
+
+
+def main():
+    """
+    Calibrates the screen classifier for a connected device.
+    With several devices connected, asks which one to calibrate; each device
+    stores its own probes, so run it once per device of a multi-device pool.
+    Walks the user through every known screen and stores the learned probes.
+    """
+    import sys
+    from src.mymoneypro_automator import MyMoneyProAutomator
+    from src.utils.adb_utils import list_connected_serials
+
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG")
+
+    logger.info("--- MyMoneyPro Screen Calibration ---")
+    serial = sys.argv[1] if len(sys.argv) > 1 else None
+    if serial is None:
+        serials = list_connected_serials()
+        if len(serials) > 1:
+            for i, connected in enumerate(serials, start=1):
+                logger.info(f"{i}. {connected}")
+            choice = input("Several devices are connected. Enter the number of the one to calibrate: ").strip()
+            if not choice.isdigit() or not 1 <= int(choice) <= len(serials):
+                logger.error("Invalid choice.")
+                return
+            serial = serials[int(choice) - 1]
+    logger.warning("Keep the MyMoneyPro app in the foreground while calibrating.")
+    automator = MyMoneyProAutomator(serial=serial)
+    automator.calibrate_screens()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+from datetime import datetime
+from loguru import logger
+import pandas as pd
+
+
+class EntryCostModel:
+    """
+    Estimates how many device actions (taps, swipes, OCR scans) entering a
+    transaction costs, given the transaction entered just before it.
+
+    Costs are expressed in "actions", where one tap or swipe is one action and
+    an OCR scan of a list is weighted as OCR_SCAN_COST actions.
+    """
+    OCR_SCAN_COST = 6
+    # Amount, time and notes cost the same in any order, so they are left out.
+
+    def __init__(self, cache=None, category_name_crop=None, date_cost=None,
+                 picker_remembers_last_date=False, skips_prefilled_fields=False):
+        """
+        Args:
+            cache (UICache, optional): The device's UI cache, used to tell warm items from cold ones.
+            category_name_crop (int, optional): Length of the category cache keys.
+            date_cost (callable, optional): (target_date, picker_start_date) -> actions.
+                                            Defaults to one arrow tap per month plus the day tap.
+            picker_remembers_last_date (bool): Whether the date picker opens on the previous entry's date.
+            skips_prefilled_fields (bool): Whether account/category selection is skipped when the
+                                           form is prefilled with the previous entry's values.
+        """
+        self.cache = cache
+        self.category_name_crop = category_name_crop
+        self.date_cost = date_cost or self._arrow_date_cost
+        self.picker_remembers_last_date = picker_remembers_last_date
+        self.skips_prefilled_fields = skips_prefilled_fields
+
+    @classmethod
+    def for_automator(cls, automator):
+        """Builds a cost model that mirrors the behaviour of a MyMoneyProAutomator."""
+        return cls(
+            cache=automator.cache,
+            category_name_crop=automator.coords.category_name_crop,
+            date_cost=lambda target, start: min(automator.date_navigation_costs(target, start).values()),
+            picker_remembers_last_date=automator.coords.date_picker_remembers_last_date,
+            skips_prefilled_fields=automator.detects_prefilled_fields,
+        )
+
+    @staticmethod
+    def _arrow_date_cost(target_date, start_date):
+        return abs((target_date.year - start_date.year) * 12 + (target_date.month - start_date.month)) + 1
+
+    def _selection_cost(self, name, warm):
+        """Cost of opening a list and tapping `name` in it. Cold items need an OCR scan once."""
+        if name in warm:
+            cached = self.cache.get(name) if self.cache else None
+            return 1 + (cached.get("swipes", 0) if cached else 0) + 1
+        warm.add(name)
+        return 1 + self.OCR_SCAN_COST + 1
+
+    def transaction_cost(self, tx, prev_tx, warm):
+        """
+        Returns the estimated actions for `tx` when entered right after `prev_tx`.
+        `warm` is the set of list items already known to the cache; it is updated in place.
+        """
+        tx_type = tx.get('type', 'expense').lower()
+        same_form = prev_tx is not None and self.skips_prefilled_fields and prev_tx.get('type', 'expense').lower() == tx_type
+        cost = 0
+
+        if not (same_form and prev_tx['account'] == tx['account']):
+            cost += self._selection_cost(tx['account'], warm)
+        if not (same_form and prev_tx['category'] == tx['category']):
+            category_key = tx['category'] if tx_type == 'transfer' else tx['category'][:self.category_name_crop]
+            cost += self._selection_cost(category_key, warm)
+
+        if self.picker_remembers_last_date and prev_tx is not None:
+            start_date = prev_tx['datetime']
+        else:
+            start_date = datetime.now()
+        cost += self.date_cost(tx['datetime'], start_date)
+        return cost
+
+    def plan_cost(self, transactions):
+        """Returns the total estimated actions for entering the transactions in the given order."""
+        warm = set(self.cache.locations) if self.cache else set()
+        total = 0
+        prev_tx = None
+        for tx in transactions:
+            total += self.transaction_cost(tx, prev_tx, warm)
+            prev_tx = tx
+        return total
+
+
+def _sequence_of(tx):
+    """Returns the ordering constraint of a transaction (lower runs first)."""
+    sequence = tx.get('sequence')
+    return 0 if sequence is None or pd.isna(sequence) else sequence
+
+
+def schedule_transactions(transactions, cost_model=None):
+    """
+    Reorders the transaction queue to minimise the estimated device actions.
+
+    Transactions are grouped by month, account and category. Groups are then
+    chained greedily, always picking the group that is cheapest to enter after
+    the current one; inside a group the original chronological order is kept.
+
+    An optional numeric 'sequence' field acts as an ordering constraint: all
+    transactions with a lower sequence are entered before any with a higher one,
+    and reordering only happens within the same sequence value.
+
+    The transaction dictionaries themselves are not modified, so fields such as
+    'original_index' keep pointing at their Excel rows.
+
+    Args:
+        transactions (list): The transactions to be entered.
+        cost_model (EntryCostModel, optional): The cost model to optimise against.
+
+    Returns:
+        list: The same transactions in the planned order.
+    """
+    cost_model = cost_model or EntryCostModel()
+    if len(transactions) < 2:
+        return list(transactions)
+
+    planned = []
+    warm = set(cost_model.cache.locations) if cost_model.cache else set()
+    prev_tx = None
+    for sequence in sorted({_sequence_of(tx) for tx in transactions}):
+        groups = {}
+        for tx in transactions:
+            if _sequence_of(tx) != sequence:
+                continue
+            key = (tx['datetime'].year, tx['datetime'].month, tx.get('type', 'expense').lower(), tx['account'], tx['category'])
+            groups.setdefault(key, []).append(tx)
+        remaining = [sorted(group, key=lambda tx: tx['datetime']) for group in groups.values()]
+
+        while remaining:
+            # Pick the group that is cheapest to start from the current state.
+            costs = [cost_model.transaction_cost(group[0], prev_tx, set(warm)) for group in remaining]
+            group = remaining.pop(costs.index(min(costs)))
+            for tx in group:
+                cost_model.transaction_cost(tx, prev_tx, warm)
+                planned.append(tx)
+                prev_tx = tx
+
+    original_cost = cost_model.plan_cost(transactions)
+    planned_cost = cost_model.plan_cost(planned)
+    saved = original_cost - planned_cost
+    logger.info("="*50)
+    logger.info("TRANSACTION SCHEDULE")
+    logger.info("="*50)
+    logger.info(f"Estimated actions in file order: {original_cost}")
+    logger.info(f"Estimated actions in planned order: {planned_cost}")
+    logger.info(f"Estimated savings: {saved} actions ({(saved / original_cost * 100) if original_cost else 0:.1f}%)")
+    logger.info("="*50)
+
+    if planned_cost > original_cost:
+        logger.warning("The planned order is not cheaper than the file order. Keeping the file order.")
+        return list(transactions)
+    return planned
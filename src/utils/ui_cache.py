@@ -35,3 +35,7 @@ class UICache:
     def set(self, name, swipe_count, coords):
         """Sets the location data for a given name in the cache."""
         self.locations[name] = {"swipes": swipe_count, "coords": coords}
+
+    def invalidate(self, name):
+        """Removes a location that turned out to be wrong, so it is found again via OCR."""
+        self.locations.pop(name, None)
@@ -1,95 +1,131 @@
 from datetime import datetime
 from loguru import logger
+import numpy as np
+import pandas as pd
 
 from src.utils.account_categories_list import accounts_list, entry_type, income_categories_list, expense_categories_list
 
-def _validate_single_transaction(tx, i):
-    """Helper function to validate a single transaction dictionary."""
-    
-    # A list of validation checks to run. Each function returns True if valid.
-    validation_checks = [
-        _validate_required_fields,
-        _validate_data_types,
-        _validate_transaction_type,
-        _validate_account,
-        _validate_category_logic
-    ]
-    
-    for check_func in validation_checks:
-        if not check_func(tx, i):
-            return False
-            
-    return True
-
-def _validate_required_fields(tx, i):
-    """Checks if all required fields are present in the transaction."""
-    required_fields = ['account', 'category', 'amount', 'notes', 'datetime']
-    if not all(field in tx for field in required_fields):
-        logger.error(f"Row: {i} | Transaction missing required fields: {tx} | Required: {required_fields}")
-        return False
-    return True
-
-def _validate_data_types(tx, i):
-    """Checks if the data types of key fields are correct."""
-    if not isinstance(tx['amount'], (int, float)):
-        logger.error(f"Row: {i} | Transaction amount is not a number: {tx['amount']} | Type: {type(tx['amount'])}")
-        return False
-    if not isinstance(tx['datetime'], datetime):
-        logger.error(f"Row: {i} | Transaction datetime is not a valid datetime object: {tx['datetime']} | Type: {type(tx['datetime'])}")
-        return False
-    if not isinstance(tx['notes'], str):
-        logger.warning(f"Row: {i} | Notes field is not a string (found {type(tx['notes'])}). Converting.")
-        tx['notes'] = str(tx['notes'])
-    return True
-
-def _validate_transaction_type(tx, i):
-    """Checks if the transaction type is valid."""
-    if tx.get('type', 'Expense') not in entry_type:
-        logger.error(f"Row: {i} | Transaction type '{tx.get('type')}' is not valid. Must be one of {entry_type}.")
-        return False
-    return True
-
-def _validate_account(tx, i):
-    """Checks if the transaction account is valid."""
-    if tx['account'] not in accounts_list:
-        logger.error(f"Row: {i} | Transaction account '{tx['account']}' is not in the accounts list.")
-        return False
-    return True
-
-def _validate_category_logic(tx, i):
-    """Validates the category based on the transaction type."""
-    tx_type = tx.get('type', 'expense').lower()
-    category = tx['category']
-    
-    if tx_type == 'transfer':
-        if category not in accounts_list:
-            logger.error(f"Row: {i} | For a transfer, the category '{category}' must be a valid account.")
-            return False
-        if tx['account'] == category:
-            logger.error(f"Row: {i} | For a transfer, the source account and destination account cannot be the same.")
-            return False
-    elif tx_type == 'income':
-        if category not in income_categories_list:
-            logger.error(f"Row: {i} | Category '{category}' is not in the income categories list.")
-            return False
-    elif tx_type == 'expense':
-        if category not in expense_categories_list:
-            logger.error(f"Row: {i} | Category '{category}' is not in the expense categories list.")
-            return False
-            
-    return True
+REQUIRED_FIELDS = ['account', 'category', 'amount', 'notes', 'datetime']
+ERROR_COLUMNS = ['row', 'field', 'rule', 'value']
+
+# Valid categories per (lower-case) transaction type. A transfer's category is its destination account.
+_CATEGORIES_BY_TYPE = {
+    'transfer': set(accounts_list),
+    'income': set(income_categories_list),
+    'expense': set(expense_categories_list),
+}
+
+# Messages logged for each rule, formatted with the offending value.
+_RULE_MESSAGES = {
+    'required': "Transaction missing required field '{field}'.",
+    'amount_type': "Transaction amount is not a number: {value} | Type: {value_type}",
+    'datetime_type': "Transaction datetime is not a valid datetime object: {value} | Type: {value_type}",
+    'type': "Transaction type '{value}' is not valid. Must be one of " + str(entry_type) + ".",
+    'account': "Transaction account '{value}' is not in the accounts list.",
+    'category': "Category '{value}' is not valid for this transaction type.",
+    'transfer_self': "For a transfer, the source account and destination account cannot be the same.",
+}
+
+
+def _errors(mask, df, field, rule):
+    """Returns the error rows of one rule as a DataFrame in the error table layout."""
+    rows = np.flatnonzero(mask)
+    return pd.DataFrame({
+        'row': rows,
+        'field': field,
+        'rule': rule,
+        'value': df[field].iloc[rows].to_numpy(dtype=object) if field in df else None,
+    })
+
+def _type_mask(column, types):
+    """Returns True where the value's Python type is not one of `types` (missing values excluded)."""
+    return (column.notna() & ~column.map(lambda value: isinstance(value, types) and not isinstance(value, bool))).to_numpy()
+
+def _allowed(codes, names, allowed):
+    """Returns True where a factorized code's name is in `allowed`; the set is checked once per distinct name."""
+    return np.isin(codes, np.flatnonzero(pd.Index(names).isin(allowed)))
+
+def transactions_to_frame(transactions):
+    """Builds a DataFrame with one column per transaction field, keeping the values' original types."""
+    fields = ['type'] + REQUIRED_FIELDS
+    return pd.DataFrame({field: pd.Series([tx.get(field) for tx in transactions], dtype=object) for field in fields})
+
+def validate_frame(df):
+    """
+    Validates a whole DataFrame of transactions at once.
+
+    Every rule is evaluated as a column-wide mask (set membership of the
+    factorized name columns, dtype checks and a cross-column transfer check),
+    so all errors of all rows are found in one pass instead of stopping at the
+    first problem.
+
+    Args:
+        df (pd.DataFrame): One row per transaction, with lower-case column names.
+                           A missing 'type' means 'Expense'.
+
+    Returns:
+        pd.DataFrame: The error table with the columns row (position in `df`),
+                      field, rule and value. Empty if every row is valid.
+    """
+    rows = len(df)
+    errors = []
+
+    types = df['type'].fillna('Expense') if 'type' in df else pd.Series('Expense', index=df.index)
+    type_codes, type_names = pd.factorize(types)
+    invalid_type = ~_allowed(type_codes, type_names, entry_type)
+    errors.append(_errors(invalid_type, df.assign(type=types), 'type', 'type'))
+
+    # Accounts and categories share one code table: a transfer's category is an account,
+    # and equal names get equal codes, which makes the self-transfer check a plain comparison.
+    empty = pd.Series([None] * rows, index=df.index, dtype=object)
+    name_codes, names = pd.factorize(pd.concat([df.get('account', empty), df.get('category', empty)], ignore_index=True))
+    account_codes, category_codes = name_codes[:rows], name_codes[rows:]
+    errors.append(_errors(account_codes == -1, df, 'account', 'required'))
+    errors.append(_errors(category_codes == -1, df, 'category', 'required'))
+    errors.append(_errors((account_codes != -1) & ~_allowed(account_codes, names, accounts_list), df, 'account', 'account'))
+
+    for field in ('amount', 'notes', 'datetime'):
+        missing = df[field].isna().to_numpy() if field in df else np.ones(rows, dtype=bool)
+        errors.append(_errors(missing, df, field, 'required'))
+    if 'amount' in df and not (pd.api.types.is_numeric_dtype(df['amount']) and not pd.api.types.is_bool_dtype(df['amount'])):
+        errors.append(_errors(_type_mask(df['amount'], (int, float, np.integer, np.floating)), df, 'amount', 'amount_type'))
+    if 'datetime' in df and not pd.api.types.is_datetime64_any_dtype(df['datetime']):
+        errors.append(_errors(_type_mask(df['datetime'], datetime), df, 'datetime', 'datetime_type'))
+
+    type_of_row = pd.Index(type_names).str.lower().to_numpy(dtype=object)
+    invalid_category = np.zeros(rows, dtype=bool)
+    for tx_type, categories in _CATEGORIES_BY_TYPE.items():
+        is_type = np.isin(type_codes, np.flatnonzero(type_of_row == tx_type))
+        invalid_category |= is_type & ~_allowed(category_codes, names, categories)
+    errors.append(_errors(invalid_category & ~invalid_type & (category_codes != -1), df, 'category', 'category'))
+
+    is_transfer = np.isin(type_codes, np.flatnonzero(type_of_row == 'transfer'))
+    self_transfer = is_transfer & (account_codes == category_codes) & (account_codes != -1)
+    errors.append(_errors(self_transfer, df, 'category', 'transfer_self'))
+
+    error_table = pd.concat(errors, ignore_index=True)
+    return error_table.sort_values(['row', 'field'], kind='stable').reset_index(drop=True)[ERROR_COLUMNS]
 
 def validate_transactions(transactions):
     """
     Validates a list of transactions to ensure they have all required fields and correct values.
+    Every error is logged (see `validate_frame`); the transactions themselves are never modified.
     Returns True if all transactions are valid, otherwise returns False.
     """
-    # Use all() for a concise way to check if all transactions are valid.
-    # The list comprehension will generate True/False for each transaction.
-    # all() will only be True if every single item in the list is True.
-    is_valid = all([_validate_single_transaction(tx, i) for i, tx in enumerate(transactions)])
-    
-    if is_valid:
+    df = transactions_to_frame(transactions)
+    error_table = validate_frame(df)
+
+    for error in error_table.itertuples(index=False):
+        message = _RULE_MESSAGES[error.rule].format(field=error.field, value=error.value, value_type=type(error.value))
+        logger.error(f"Row: {error.row} | {message}")
+
+    # Notes are converted to text when Transaction records are created, so this is only a warning.
+    non_text_notes = df['notes'].notna() & ~df['notes'].map(lambda value: isinstance(value, str))
+    for row in np.flatnonzero(non_text_notes.to_numpy()):
+        logger.warning(f"Row: {row} | Notes field is not a string (found {type(df['notes'].iloc[row])}). It will be entered as text.")
+
+    if error_table.empty:
         logger.info("All transactions are valid.")
-        
-    return is_valid
+    else:
+        logger.error(f"Found {len(error_table)} validation error(s) in {error_table['row'].nunique()} transaction(s).")
+    return error_table.empty